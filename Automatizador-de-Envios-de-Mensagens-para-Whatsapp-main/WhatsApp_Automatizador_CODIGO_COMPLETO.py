@@ -7,210 +7,260 @@ Feito pra facilitar o envio em massa pelo WhatsApp Web
 
 import time
 import threading
-import tempfile
+import queue
+import os
+import collections
+import logging
+from logging.handlers import RotatingFileHandler
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import pandas as pd
-import random
-import re
-import os
-from datetime import datetime
-import csv
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import (
-    TimeoutException,
-    NoSuchElementException,
-    StaleElementReferenceException,
-)
-
-# ==================== FUNÇÕES AUXILIARES ====================
 
+# Todo o envio fica no whatsapp_motor (roda sem tela, ver whatsapp_cli.py);
+# aqui é só a janela em volta dele
+from whatsapp_motor import (
+    MotorEnvio,
+    ConfigEnvio,
+    ControladorRitmo,
+    ModeloMensagem,
+    CampanhaAgendada,
+    JanelaEnvio,
+    AnexoCampanha,
+    AnexoInvalido,
+    PlanilhaSemColunaNumero,
+    carregar_contatos,
+    criar_planilha_modelo,
+    listar_perfis,
+    limpar_nome_perfil,
+    limpar_perfis_temporarios,
+    ler_data_hora,
+    formatar_momento,
+    REGISTRO_SELETORES,
+    PREFIXO_LOG,
+    FASES_MEDIDAS,
+    FORMATOS_HISTORICO,
+    TIPOS_ANEXO,
+    MAX_SESSOES,
+    SEM_PERFIL,
+    RITMO_FIXO,
+    RITMO_ALEATORIO,
+    RITMO_AUTOMATICO,
+    PENDENTE,
+    ENVIANDO,
+    ENVIADO,
+    SEM_WHATSAPP,
+    FALHOU,
+    REPETIR,
+)
 
-def inserir_texto_com_emojis(navegador, elemento, texto):
-    """
-    Insere texto com suporte completo a emojis e caracteres Unicode
-    Usa múltiplas estratégias para garantir funcionamento com WhatsApp Web
-    """
-    if not texto:
-        return
-
-    import time
-
-    try:
-        navegador.execute_script("arguments[0].focus();", elemento)
-        time.sleep(0.3)
-
-        sucesso = navegador.execute_script(
-            """
-            try {
-                var elemento = arguments[0];
-                var texto = arguments[1];
-                
-                elemento.focus();
-                
-                var dataTransfer = new DataTransfer();
-                dataTransfer.setData('text/plain', texto);
-                
-                var pasteEvent = new ClipboardEvent('paste', {
-                    bubbles: true,
-                    cancelable: true,
-                    clipboardData: dataTransfer
-                });
-                
-                elemento.dispatchEvent(pasteEvent);
-                
-                if (!elemento.textContent || elemento.textContent.length === 0) {
-                    elemento.innerHTML = '';
-                    var linhas = texto.split('\\n');
-                    for (var i = 0; i < linhas.length; i++) {
-                        var textNode = document.createTextNode(linhas[i]);
-                        elemento.appendChild(textNode);
-                        if (i < linhas.length - 1) {
-                            elemento.appendChild(document.createElement('br'));
-                        }
-                    }
-                }
-                
-                var range = document.createRange();
-                var sel = window.getSelection();
-                range.selectNodeContents(elemento);
-                range.collapse(false);
-                sel.removeAllRanges();
-                sel.addRange(range);
-                
-                elemento.dispatchEvent(new Event('input', { bubbles: true }));
-                elemento.dispatchEvent(new Event('change', { bubbles: true }));
-                
-                return true;
-            } catch (e) {
-                console.error('Erro ao inserir texto:', e);
-                return false;
-            }
-        """,
-            elemento,
-            texto,
-        )
-
-        time.sleep(0.5)
-        return sucesso
-
-    except Exception as e:
-        print(f"Erro na função inserir_texto_com_emojis: {e}")
-        return False
-
-
-def arrumar_numero_telefone(telefone):
-    """
-    Arruma o número de telefone pro formato que o WhatsApp entende
-    Aceita: (11) 99999-9999, 11999999999, 5511999999999
-    Retorna sempre: 5511999999999 (com código do Brasil)
-    """
-    if not telefone:
-        return None
-
-    telefone_limpo = str(telefone).strip()
-    so_numeros = re.sub(r"[^\d]", "", telefone_limpo)
-
-    if len(so_numeros) == 13 and so_numeros.startswith("55"):
-        return so_numeros
-    elif len(so_numeros) in (10, 11):
-        return "55" + so_numeros
-
-    return None
+# ==================== LOG DA TELA ====================
+# As threads de envio só jogam a linha (e o status, o progresso e a cor de cada
+# destinatário) numa fila; quem mexe na tela é a própria thread do Tk, de
+# tempos em tempos e em lote. O console guarda só
+# as últimas linhas e, se quiser, tudo vai também pra um arquivo com rotação.
 
+INTERVALO_DRENAR_LOG_MS = 100
 
-def limpar_lista_telefones(lista_telefones):
-    """
-    Limpa a lista de telefones: remove duplicados e separa os válidos dos inválidos
-    Retorna: (telefones_validos, telefones_invalidos, quantos_eram_duplicados)
-    """
-    telefones_ok = []
-    telefones_ruins = []
-    ja_vimos = set()
-    quantos_duplicados = 0
-
-    for telefone in lista_telefones:
-        telefone_arrumado = arrumar_numero_telefone(telefone)
-
-        if telefone_arrumado:
-            if telefone_arrumado not in ja_vimos:
-                telefones_ok.append(telefone_arrumado)
-                ja_vimos.add(telefone_arrumado)
-            else:
-                quantos_duplicados += 1
-        else:
-            telefones_ruins.append(str(telefone))
+# De quanto em quanto tempo o painel de métricas é redesenhado
+INTERVALO_PAINEL_MS = 1000
 
-    return telefones_ok, telefones_ruins, quantos_duplicados
+MAX_LINHAS_CONSOLE = 2000
 
+# Teto de linhas tiradas da fila por rodada (se chegar mais, fica pra próxima)
+MAX_LINHAS_POR_DRENO = 20000
 
-def salvar_no_historico(telefone, deu_certo, mensagem="", observacao=""):
+ARQUIVO_LOG = os.path.join(
+    os.path.expanduser("~"), ".whatsapp_automatizador", "automatizador.log"
+)
+TAMANHO_MAX_LOG_MB = 5
+QTD_LOGS_ANTIGOS = 3
+
+NIVEIS_LOG = {
+    "info": logging.INFO,
+    "success": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+
+def criar_log_arquivo(caminho=ARQUIVO_LOG):
+    """Logger que grava em arquivo e troca de arquivo a cada TAMANHO_MAX_LOG_MB"""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    registrador = logging.getLogger("whatsapp_automatizador")
+    registrador.setLevel(logging.INFO)
+    registrador.propagate = False
+
+    manipulador = RotatingFileHandler(
+        caminho,
+        maxBytes=TAMANHO_MAX_LOG_MB * 1024 * 1024,
+        backupCount=QTD_LOGS_ANTIGOS,
+        encoding="utf-8",
+    )
+    manipulador.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(message)s", "%d/%m/%Y %H:%M:%S")
+    )
+    registrador.addHandler(manipulador)
+    return registrador, manipulador
+
+
+# ==================== GRADE DE DESTINATÁRIOS ====================
+# O Treeview não aguenta 100 mil linhas (cada insert é um item no Tk). A
+# grade cria só as linhas que cabem na tela e, ao rolar, troca o texto delas
+# pelo pedaço certo da lista. O status de cada contato fica numa lista
+# paralela e é atualizado ao vivo durante o envio.
+
+TEXTOS_STATUS = {
+    PENDENTE: "⏳ Pendente",
+    ENVIANDO: "📤 Enviando",
+    REPETIR: "🔁 Vai repetir",
+    ENVIADO: "✅ Enviado",
+    SEM_WHATSAPP: "⚠️ Sem WhatsApp",
+    FALHOU: "❌ Falha",
+}
+
+CORES_STATUS = {
+    ENVIANDO: "blue",
+    REPETIR: "purple",
+    ENVIADO: "green",
+    SEM_WHATSAPP: "orange",
+    FALHOU: "red",
+}
+
+
+class GradeDestinatarios:
     """
-    Salva o resultado do envio num arquivo CSV pra poder ver depois o que aconteceu
+    Treeview "virtual": a lista inteira fica em memória (self.telefones) e só
+    as linhas visíveis existem no Tk. Use carregar() pra trocar a lista e
+    marcar() pra mudar o status (na thread do Tk: as threads de envio passam
+    pelo marcar_destinatario da janela)
     """
-    arquivo_csv = "historico_envios.csv"
-    arquivo_novo = not os.path.exists(arquivo_csv)
 
-    try:
-        with open(arquivo_csv, "a", newline="", encoding="utf-8") as arquivo:
-            escritor = csv.writer(arquivo)
-
-            if arquivo_novo:
-                escritor.writerow(
-                    ["Data", "Hora", "Telefone", "Status", "Observacao", "Tamanho_Msg"]
-                )
-
-            agora = datetime.now()
-            data = agora.strftime("%d/%m/%Y")
-            hora = agora.strftime("%H:%M:%S")
-
-            escritor.writerow(
-                [data, hora, telefone, deu_certo, observacao, len(mensagem)]
-            )
-    except Exception as erro:
-        print(f"[ERRO] Não consegui salvar no arquivo CSV: {str(erro)}")
-
-
-def criar_planilha_modelo():
-    """
-    Cria uma planilha de exemplo pro usuário baixar e preencher
-    """
-    try:
-        exemplos = pd.DataFrame(
-            {"Numero": ["5511999999999", "5521998888888", "5585987777777"]}
+    def __init__(self, pai, linhas=8):
+        self.tree = ttk.Treeview(
+            pai,
+            columns=("posicao", "msisdn", "status"),
+            show="headings",
+            height=linhas,
+            selectmode="none",
         )
+        self.tree.heading("posicao", text="#")
+        self.tree.heading("msisdn", text="Telefones Normalizados")
+        self.tree.heading("status", text="Status")
+        self.tree.column("posicao", width=80, anchor="e", stretch=False)
+        self.tree.column("msisdn", width=300, anchor="w")
+        self.tree.column("status", width=150, anchor="w", stretch=False)
+        for status, cor in CORES_STATUS.items():
+            self.tree.tag_configure(status, foreground=cor)
+
+        self.barra = ttk.Scrollbar(pai, orient="vertical", command=self.rolar)
+
+        self.telefones = []
+        self.status = []
+        self.inicio = 0
+        self.itens = []
+        self.qtd_linhas = linhas
+        self._redesenho_agendado = False
+
+        self.tree.bind("<Configure>", self.ajustar_altura)
+        self.tree.bind("<MouseWheel>", self.rolar_mouse)
+        self.tree.bind("<Button-4>", self.rolar_mouse)
+        self.tree.bind("<Button-5>", self.rolar_mouse)
+
+        self.criar_itens()
+
+    def grid(self, **opcoes):
+        coluna = opcoes.pop("column", 0)
+        colunas = opcoes.pop("columnspan", 1)
+        self.tree.grid(column=coluna, columnspan=colunas, **opcoes)
+        opcoes["sticky"] = "ns"
+        self.barra.grid(column=coluna + colunas, **opcoes)
+
+    def carregar(self, telefones, status=None):
+        """Troca a lista mostrada (não copia: usa a mesma lista do envio)"""
+        self.telefones = telefones
+        self.status = list(status) if status else [PENDENTE] * len(telefones)
+        self.inicio = 0
+        self.desenhar()
+
+    def marcar(self, indice, status):
+        if 0 <= indice < len(self.status):
+            self.status[indice] = status
+            if self.inicio <= indice < self.inicio + self.qtd_linhas:
+                self.agendar_redesenho()
+
+    def agendar_redesenho(self):
+        # Várias sessões marcando ao mesmo tempo viram um redesenho só
+        if not self._redesenho_agendado:
+            self._redesenho_agendado = True
+            self.tree.after(50, self.desenhar)
+
+    def criar_itens(self):
+        while len(self.itens) < self.qtd_linhas:
+            self.itens.append(self.tree.insert("", "end", values=("", "", "")))
+        while len(self.itens) > self.qtd_linhas:
+            self.tree.delete(self.itens.pop())
+
+    def desenhar(self):
+        self._redesenho_agendado = False
+        total = len(self.telefones)
+        self.inicio = max(0, min(self.inicio, total - self.qtd_linhas))
+
+        for linha, item in enumerate(self.itens):
+            indice = self.inicio + linha
+            if indice < total:
+                status = self.status[indice]
+                self.tree.item(
+                    item,
+                    values=(indice + 1, self.telefones[indice], TEXTOS_STATUS[status]),
+                    tags=(status,),
+                )
+            else:
+                self.tree.item(item, values=("", "", ""), tags=())
 
-        pasta_docs = os.path.join(os.path.expanduser("~"), "Documents")
-        arquivo_modelo = os.path.join(pasta_docs, "MODELO_CONTATOS.xlsx")
-        exemplos.to_excel(arquivo_modelo, index=False, sheet_name="Contatos")
-
-        os.startfile(pasta_docs)
-
-        return arquivo_modelo, True
-    except Exception as erro:
-        print(f"[ERRO] Problema ao criar planilha modelo: {str(erro)}")
-        return str(erro), False
+        if total > self.qtd_linhas:
+            self.barra.set(self.inicio / total, (self.inicio + self.qtd_linhas) / total)
+        else:
+            self.barra.set(0, 1)
+
+    def rolar(self, acao, quanto, unidade=None):
+        """Mesmo protocolo do yview do Tk (o Scrollbar chama direto)"""
+        if acao == "moveto":
+            self.inicio = int(float(quanto) * len(self.telefones))
+        elif unidade == "pages":
+            self.inicio += int(quanto) * self.qtd_linhas
+        else:
+            self.inicio += int(quanto)
+        self.desenhar()
+
+    def rolar_mouse(self, event):
+        # Windows/Mac mandam delta; no Linux a roda vira botão 4 (sobe) e 5 (desce)
+        subindo = event.delta > 0 if event.num not in (4, 5) else event.num == 4
+        self.rolar("scroll", -3 if subindo else 3, "units")
+        return "break"  # não deixa o Treeview rolar as linhas dele por conta própria
+
+    def ajustar_altura(self, event=None):
+        """Janela mudou de tamanho: cria ou apaga linhas pra preencher a grade"""
+        if not self.itens:
+            return
+        caixa = self.tree.bbox(self.itens[0])
+        if not caixa:
+            return
+        _, topo, _, altura_linha = caixa
+        linhas = max(1, (self.tree.winfo_height() - topo) // max(1, altura_linha))
+        if linhas != self.qtd_linhas:
+            self.qtd_linhas = linhas
+            self.criar_itens()
+            self.desenhar()
 
 
-class AutomatizadorWhatsApp:
+class AutomatizadorWhatsApp(MotorEnvio):
     """
     Sistema que automatiza envio de mensagens em massa pelo WhatsApp Web
+    A janela só lê as opções e mostra o andamento; quem manda é o MotorEnvio
     """
 
     def __init__(self):
-        self.ta_rodando = False
-        self.ta_pausado = False  # NOVO: controle de pausa
-        self.navegador = None
-        self.lista_telefones = []
-        self.logs_ja_mostrados = set()
-        self.indice_atual = 0  # NOVO: para retomar de onde parou
-
-        self.tempo_espera_entre_envios = 20
+        super().__init__()
+        self._versao_painel = None
 
         self.janela = tk.Tk()
         self.janela.title("🚀 Automatizador WhatsApp - Envio em Massa")
@@ -226,13 +276,38 @@ class AutomatizadorWhatsApp:
         self.tempo_minimo = tk.StringVar(value="15")
         self.tempo_maximo = tk.StringVar(value="25")
         self.usar_tempo_aleatorio = tk.BooleanVar(value=False)
+        self.usar_ritmo_automatico = tk.BooleanVar(value=False)
+        self.ritmo_alvo = tk.StringVar(value="120")
+        self.ritmo_teto = tk.StringVar(value="180")
         self.enviar_tudo_junto = tk.BooleanVar(value=True)
         self.contador_caracteres = tk.StringVar(value="Caracteres: 0")
         self.contador_telefones = tk.StringVar(value="Total: 0 telefones")
         self.log_expandido = False
         self.rodar_chrome_escondido = tk.BooleanVar(value=False)
+        self.rodar_headless = tk.BooleanVar(value=False)
+        self.navegacao_interna = tk.BooleanVar(value=False)
+        self.envio_assincrono = tk.BooleanVar(value=False)
+        self.qtd_sessoes = tk.StringVar(value="1")
+        self.perfil_escolhido = tk.StringVar(value=SEM_PERFIL)
+        self.formato_historico = tk.StringVar(value="csv")
+        self.salvar_log_arquivo = tk.BooleanVar(value=False)
+        self.inicio_agendado = tk.StringVar(value="")
+        self.usar_janela_envio = tk.BooleanVar(value=False)
+        self.janela_horario = tk.StringVar(value="09:00-18:00")
+        self.janela_dias = tk.StringVar(value="seg-sex")
+        self.max_por_hora = tk.StringVar(value="")
+        self.max_por_dia = tk.StringVar(value="")
+
+        self.fila_log = queue.SimpleQueue()
+        self.fila_tela = queue.SimpleQueue()  # (função, argumentos) pro Tk rodar
+        self.log_arquivo = None  # (logger, handler) quando ligado
 
         self.montar_tela()
+        self.janela.after(INTERVALO_DRENAR_LOG_MS, self.drenar_log)
+        self.janela.after(INTERVALO_PAINEL_MS, self.atualizar_painel_metricas)
+
+        # Faxina das pastas temporárias que ficaram de execuções antigas
+        threading.Thread(target=limpar_perfis_temporarios, daemon=True).start()
 
     def montar_tela(self):
         """Monta a tela principal do programa"""
@@ -299,8 +374,8 @@ class AutomatizadorWhatsApp:
 
         texto_avisos = ttk.Label(
             frame_avisos,
-            text="⚠️ Perfil Chrome temporário será criado\n"
-            "⚠️ QR Code scan obrigatório a cada execução\n"
+            text="⚠️ Sem perfil salvo: Chrome temporário e QR Code a cada execução\n"
+            "💡 Escolha ou crie um perfil pra escanear o QR Code só uma vez\n"
             "⚠️ Taxa de envio limitada para evitar detecção de bot",
             foreground="red",
         )
@@ -348,6 +423,30 @@ class AutomatizadorWhatsApp:
 
         self.corpo_campanha.bind("<KeyRelease>", self.atualizar_contador_caracteres)
 
+        frame_anexo = ttk.Frame(frame_corpo_mensagem)
+        frame_anexo.grid(row=2, column=0, sticky="ew", pady=(5, 0))
+        frame_anexo.columnconfigure(2, weight=1)
+
+        ttk.Button(
+            frame_anexo, text="📎 Anexar imagem/PDF", command=self.escolher_anexo
+        ).grid(row=0, column=0, sticky="w")
+
+        self.btn_remover_anexo = ttk.Button(
+            frame_anexo,
+            text="✖ Tirar anexo",
+            command=self.remover_anexo,
+            state="disabled",
+        )
+        self.btn_remover_anexo.grid(row=0, column=1, sticky="w", padx=(10, 0))
+
+        self.label_anexo = ttk.Label(
+            frame_anexo,
+            text="Sem anexo (a mensagem vira a legenda quando tiver)",
+            font=("Arial", 9),
+            foreground="gray",
+        )
+        self.label_anexo.grid(row=0, column=2, sticky="ew", padx=(10, 0))
+
         frame_destinatarios = ttk.LabelFrame(
             frame_principal, text="📋 Fila de Destinatários", padding="15"
         )
@@ -381,22 +480,8 @@ class AutomatizadorWhatsApp:
         )
         self.label_arquivo_carregado.grid(row=0, column=2, sticky="ew", pady=(0, 10))
 
-        self.grid_destinatarios = ttk.Treeview(
-            frame_destinatarios, columns=("msisdn",), show="headings", height=8
-        )
-        self.grid_destinatarios.heading("msisdn", text="Telefones Normalizados")
-        self.grid_destinatarios.column("msisdn", width=400, anchor="w")
-        self.grid_destinatarios.grid(
-            row=1, column=0, columnspan=3, sticky="ewns", pady=(0, 10)
-        )
-
-        scrollbar_grid = ttk.Scrollbar(
-            frame_destinatarios,
-            orient="vertical",
-            command=self.grid_destinatarios.yview,
-        )
-        scrollbar_grid.grid(row=1, column=3, sticky="ns", pady=(0, 10))
-        self.grid_destinatarios.configure(yscrollcommand=scrollbar_grid.set)
+        self.grade = GradeDestinatarios(frame_destinatarios)
+        self.grade.grid(row=1, column=0, columnspan=3, sticky="ewns", pady=(0, 10))
 
         ttk.Label(
             frame_destinatarios,
@@ -436,21 +521,24 @@ class AutomatizadorWhatsApp:
             row=1, column=0, sticky="w", pady=(0, 10)
         )
 
-        frame_throttle = ttk.Frame(frame_configuracoes)
-        frame_throttle.grid(row=1, column=1, padx=(10, 0), sticky="ew", pady=(0, 10))
-        frame_throttle.columnconfigure(2, weight=1)
+        frame_pausa = ttk.Frame(frame_configuracoes)
+        frame_pausa.grid(row=1, column=1, padx=(10, 0), sticky="ew", pady=(0, 10))
 
-        ttk.Checkbutton(
+        frame_throttle = ttk.Frame(frame_pausa)
+        frame_throttle.pack(anchor="w")
+
+        self.check_aleatorio = ttk.Checkbutton(
             frame_throttle,
             text="🎲 Randomizar",
             variable=self.usar_tempo_aleatorio,
             command=self.atualizar_modo_throttle,
-        ).pack(side="left", padx=(0, 10))
+        )
+        self.check_aleatorio.pack(side="left", padx=(0, 10))
 
-        entry_throttle_fixo = ttk.Entry(
+        self.entry_throttle_fixo = ttk.Entry(
             frame_throttle, textvariable=self.tempo_fixo, width=8
         )
-        entry_throttle_fixo.pack(side="left", padx=(0, 5))
+        self.entry_throttle_fixo.pack(side="left", padx=(0, 5))
 
         self.label_throttle_min = ttk.Label(
             frame_throttle, text="Mín:", foreground="gray"
@@ -472,6 +560,32 @@ class AutomatizadorWhatsApp:
         )
         self.entry_throttle_max.pack(side="left")
 
+        frame_ritmo = ttk.Frame(frame_pausa)
+        frame_ritmo.pack(anchor="w", pady=(5, 0))
+
+        ttk.Checkbutton(
+            frame_ritmo,
+            text="📈 Ritmo automático (msg/h por número)",
+            variable=self.usar_ritmo_automatico,
+            command=self.atualizar_modo_throttle,
+        ).pack(side="left", padx=(0, 10))
+
+        self.label_ritmo_alvo = ttk.Label(frame_ritmo, text="Alvo:", foreground="gray")
+        self.label_ritmo_alvo.pack(side="left", padx=(0, 5))
+
+        self.entry_ritmo_alvo = ttk.Entry(
+            frame_ritmo, textvariable=self.ritmo_alvo, width=8, state="disabled"
+        )
+        self.entry_ritmo_alvo.pack(side="left", padx=(0, 10))
+
+        self.label_ritmo_teto = ttk.Label(frame_ritmo, text="Teto:", foreground="gray")
+        self.label_ritmo_teto.pack(side="left", padx=(0, 5))
+
+        self.entry_ritmo_teto = ttk.Entry(
+            frame_ritmo, textvariable=self.ritmo_teto, width=8, state="disabled"
+        )
+        self.entry_ritmo_teto.pack(side="left")
+
         ttk.Label(frame_configuracoes, text="Modo de execução:").grid(
             row=2, column=0, sticky="w", pady=(0, 5)
         )
@@ -486,6 +600,13 @@ class AutomatizadorWhatsApp:
             command=self.atualizar_label_modo_browser,
         ).pack(anchor="w")
 
+        ttk.Checkbutton(
+            frame_modo_browser,
+            text="👻 Headless (sem janela nenhuma; use com perfil já logado)",
+            variable=self.rodar_headless,
+            command=self.atualizar_label_modo_browser,
+        ).pack(anchor="w")
+
         self.label_modo_browser_hint = ttk.Label(
             frame_modo_browser,
             text="💻 Modo atual: Chrome visível (útil para debug)",
@@ -494,6 +615,160 @@ class AutomatizadorWhatsApp:
         )
         self.label_modo_browser_hint.pack(anchor="w", pady=(5, 0))
 
+        ttk.Label(frame_configuracoes, text="Troca de conversa:").grid(
+            row=3, column=0, sticky="w", pady=(5, 0)
+        )
+
+        ttk.Checkbutton(
+            frame_configuracoes,
+            text="⚡ Abrir a próxima conversa sem recarregar o WhatsApp (experimental)",
+            variable=self.navegacao_interna,
+        ).grid(row=3, column=1, sticky="w", padx=(10, 0), pady=(5, 0))
+
+        ttk.Label(frame_configuracoes, text="Sessões paralelas:").grid(
+            row=4, column=0, sticky="w", pady=(10, 0)
+        )
+
+        frame_sessoes = ttk.Frame(frame_configuracoes)
+        frame_sessoes.grid(row=4, column=1, sticky="w", padx=(10, 0), pady=(10, 0))
+
+        ttk.Spinbox(
+            frame_sessoes,
+            from_=1,
+            to=MAX_SESSOES,
+            textvariable=self.qtd_sessoes,
+            width=5,
+        ).pack(side="left")
+
+        ttk.Label(
+            frame_sessoes,
+            text="Cada sessão abre um Chrome e pede o QR Code de um número diferente",
+            font=("Arial", 8, "italic"),
+            foreground="blue",
+        ).pack(side="left", padx=(10, 0))
+
+        ttk.Label(frame_configuracoes, text="Envio assíncrono:").grid(
+            row=5, column=0, sticky="w", pady=(5, 0)
+        )
+
+        ttk.Checkbutton(
+            frame_configuracoes,
+            text="🔀 Todas as sessões numa thread só, direto pelo DevTools (precisa do websockets)",
+            variable=self.envio_assincrono,
+        ).grid(row=5, column=1, sticky="w", padx=(10, 0), pady=(5, 0))
+
+        ttk.Label(frame_configuracoes, text="Perfil do Chrome:").grid(
+            row=6, column=0, sticky="w", pady=(10, 0)
+        )
+
+        frame_perfil = ttk.Frame(frame_configuracoes)
+        frame_perfil.grid(row=6, column=1, sticky="w", padx=(10, 0), pady=(10, 0))
+
+        self.combo_perfil = ttk.Combobox(
+            frame_perfil,
+            textvariable=self.perfil_escolhido,
+            values=[SEM_PERFIL] + listar_perfis(),
+            postcommand=self.atualizar_lista_perfis,
+            width=25,
+        )
+        self.combo_perfil.pack(side="left")
+
+        ttk.Label(
+            frame_perfil,
+            text="Digite um nome novo pra criar; o login fica salvo nele",
+            font=("Arial", 8, "italic"),
+            foreground="blue",
+        ).pack(side="left", padx=(10, 0))
+
+        ttk.Label(frame_configuracoes, text="Formato do histórico:").grid(
+            row=7, column=0, sticky="w", pady=(10, 0)
+        )
+
+        ttk.Combobox(
+            frame_configuracoes,
+            textvariable=self.formato_historico,
+            values=list(FORMATOS_HISTORICO),
+            state="readonly",
+            width=10,
+        ).grid(row=7, column=1, sticky="w", padx=(10, 0), pady=(10, 0))
+
+        ttk.Label(frame_configuracoes, text="Log em arquivo:").grid(
+            row=8, column=0, sticky="w", pady=(5, 0)
+        )
+
+        ttk.Checkbutton(
+            frame_configuracoes,
+            text=f"💾 Salvar o log também em {ARQUIVO_LOG} (com rotação)",
+            variable=self.salvar_log_arquivo,
+            command=self.atualizar_log_arquivo,
+        ).grid(row=8, column=1, sticky="w", padx=(10, 0), pady=(5, 0))
+
+        ttk.Label(frame_configuracoes, text="Agendar início:").grid(
+            row=9, column=0, sticky="w", pady=(10, 0)
+        )
+
+        frame_inicio = ttk.Frame(frame_configuracoes)
+        frame_inicio.grid(row=9, column=1, sticky="w", padx=(10, 0), pady=(10, 0))
+
+        ttk.Entry(frame_inicio, textvariable=self.inicio_agendado, width=18).pack(
+            side="left"
+        )
+
+        ttk.Label(
+            frame_inicio,
+            text="AAAA-MM-DD HH:MM ou só HH:MM; vazio = começa na hora",
+            font=("Arial", 8, "italic"),
+            foreground="blue",
+        ).pack(side="left", padx=(10, 0))
+
+        ttk.Label(frame_configuracoes, text="Horário de envio:").grid(
+            row=10, column=0, sticky="w", pady=(5, 0)
+        )
+
+        frame_janela = ttk.Frame(frame_configuracoes)
+        frame_janela.grid(row=10, column=1, sticky="w", padx=(10, 0), pady=(5, 0))
+
+        ttk.Checkbutton(
+            frame_janela, text="🕘 Só mandar das", variable=self.usar_janela_envio
+        ).pack(side="left")
+        ttk.Entry(frame_janela, textvariable=self.janela_horario, width=12).pack(
+            side="left", padx=(5, 0)
+        )
+        ttk.Label(frame_janela, text="nos dias").pack(side="left", padx=(5, 0))
+        ttk.Entry(frame_janela, textvariable=self.janela_dias, width=12).pack(
+            side="left", padx=(5, 0)
+        )
+
+        ttk.Label(
+            frame_janela,
+            text="Na hora local de cada contato (pelo DDD)",
+            font=("Arial", 8, "italic"),
+            foreground="blue",
+        ).pack(side="left", padx=(10, 0))
+
+        ttk.Label(frame_configuracoes, text="Limite por número:").grid(
+            row=11, column=0, sticky="w", pady=(5, 0)
+        )
+
+        frame_limites = ttk.Frame(frame_configuracoes)
+        frame_limites.grid(row=11, column=1, sticky="w", padx=(10, 0), pady=(5, 0))
+
+        ttk.Entry(frame_limites, textvariable=self.max_por_hora, width=6).pack(
+            side="left"
+        )
+        ttk.Label(frame_limites, text="por hora").pack(side="left", padx=(5, 10))
+        ttk.Entry(frame_limites, textvariable=self.max_por_dia, width=6).pack(
+            side="left"
+        )
+        ttk.Label(frame_limites, text="por dia").pack(side="left", padx=(5, 0))
+
+        ttk.Label(
+            frame_limites,
+            text="Vazio = sem limite; conta cada sessão (número) separado",
+            font=("Arial", 8, "italic"),
+            foreground="blue",
+        ).pack(side="left", padx=(10, 0))
+
         # === CONTROLES ===
         controls_frame = ttk.LabelFrame(
             frame_principal, text="🎛️ Controles de Automação", padding="15"
@@ -559,6 +834,29 @@ class AutomatizadorWhatsApp:
         self.status_label = ttk.Label(controls_frame, textvariable=self.texto_status)
         self.status_label.grid(row=2, column=0, columnspan=4, pady=(5, 0))
 
+        # Métricas ao vivo: ritmo e percentis de cada fase do envio
+        frame_metricas = ttk.LabelFrame(
+            controls_frame, text="📈 Métricas ao vivo", padding="5"
+        )
+        frame_metricas.grid(row=3, column=0, columnspan=4, sticky="ew", pady=(10, 0))
+        frame_metricas.columnconfigure(0, weight=1)
+
+        self.texto_ritmo = tk.StringVar(value="Sem envios ainda")
+        ttk.Label(frame_metricas, textvariable=self.texto_ritmo).grid(
+            row=0, column=0, sticky="w", pady=(0, 5)
+        )
+
+        colunas_metricas = ("n", "p50", "p95", "p99")
+        self.tabela_metricas = ttk.Treeview(
+            frame_metricas, columns=colunas_metricas, height=6
+        )
+        self.tabela_metricas.heading("#0", text="Fase")
+        self.tabela_metricas.column("#0", width=220, stretch=True)
+        for coluna in colunas_metricas:
+            self.tabela_metricas.heading(coluna, text=coluna)
+            self.tabela_metricas.column(coluna, width=70, anchor="e", stretch=False)
+        self.tabela_metricas.grid(row=1, column=0, sticky="ew")
+
         frame_log_auditoria = ttk.LabelFrame(
             frame_principal, text="📝 Log de Execução", padding="10"
         )
@@ -607,7 +905,12 @@ class AutomatizadorWhatsApp:
         self.atualizar_contador_caracteres()
 
     def atualizar_label_modo_browser(self):
-        if self.rodar_chrome_escondido.get():
+        if self.rodar_headless.get():
+            self.label_modo_browser_hint.configure(
+                text="👻 Headless: sem janela, sem imagens/vídeo; QR Code vira arquivo PNG",
+                foreground="green",
+            )
+        elif self.rodar_chrome_escondido.get():
             self.label_modo_browser_hint.configure(
                 text="🚀 Browser em background: execução otimizada sem UI",
                 foreground="green",
@@ -618,17 +921,128 @@ class AutomatizadorWhatsApp:
                 foreground="blue",
             )
 
+    def atualizar_lista_perfis(self):
+        self.combo_perfil.configure(values=[SEM_PERFIL] + listar_perfis())
+
+    def nome_perfil_base(self):
+        """Perfil escolhido na tela, ou None pra usar perfil temporário"""
+        nome = limpar_nome_perfil(self.perfil_escolhido.get())
+        if not nome or self.perfil_escolhido.get() == SEM_PERFIL:
+            return None
+        return nome
+
     def atualizar_modo_throttle(self):
-        if self.usar_tempo_aleatorio.get():
-            self.entry_throttle_min.config(state="normal")
-            self.entry_throttle_max.config(state="normal")
-            self.label_throttle_min.config(foreground="black")
-            self.label_throttle_max.config(foreground="black")
-        else:
-            self.entry_throttle_min.config(state="disabled")
-            self.entry_throttle_max.config(state="disabled")
-            self.label_throttle_min.config(foreground="gray")
-            self.label_throttle_max.config(foreground="gray")
+        automatico = self.usar_ritmo_automatico.get()
+        aleatorio = self.usar_tempo_aleatorio.get() and not automatico
+
+        def ligar(ligado, entradas, rotulos):
+            for entrada in entradas:
+                entrada.config(state="normal" if ligado else "disabled")
+            for rotulo in rotulos:
+                rotulo.config(foreground="black" if ligado else "gray")
+
+        self.check_aleatorio.config(state="disabled" if automatico else "normal")
+        ligar(not automatico and not aleatorio, [self.entry_throttle_fixo], [])
+        ligar(
+            aleatorio,
+            [self.entry_throttle_min, self.entry_throttle_max],
+            [self.label_throttle_min, self.label_throttle_max],
+        )
+        ligar(
+            automatico,
+            [self.entry_ritmo_alvo, self.entry_ritmo_teto],
+            [self.label_ritmo_alvo, self.label_ritmo_teto],
+        )
+
+    def ler_config_ritmo(self):
+        """
+        Lê da tela como vai ser a pausa entre envios (só no iniciar, as
+        threads de envio não mexem nos StringVar). Dá ValueError com a
+        mensagem pro usuário se algo não fizer sentido
+        """
+        try:
+            if self.usar_ritmo_automatico.get():
+                config = {
+                    "modo": RITMO_AUTOMATICO,
+                    "alvo_por_hora": float(self.ritmo_alvo.get().replace(",", ".")),
+                    "teto_por_hora": float(self.ritmo_teto.get().replace(",", ".")),
+                }
+            elif self.usar_tempo_aleatorio.get():
+                config = {
+                    "modo": RITMO_ALEATORIO,
+                    "pausa_minima": int(self.tempo_minimo.get()),
+                    "pausa_maxima": int(self.tempo_maximo.get()),
+                }
+            else:
+                config = {"modo": RITMO_FIXO, "pausa_fixa": int(self.tempo_fixo.get())}
+        except ValueError:
+            raise ValueError("Valores de pausa e ritmo devem ser números!") from None
+
+        if config["modo"] == RITMO_AUTOMATICO and not (
+            0 < config["alvo_por_hora"] <= config["teto_por_hora"]
+        ):
+            raise ValueError("O alvo de msg/h deve ser maior que zero e até o teto!")
+        if config["modo"] == RITMO_ALEATORIO and (
+            config["pausa_minima"] >= config["pausa_maxima"]
+        ):
+            raise ValueError("Pausa mínima deve ser menor que a máxima!")
+        return config
+
+    def ler_config(self):
+        """
+        Junta as opções da tela numa ConfigEnvio (o motor não lê os StringVar)
+        Dá ValueError com a mensagem pro usuário se algo não fizer sentido
+        """
+        try:
+            qtd_sessoes = int(self.qtd_sessoes.get())
+            if not 1 <= qtd_sessoes <= MAX_SESSOES:
+                raise ValueError
+        except ValueError:
+            raise ValueError(
+                f"Sessões paralelas deve ser um número de 1 a {MAX_SESSOES}!"
+            ) from None
+
+        janela = None
+        if self.usar_janela_envio.get():
+            janela = JanelaEnvio.de_texto(
+                self.janela_horario.get(), self.janela_dias.get()
+            )
+
+        limites = []
+        for rotulo, variavel in (
+            ("por hora", self.max_por_hora),
+            ("por dia", self.max_por_dia),
+        ):
+            texto = variavel.get().strip()
+            try:
+                limite = int(texto) if texto else None
+                if limite is not None and limite < 1:
+                    raise ValueError
+            except ValueError:
+                raise ValueError(
+                    f"O limite {rotulo} deve ser um número maior que zero (ou vazio)!"
+                ) from None
+            limites.append(limite)
+
+        return ConfigEnvio(
+            headless=self.rodar_headless.get(),
+            chrome_escondido=self.rodar_chrome_escondido.get(),
+            mensagem_unica=self.enviar_tudo_junto.get(),
+            navegacao_interna=self.navegacao_interna.get(),
+            qtd_sessoes=qtd_sessoes,
+            perfil=self.nome_perfil_base(),
+            formato_historico=self.formato_historico.get(),
+            ritmo=self.ler_config_ritmo(),
+            assincrono=self.envio_assincrono.get(),
+            janela=janela,
+            max_por_hora=limites[0],
+            max_por_dia=limites[1],
+        )
+
+    def ler_inicio_agendado(self):
+        """time.time() de quando começar (0 = agora); ValueError se não entendeu"""
+        texto = self.inicio_agendado.get().strip()
+        return ler_data_hora(texto) if texto else 0.0
 
     def atualizar_contador_caracteres(self, event=None):
         payload_atual = self.corpo_campanha.get("1.0", tk.END).strip()
@@ -644,6 +1058,39 @@ class AutomatizadorWhatsApp:
             self.btn_toggle_log.configure(text="🔽 Expandir Log")
             self.log_expandido = False
 
+    def atualizar_painel_metricas(self):
+        """Redesenha o painel de métricas se chegou tempo novo (roda no Tk)"""
+        medidor = self.medidor
+        if medidor:
+            por_hora_agora, por_hora_media = medidor.mensagens_por_hora()
+            alvo = medidor.ritmo_alvo()
+            self.texto_ritmo.set(
+                f"✅ {medidor.enviados} enviadas | ritmo agora: "
+                f"{por_hora_agora:.0f} msg/h | média: {por_hora_media:.0f} msg/h"
+                + (f" | mirando: {alvo:.0f} msg/h" if alvo is not None else "")
+            )
+
+            if (medidor, medidor.versao) != self._versao_painel:
+                self._versao_painel = (medidor, medidor.versao)
+                percentis = medidor.percentis()
+                self.tabela_metricas.delete(*self.tabela_metricas.get_children())
+                for fase, nome in FASES_MEDIDAS:
+                    if fase in percentis:
+                        numeros = percentis[fase]
+                        self.tabela_metricas.insert(
+                            "",
+                            "end",
+                            text=nome,
+                            values=(
+                                numeros["n"],
+                                f"{numeros['p50']:.2f}s",
+                                f"{numeros['p95']:.2f}s",
+                                f"{numeros['p99']:.2f}s",
+                            ),
+                        )
+
+        self.janela.after(INTERVALO_PAINEL_MS, self.atualizar_painel_metricas)
+
     def limpar_console_log(self):
         self.console_auditoria.delete("1.0", tk.END)
         self.escrever_log("Console de auditoria reiniciado", "info")
@@ -655,15 +1102,86 @@ class AutomatizadorWhatsApp:
             else:
                 self.logs_ja_mostrados.add(mensagem)
 
+        # Com várias sessões cada uma marca as suas linhas ([S1], [S2]...)
+        prefixo = PREFIXO_LOG.get()
+
         hora_agora = time.strftime("%H:%M:%S")
-        linha_formatada = f"[{hora_agora}] {mensagem}\n"
+        linha_formatada = f"[{hora_agora}] {prefixo}{mensagem}\n"
+
+        # Pode vir de qualquer thread: o console só é mexido no drenar_log
+        self.fila_log.put((linha_formatada, tipo))
+
+        if self.log_arquivo:
+            self.log_arquivo[0].log(
+                NIVEIS_LOG.get(tipo, logging.INFO), f"{prefixo}{mensagem}"
+            )
+
+    # Também vêm das threads de envio: só enfileiram, quem aplica é o drenar_log
+    def mostrar_status(self, texto):
+        self.fila_tela.put((self.texto_status.set, (texto,)))
+
+    def mostrar_progresso(self, processados, total=None):
+        self.fila_tela.put((self.aplicar_progresso, (processados, total)))
+
+    def marcar_destinatario(self, indice, status):
+        self.fila_tela.put((self.grade.marcar, (indice, status)))
+
+    def aplicar_progresso(self, processados, total):
+        if total is not None:
+            self.progress["maximum"] = total
+        self.progress["value"] = processados
+
+    def drenar_log(self):
+        """
+        Roda na thread do Tk: passa o que chegou na fila pro console de uma vez
+        e aplica o status / progresso / marcações que as threads deixaram
+        """
+        linhas = collections.deque(maxlen=MAX_LINHAS_CONSOLE)
+        try:
+            for _ in range(MAX_LINHAS_POR_DRENO):
+                linhas.append(self.fila_log.get_nowait())
+        except queue.Empty:
+            pass
 
-        self.console_auditoria.insert(tk.END, linha_formatada, tipo)
-        self.console_auditoria.see(tk.END)
-        self.janela.update_idletasks()
+        if linhas:
+            pedacos = []
+            for linha, tipo in linhas:
+                pedacos.extend((linha, tipo))
+            self.console_auditoria.insert(tk.END, *pedacos)
+
+            # Console é um buffer circular: passou do limite, some o mais velho
+            qtd_linhas = int(self.console_auditoria.index("end-1c").split(".")[0]) - 1
+            if qtd_linhas > MAX_LINHAS_CONSOLE:
+                self.console_auditoria.delete(
+                    "1.0", f"{qtd_linhas - MAX_LINHAS_CONSOLE + 1}.0"
+                )
+            self.console_auditoria.see(tk.END)
+
+        try:
+            for _ in range(MAX_LINHAS_POR_DRENO):
+                funcao, argumentos = self.fila_tela.get_nowait()
+                funcao(*argumentos)
+        except queue.Empty:
+            pass
 
-    def limpar_cache_logs(self):
-        self.logs_ja_mostrados.clear()
+        self.janela.after(INTERVALO_DRENAR_LOG_MS, self.drenar_log)
+
+    def atualizar_log_arquivo(self):
+        """Liga/desliga o log em arquivo conforme o checkbox"""
+        if self.salvar_log_arquivo.get() and not self.log_arquivo:
+            try:
+                self.log_arquivo = criar_log_arquivo()
+                self.escrever_log(f"💾 Log sendo salvo em {ARQUIVO_LOG}", "info")
+            except OSError as erro:
+                self.salvar_log_arquivo.set(False)
+                self.escrever_log(
+                    f"❌ Não deu pra abrir o log em arquivo: {erro}", "error"
+                )
+        elif not self.salvar_log_arquivo.get() and self.log_arquivo:
+            registrador, manipulador = self.log_arquivo
+            self.log_arquivo = None
+            registrador.removeHandler(manipulador)
+            manipulador.close()
 
     def baixar_modelo_excel(self):
         try:
@@ -686,38 +1204,102 @@ class AutomatizadorWhatsApp:
             self.escrever_log(f"❌ Erro grave: {str(erro)}", "error")
             messagebox.showerror("Erro", f"Deu ruim ao exportar:\n{str(erro)}")
 
+    def escolher_anexo(self):
+        caminho = filedialog.askopenfilename(
+            title="Escolher imagem ou PDF pra mandar junto",
+            filetypes=[
+                ("Imagem ou PDF", " ".join(f"*{ext}" for ext in TIPOS_ANEXO)),
+                ("Todos", "*.*"),
+            ],
+        )
+        if not caminho:
+            return
+
+        try:
+            self.anexo = AnexoCampanha(caminho)
+        except (AnexoInvalido, OSError) as erro:
+            messagebox.showerror("Anexo inválido", f"{caminho}\n\n{erro}")
+            return
+
+        self.label_anexo.configure(text=f"📎 {self.anexo}", foreground="green")
+        self.btn_remover_anexo.config(state="normal")
+        self.escrever_log(
+            f"[ANEXO] {self.anexo} pronto, lido uma vez pra campanha toda", "success"
+        )
+
+    def remover_anexo(self):
+        self.anexo = None
+        self.label_anexo.configure(
+            text="Sem anexo (a mensagem vira a legenda quando tiver)",
+            foreground="gray",
+        )
+        self.btn_remover_anexo.config(state="disabled")
+
     def carregar_planilha_destinatarios(self):
         caminho_arquivo = filedialog.askopenfilename(
             title="Selecionar planilha de campanha",
-            filetypes=[("Arquivos Excel", "*.xlsx"), ("Todos", "*.*")],
+            filetypes=[
+                ("Planilhas", "*.xlsx *.xlsm *.xls *.csv"),
+                ("Arquivos Excel", "*.xlsx"),
+                ("CSV", "*.csv"),
+                ("Todos", "*.*"),
+            ],
         )
 
         if not caminho_arquivo:
             return
 
-        try:
-            dataframe_campanha = pd.read_excel(caminho_arquivo)
+        # Lista grande demora: lê numa thread e a tela continua respondendo
+        self.btn_upload_planilha.config(state="disabled")
+        self.label_arquivo_carregado.configure(
+            text="⏳ Carregando planilha...", foreground="blue"
+        )
+        threading.Thread(
+            target=self.ler_planilha_em_segundo_plano,
+            args=(caminho_arquivo,),
+            daemon=True,
+        ).start()
 
-            if "Numero" not in dataframe_campanha.columns:
-                messagebox.showerror(
-                    "Schema Inválido",
-                    "Planilha rejeitada: coluna 'Numero' ausente.\n\nFaça download do template para ver estrutura esperada.",
+    def ler_planilha_em_segundo_plano(self, caminho_arquivo):
+        def progresso(lidos, total):
+            if total:
+                texto = (
+                    f"⏳ Carregando... {lidos:,}/{total:,} linhas ({lidos / total:.0%})"
                 )
-                return
-
-            msisdns_brutos = dataframe_campanha["Numero"].astype(str).tolist()
-            fila_valida, fila_rejeitada, qtd_duplicatas = limpar_lista_telefones(
-                msisdns_brutos
+            else:
+                texto = f"⏳ Carregando... {lidos:,} linhas"
+            self.fila_tela.put(
+                (lambda: self.label_arquivo_carregado.configure(text=texto), ())
             )
 
-            self.lista_telefones = fila_valida
-            self.indice_atual = 0  # Resetar índice ao carregar nova lista
+        try:
+            colunas = {}
+            resultado = carregar_contatos(caminho_arquivo, progresso, colunas)
+            resultado += (colunas,)
+            erro = None
+        except Exception as falha:
+            resultado, erro = None, falha
+
+        self.fila_tela.put(
+            (self.mostrar_planilha_carregada, (caminho_arquivo, resultado, erro))
+        )
+
+    def mostrar_planilha_carregada(self, caminho_arquivo, resultado, erro):
+        """Volta pra thread da tela com o resultado da leitura"""
+        self.btn_upload_planilha.config(state="normal")
+
+        try:
+            if erro:
+                self.label_arquivo_carregado.configure(
+                    text="Nenhuma campanha carregada", foreground="gray"
+                )
+                raise erro
+
+            fila_valida, fila_rejeitada, qtd_duplicatas, colunas = resultado
 
-            for item_antigo in self.grid_destinatarios.get_children():
-                self.grid_destinatarios.delete(item_antigo)
+            self.usar_lista(fila_valida, colunas, caminho_arquivo)
 
-            for msisdn in self.lista_telefones:
-                self.grid_destinatarios.insert("", "end", values=(msisdn,))
+            self.grade.carregar(self.lista_telefones)
 
             resumo_validacao = f"✅ {len(fila_valida)} válidos | ⚠️ {len(fila_rejeitada)} rejeitados | 🔄 {qtd_duplicatas} duplicatas"
             self.label_arquivo_carregado.configure(
@@ -748,6 +1330,27 @@ class AutomatizadorWhatsApp:
                     "warning",
                 )
 
+            if colunas:
+                self.escrever_log(
+                    "[VARIAVEIS] Dá pra usar na mensagem: "
+                    + ", ".join(f"{{{titulo}}}" for titulo in colunas),
+                    "info",
+                )
+            faltando = ModeloMensagem(
+                self.corpo_campanha.get("1.0", tk.END).strip()
+            ).faltando(colunas)
+            if faltando:
+                self.escrever_log(
+                    f"[VARIAVEIS-FALTANDO] A mensagem usa {', '.join(faltando)}, "
+                    "mas a planilha não tem essa(s) coluna(s)",
+                    "warning",
+                )
+
+        except PlanilhaSemColunaNumero:
+            messagebox.showerror(
+                "Schema Inválido",
+                "Planilha rejeitada: coluna 'Numero' ausente.\n\nFaça download do template para ver estrutura esperada.",
+            )
         except FileNotFoundError:
             messagebox.showerror(
                 "Arquivo Não Encontrado", f"Não foi possível abrir:\n{caminho_arquivo}"
@@ -761,417 +1364,13 @@ class AutomatizadorWhatsApp:
             )
             self.escrever_log(f"[PARSE-ERRO] {str(err_geral)}", "error")
 
-    def configurar_chrome(self):
-        """
-        Prepara o Chrome pra funcionar com WhatsApp Web
-        USA O CHROME JÁ INSTALADO NO PC (não baixa versão nenhuma)
-        """
-        try:
-            modo = "escondido" if self.rodar_chrome_escondido.get() else "visível"
-            print(f"--> Configurando Chrome ({modo})...")
-
-            pasta_temp = tempfile.mkdtemp(prefix="whatsapp_auto_")
-            print(f"    Pasta temporária criada: {pasta_temp}")
-
-            config = Options()
-            config.add_argument(f"--user-data-dir={pasta_temp}")
-            config.add_argument("--profile-directory=AutoProfile")
-
-            # ESSENCIAL: Esconde que é automação
-            config.add_argument("--disable-blink-features=AutomationControlled")
-            config.add_experimental_option("excludeSwitches", ["enable-automation"])
-            config.add_experimental_option("useAutomationExtension", False)
-
-            # DESLIGA atualização automática
-            config.add_argument("--disable-background-networking")
-            config.add_argument("--disable-background-timer-throttling")
-            config.add_argument("--disable-client-side-phishing-detection")
-            config.add_argument("--disable-default-apps")
-            config.add_argument("--disable-hang-monitor")
-            config.add_argument("--disable-popup-blocking")
-            config.add_argument("--disable-prompt-on-repost")
-            config.add_argument("--disable-sync")
-            config.add_argument("--metrics-recording-only")
-            config.add_argument("--no-first-run")
-            config.add_argument("--safebrowsing-disable-auto-update")
-            config.add_argument("--password-store=basic")
-
-            # Performance
-            config.add_argument("--disable-extensions")
-            config.add_argument("--no-sandbox")
-            config.add_argument("--disable-dev-shm-usage")
-            config.add_argument("--disable-gpu")
-            config.add_argument("--disable-web-security")
-            config.add_argument("--allow-running-insecure-content")
-
-            # User agent
-            config.add_argument(
-                "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-
-            if self.rodar_chrome_escondido.get():
-                config.add_argument("--window-size=800,600")
-                config.add_argument("--window-position=200,200")
-            else:
-                config.add_argument("--window-size=1200,800")
-                config.add_argument("--window-position=100,100")
-
-            # ⚡ USA CHROME DO SISTEMA - Sem Service, sem ChromeDriverManager
-            navegador = webdriver.Chrome(options=config)
-
-            # Remove flag de automação
-            navegador.execute_script(
-                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-            )
-
-            print("✓ Chrome configurado e pronto!")
-
-            if not self.rodar_chrome_escondido.get():
-                self.escrever_log(
-                    "[QR-REQUIRED] Scan de QR Code necessário para autenticação", "info"
-                )
-            else:
-                self.escrever_log(
-                    "[QR-REQUIRED] QR Code carregará automaticamente - aguarde instruções",
-                    "info",
-                )
-
-            return navegador
-
-        except Exception as err_driver:
-            self.escrever_log(
-                f"[BROWSER-CRITICAL] Falha fatal ao iniciar Chrome: {str(err_driver)}",
-                "error",
-            )
-            return None
-
-    def verificar_se_ta_logado(self, navegador):
-        try:
-            seletores_qr = [
-                "//div[@data-testid='qrcode']",
-                "//canvas[contains(@aria-label, 'Scan')]",
-                "//div[contains(@class, 'qr-code')]",
-            ]
-
-            for seletor in seletores_qr:
-                try:
-                    elementos_qr = navegador.find_elements(By.XPATH, seletor)
-                    for elemento in elementos_qr:
-                        if elemento.is_displayed():
-                            return False
-                except:
-                    continue
-
-            seletores_tela_logada = [
-                "//div[@data-testid='chat-list']",
-                "//div[contains(@class, 'chat-list')]",
-                "//div[@data-testid='chatlist-header']",
-                "//header[contains(@class, 'app-header')]",
-                "//div[@data-testid='search-input']",
-                "//div[contains(@title, 'Pesquisar')]",
-                "//div[@data-testid='menu']",
-                "//span[contains(@title, 'Menu')]",
-                "//div[contains(@class, 'chat') and @data-testid]",
-                "//div[contains(@class, 'app-wrapper-web')]//div[contains(@class, 'two')]",
-            ]
-
-            contador_elementos = 0
-            for seletor in seletores_tela_logada:
-                try:
-                    elementos = navegador.find_elements(By.XPATH, seletor)
-                    for elem in elementos:
-                        if elem.is_displayed():
-                            contador_elementos += 1
-                            break
-                except:
-                    continue
-
-            return contador_elementos >= 1
-
-        except Exception as erro:
-            self.escrever_log(f"❌ Erro ao verificar login: {str(erro)}", "error")
-            return False
-
-    def fazer_login_whatsapp(self, navegador, tempo_max_segundos=300):
-        try:
-            self.escrever_log(
-                "[SESSAO-WA] Aguardando hidratação inicial do DOM...", "info"
-            )
-
-            wait = WebDriverWait(navegador, 45)
-            wait.until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-            time.sleep(3)
-
-            self.escrever_log(
-                "[SESSAO-WA] Aguardando componentes React materializarem...", "info"
-            )
-            try:
-                wait.until(
-                    EC.any_of(
-                        EC.presence_of_element_located(
-                            (By.XPATH, "//div[@data-testid='qrcode']")
-                        ),
-                        EC.presence_of_element_located(
-                            (By.XPATH, "//div[@data-testid='chat-list']")
-                        ),
-                        EC.presence_of_element_located(
-                            (By.XPATH, "//div[contains(@class, 'app-wrapper-web')]")
-                        ),
-                        EC.presence_of_element_located(
-                            (By.XPATH, "//div[@data-testid='chatlist-header']")
-                        ),
-                    )
-                )
-                self.escrever_log("[SESSAO-WA-OK] Interface React carregada", "success")
-            except TimeoutException:
-                self.escrever_log(
-                    "[SESSAO-WA-SLOW] Interface demorou, mas prosseguindo...", "warning"
-                )
-
-            time.sleep(5)
-
-            self.escrever_log(
-                "[AUTH-CHECK] Verificando sessão pré-existente...", "info"
-            )
-            if self.verificar_se_ta_logado(navegador):
-                self.escrever_log(
-                    "[AUTH-CACHED] Sessão já ativa - QR Code desnecessário", "success"
-                )
-                time.sleep(5)
-                return True
-
-            self.escrever_log(
-                "[QR-SCAN-REQUIRED] Sessão não encontrada - QR Code scan necessário",
-                "warning",
-            )
-            self.escrever_log(
-                f"[TIMEOUT-CONFIG] Aguardando até {tempo_max_segundos//60}min para scan",
-                "info",
-            )
-
-            timestamp_inicio = time.time()
-            timestamp_ultima_checagem = 0
-            flag_log_aguardo_emitido = False
-
-            while time.time() - timestamp_inicio < tempo_max_segundos:
-                if not self.ta_rodando:
-                    self.escrever_log(
-                        "[AUTH-ABORTED] Processo cancelado manualmente", "warning"
-                    )
-                    return False
-
-                if time.time() - timestamp_ultima_checagem > 3:
-                    if self.verificar_se_ta_logado(navegador):
-                        self.escrever_log(f"[AUTH-SUCCESS] Login detectado!", "success")
-                        self.escrever_log(
-                            "[STABILIZATION] Aguardando interface estabilizar...",
-                            "success",
-                        )
-
-                        for i in range(10):
-                            if not self.ta_rodando:
-                                return False
-                            time.sleep(1)
-
-                        if self.verificar_se_ta_logado(navegador):
-                            self.escrever_log(
-                                "[AUTH-STABLE] Sessão confirmada e estável", "success"
-                            )
-
-                            if self.rodar_chrome_escondido.get():
-                                try:
-                                    navegador.minimize_window()
-                                    time.sleep(1)
-                                    navegador.set_window_position(-2000, -2000)
-                                    navegador.set_window_size(100, 100)
-                                    time.sleep(1)
-                                except:
-                                    pass
-
-                            time.sleep(3)
-                            return True
-                    else:
-                        if not flag_log_aguardo_emitido:
-                            self.escrever_log(
-                                "[AUTH-PENDING] Aguardando scan de QR Code...",
-                                "info",
-                                nao_repetir=True,
-                            )
-                            flag_log_aguardo_emitido = True
-
-                    timestamp_ultima_checagem = time.time()
-
-                tempo_decorrido = int(time.time() - timestamp_inicio)
-                if tempo_decorrido % 30 == 0 and tempo_decorrido > 0:
-                    minutos_restantes = int((tempo_max_segundos - tempo_decorrido) / 60)
-                    segundos_restantes = (tempo_max_segundos - tempo_decorrido) % 60
-                    self.escrever_log(
-                        f"[TIMEOUT-STATUS] Tempo restante: {minutos_restantes}m {segundos_restantes}s",
-                        "info",
-                    )
-
-                time.sleep(1)
-                self.janela.update_idletasks()
-
-            self.escrever_log(
-                "[AUTH-TIMEOUT] Tempo limite excedido - sessão não estabelecida",
-                "error",
-            )
-            return False
-
-        except Exception as err_auth:
-            self.escrever_log(
-                f"[AUTH-EXCEPTION] Erro crítico em autenticação: {str(err_auth)}",
-                "error",
-            )
-            return False
-
-    def mandar_mensagem(self, navegador, numero_destino, texto_mensagem):
-        try:
-            self.escrever_log(f"📤 Mandando mensagem pro {numero_destino}...", "info")
-
-            url_conversa = f"https://web.whatsapp.com/send?phone={numero_destino}"
-            navegador.get(url_conversa)
-
-            self.escrever_log(
-                "⏳ Esperando WhatsApp carregar (~8s)...", "info", nao_repetir=True
-            )
-            time.sleep(8)
-
-            # Verifica se número é inválido
-            try:
-                seletores_erro = [
-                    "//div[contains(text(), 'Número de telefone compartilhado via URL inválido')]",
-                    "//div[contains(text(), 'Phone number shared via url is invalid')]",
-                    "//div[contains(text(), 'não está cadastrado')]",
-                    "//div[contains(text(), 'not registered')]",
-                    "//div[contains(text(), 'inválido')]",
-                    "//*[contains(text(), 'doesn') and contains(text(), 'WhatsApp')]",
-                ]
-
-                encontrou_erro = False
-                for seletor in seletores_erro:
-                    try:
-                        elementos_erro = navegador.find_elements(By.XPATH, seletor)
-                        if elementos_erro and any(
-                            elem.is_displayed() for elem in elementos_erro
-                        ):
-                            encontrou_erro = True
-                            break
-                    except:
-                        continue
-
-                if encontrou_erro:
-                    self.escrever_log(
-                        f"⚠️ NÚMERO INVÁLIDO: {numero_destino} não possui WhatsApp!",
-                        "warning",
-                    )
-                    return False
-
-            except Exception as e:
-                self.escrever_log(f"⚠️ Erro ao verificar número: {str(e)}", "warning")
-
-            # Fecha popup "Usar WhatsApp Web" se aparecer
-            try:
-                botao_popup = WebDriverWait(navegador, 3).until(
-                    EC.element_to_be_clickable(
-                        (
-                            By.XPATH,
-                            "//button[contains(text(), 'Usar o WhatsApp Web') or contains(text(), 'Use WhatsApp Web')]",
-                        )
-                    )
-                )
-                botao_popup.click()
-                time.sleep(3)
-            except TimeoutException:
-                pass
-
-            # Localiza campo de texto
-            wait_curto = WebDriverWait(navegador, 20)
-            campo_texto = None
-
-            try:
-                campo_texto = wait_curto.until(
-                    EC.presence_of_element_located(
-                        (By.XPATH, "//div[@contenteditable='true'][@data-tab='10']")
-                    )
-                )
-                self.escrever_log("✅ Achei onde digitar!", "success")
-            except TimeoutException as erro:
-                self.escrever_log(f"❌ Não achei onde digitar depois de 20s", "error")
-                return False
-
-            # Verifica modo de envio
-            if self.enviar_tudo_junto.get():
-                # MENSAGEM ÚNICA
-                self.escrever_log("💬 Mandando mensagem completa", "info")
-
-                campo_texto.clear()
-                campo_texto.click()
-                time.sleep(0.5)
-
-                inserir_texto_com_emojis(navegador, campo_texto, texto_mensagem)
-
-                time.sleep(1)
-                campo_texto.send_keys(Keys.ENTER)
-                time.sleep(2)
-                self.escrever_log("✅ Mensagem enviada!", "success")
-
-            else:
-                # POR PARÁGRAFOS
-                self.escrever_log("📃 Modo de envio em partes", "info")
-
-                if "\n\n" in texto_mensagem:
-                    partes = [
-                        p.strip() for p in texto_mensagem.split("\n\n") if p.strip()
-                    ]
-                    self.escrever_log(f"📊 {len(partes)} partes detectadas", "info")
-
-                    for num_parte, parte in enumerate(partes, 1):
-                        if not self.ta_rodando or self.ta_pausado:
-                            break
-
-                        campo_texto.clear()
-                        campo_texto.click()
-                        time.sleep(0.5)
-
-                        inserir_texto_com_emojis(navegador, campo_texto, parte.strip())
-
-                        time.sleep(1)
-                        campo_texto.send_keys(Keys.ENTER)
-
-                        if num_parte < len(partes):
-                            time.sleep(2)
-
-                    self.escrever_log(f"✅ {len(partes)} partes enviadas!", "success")
-                else:
-                    campo_texto.clear()
-                    campo_texto.click()
-                    time.sleep(0.5)
-
-                    inserir_texto_com_emojis(navegador, campo_texto, texto_mensagem)
-
-                    time.sleep(1)
-                    campo_texto.send_keys(Keys.ENTER)
-                    time.sleep(2)
-                    self.escrever_log("✅ Mensagem enviada!", "success")
-
-            time.sleep(3)
-            return True
-
-        except Exception as erro:
-            self.escrever_log(f"❌ Erro crítico: {str(erro)}", "error")
-            return False
-
     # NOVO: Método de pausar/retomar
     def pausar_automacao(self):
         """Pausa ou retoma a automação"""
         if not self.ta_rodando:
             return
 
-        self.ta_pausado = not self.ta_pausado
+        self.pausar(not self.ta_pausado)
 
         if self.ta_pausado:
             self.btn_pausar.configure(text="▶️ RETOMAR")
@@ -1197,47 +1396,56 @@ class AutomatizadorWhatsApp:
             messagebox.showerror("Erro", "Digite uma mensagem para enviar!")
             return
 
+        modelo = self.conferir_modelo(mensagem)
+        if not modelo:
+            return
+
         try:
-            if self.usar_tempo_aleatorio.get():
-                pausa_min = int(self.tempo_minimo.get())
-                pausa_max = int(self.tempo_maximo.get())
-                if pausa_min >= pausa_max:
-                    messagebox.showerror(
-                        "Erro", "Pausa mínima deve ser menor que a máxima!"
-                    )
-                    return
-            else:
-                pausa = int(self.tempo_fixo.get())
-        except:
-            messagebox.showerror("Erro", "Valores de pausa devem ser números!")
+            config = self.ler_config()
+            inicio = self.ler_inicio_agendado()
+        except ValueError as erro:
+            messagebox.showerror("Erro", str(erro))
             return
 
-        modo_pausa = (
-            f"Aleatória ({self.tempo_minimo.get()}s a {self.tempo_maximo.get()}s)"
-            if self.usar_tempo_aleatorio.get()
-            else f"Fixa ({self.tempo_fixo.get()}s)"
-        )
+        linha_agenda = f"⏰ Começa: {formatar_momento(inicio)}\n" if inicio else ""
+        if config.janela:
+            linha_agenda += f"🕘 Horário: {config.janela.descrever()} (hora do DDD)\n"
+        if config.max_por_hora or config.max_por_dia:
+            linha_agenda += (
+                f"🚦 Limite por número: {config.max_por_hora or '-'}/h, "
+                f"{config.max_por_dia or '-'}/dia\n"
+            )
+
+        qtd_sessoes = config.qtd_sessoes
+        modo_pausa = ControladorRitmo(**config.ritmo).descrever()
+        linha_anexo = f"📎 Anexo: {self.anexo}\n" if self.anexo else ""
         resposta = messagebox.askyesno(
             "Confirmar Automação",
             f"Iniciar envio para {len(self.lista_telefones)} contatos?\n\n"
             f"Mensagem: {mensagem[:40]}{'...' if len(mensagem) > 40 else ''}\n"
-            f"Pausa: {modo_pausa}\n\n"
+            f"{self.previa_mensagem(modelo, 40)}"
+            f"{linha_anexo}"
+            f"Pausa: {modo_pausa}\n"
+            f"Sessões paralelas: {qtd_sessoes}\n"
+            f"{linha_agenda}"
+            f"{self.resumo_campanha_salva(mensagem)}\n"
             f"⚠️ ATENÇÃO: Este processo pode levar muito tempo!\n\n"
-            f"🔑 Será necessário escanear o QR Code do WhatsApp Web",
+            f"🔑 Será necessário escanear o QR Code do WhatsApp Web"
+            f"{' em cada sessão (um número por Chrome)' if qtd_sessoes > 1 else ''}",
         )
 
         if not resposta:
             return
 
-        self.ta_rodando = True
-        self.ta_pausado = False
+        self.config = config
+        self.controle.definir(rodando=True, pausado=False)
         self.btn_iniciar.config(state="disabled")
         self.btn_teste.config(state="disabled")
         self.btn_pausar.config(state="normal", text="⏸️ PAUSAR")  # NOVO
         self.btn_parar.config(state="normal")
 
         threading.Thread(
-            target=self.executar_automacao, args=(mensagem,), daemon=True
+            target=self.executar_automacao, args=(mensagem, modelo, inicio), daemon=True
         ).start()
 
     def teste_um_contato(self):
@@ -1252,6 +1460,18 @@ class AutomatizadorWhatsApp:
             messagebox.showerror("Erro", "Digite uma mensagem para enviar!")
             return
 
+        modelo = self.conferir_modelo(mensagem)
+        if not modelo:
+            return
+        if modelo.tem_variaveis:
+            mensagem = modelo.renderizar(self.valores_do_destinatario(0))
+
+        try:
+            config = self.ler_config()
+        except ValueError as erro:
+            messagebox.showerror("Erro", str(erro))
+            return
+
         primeiro_numero = self.lista_telefones[0]
         resposta = messagebox.askyesno(
             "Confirmar Teste",
@@ -1263,8 +1483,8 @@ class AutomatizadorWhatsApp:
         if not resposta:
             return
 
-        self.ta_rodando = True
-        self.ta_pausado = False
+        self.config = config
+        self.controle.definir(rodando=True, pausado=False)
         self.btn_iniciar.config(state="disabled")
         self.btn_teste.config(state="disabled")
         self.btn_pausar.config(state="disabled")  # Sem pausa no teste
@@ -1274,180 +1494,69 @@ class AutomatizadorWhatsApp:
             target=self.executar_teste, args=(mensagem, primeiro_numero), daemon=True
         ).start()
 
-    def executar_teste(self, mensagem, numero):
-        try:
-            self.texto_status.set("Configurando navegador para teste...")
-            self.navegador = self.configurar_chrome()
-
-            if not self.navegador:
-                self.escrever_log("Erro ao configurar navegador", "error")
-                return
-
-            self.texto_status.set("Navegando para WhatsApp Web...")
-            self.navegador.get("https://web.whatsapp.com")
-
-            self.texto_status.set("Aguardando login no WhatsApp...")
-            if not self.fazer_login_whatsapp(self.navegador):
-                self.escrever_log("Falha no login do WhatsApp", "error")
-                return
+    def conferir_modelo(self, mensagem):
+        """ModeloMensagem do texto, ou None (já avisando) se tem variável sem coluna"""
+        modelo = ModeloMensagem(mensagem)
+        faltando = modelo.faltando(self.colunas_planilha)
+        if faltando:
+            disponiveis = ", ".join(f"{{{titulo}}}" for titulo in self.colunas_planilha)
+            messagebox.showerror(
+                "Variável sem coluna",
+                f"A mensagem usa {', '.join(f'{{{nome}}}' for nome in faltando)}, "
+                "mas a planilha não tem essa(s) coluna(s).\n\n"
+                f"Colunas disponíveis: {disponiveis or 'nenhuma além do Numero'}\n\n"
+                "Pra escrever chave de verdade na mensagem use {{ e }}.",
+            )
+            return None
+        return modelo
 
-            self.texto_status.set(f"TESTE: Enviando para {numero}...")
-            self.progress["maximum"] = 1
-            self.progress["value"] = 0
+    def previa_mensagem(self, modelo, tamanho):
+        """Linha com a mensagem do 1º destinatário, pro diálogo de confirmação"""
+        if not modelo.tem_variaveis:
+            return ""
+        previa = modelo.renderizar(self.valores_do_destinatario(0))
+        return f"1º contato recebe: {previa[:tamanho]}{'...' if len(previa) > tamanho else ''}\n"
 
-            if self.mandar_mensagem(self.navegador, numero, mensagem):
-                self.escrever_log("✅ TESTE CONCLUÍDO COM SUCESSO!", "success")
-                salvar_no_historico(
-                    numero, "✅ Teste Sucesso", mensagem, "Teste executado com sucesso"
-                )
-                self.texto_status.set("Teste concluído com sucesso!")
+    def executar_teste(self, mensagem, numero):
+        try:
+            resultado = self.enviar_teste(mensagem, numero)
+            if resultado:
                 messagebox.showinfo(
                     "Teste Concluído",
                     f"✅ Mensagem enviada com sucesso para:\n{numero}",
                 )
-            else:
-                self.escrever_log("❌ TESTE FALHOU", "error")
-                salvar_no_historico(
-                    numero, "❌ Teste Falha", mensagem, "Erro ao enviar teste"
-                )
-                self.texto_status.set("Teste falhou!")
+            elif resultado is not None:
                 messagebox.showerror(
-                    "Teste Falhou", f"❌ Não foi possível enviar para:\n{numero}"
+                    "Teste Falhou",
+                    f"❌ Não foi possível enviar para:\n{numero}\n\n{resultado.observacao}",
                 )
 
-            self.progress["value"] = 1
-
         except Exception as e:
             self.escrever_log(f"Erro no teste: {str(e)}", "error")
             messagebox.showerror("Erro", f"Erro durante o teste: {str(e)}")
         finally:
             self.finalizar_automacao()
 
-    def executar_automacao(self, mensagem):
+    def executar_automacao(self, mensagem, modelo=None, inicio=0.0):
         """Executa automação completa COM SUPORTE A PAUSA"""
         try:
-            self.limpar_cache_logs()
-
-            self.texto_status.set("Configurando navegador...")
-            self.navegador = self.configurar_chrome()
-
-            if not self.navegador:
-                self.escrever_log("Erro ao configurar navegador", "error")
-                return
-
-            self.texto_status.set("Navegando para WhatsApp Web...")
-            self.navegador.get("https://web.whatsapp.com")
-
-            self.texto_status.set("Aguardando login no WhatsApp...")
-            if not self.fazer_login_whatsapp(self.navegador):
-                self.escrever_log("Falha no login do WhatsApp", "error")
-                return
-
-            total = len(self.lista_telefones)
-            sucessos = 0
-            falhas = 0
-            numeros_invalidos = 0
-
-            self.progress["maximum"] = total
-
-            # Começa do índice atual (para retomar de onde parou)
-            i = self.indice_atual
-            while i < total:
-                # NOVO: Verifica se foi pausado
-                while self.ta_pausado and self.ta_rodando:
-                    time.sleep(1)
-                    self.janela.update_idletasks()
-
-                if not self.ta_rodando:
-                    self.escrever_log("Automação interrompida pelo usuário", "warning")
-                    break
-
-                numero = self.lista_telefones[i]
-                self.indice_atual = i  # Salva índice atual
-
-                self.texto_status.set(f"Enviando para {numero} ({i+1}/{total})...")
-                self.progress["value"] = i + 1
-
-                resultado = self.mandar_mensagem(self.navegador, numero, mensagem)
-
-                if resultado:
-                    sucessos += 1
-                    salvar_no_historico(
-                        numero, "✅ Sucesso", mensagem, "Mensagem enviada com sucesso"
-                    )
-                    self.escrever_log(f"✅ Sucesso: {numero}", "success")
-                else:
-                    falhas += 1
-                    if "NÚMERO INVÁLIDO" in str(
-                        self.console_auditoria.get("end-2l", "end-1l")
-                    ):
-                        numeros_invalidos += 1
-                        salvar_no_historico(
-                            numero,
-                            "⚠️ Sem WhatsApp",
-                            mensagem,
-                            "Número não possui WhatsApp cadastrado",
-                        )
-                        self.escrever_log(f"⚠️ Sem WhatsApp: {numero}", "warning")
-                    else:
-                        salvar_no_historico(
-                            numero, "❌ Falha", mensagem, "Erro ao enviar mensagem"
-                        )
-                        self.escrever_log(f"❌ Falha: {numero}", "error")
-
-                # Pausa entre envios
-                if i < total - 1 and self.ta_rodando and not self.ta_pausado:
-                    if self.usar_tempo_aleatorio.get():
-                        pausa = random.randint(
-                            int(self.tempo_minimo.get()), int(self.tempo_maximo.get())
-                        )
-                        self.escrever_log(f"⏰ Pausa aleatória: {pausa}s", "info")
-                    else:
-                        pausa = int(self.tempo_fixo.get())
-                        self.escrever_log(f"⏰ Pausa: {pausa}s", "info")
-
-                    self.texto_status.set(f"Pausa: {pausa}s...")
-                    for segundo in range(pausa):
-                        if not self.ta_rodando or self.ta_pausado:
-                            break
-                        time.sleep(1)
-                        self.janela.update_idletasks()
-
-                i += 1
-
-            # Relatório final
-            if self.ta_rodando:
-                taxa_sucesso = (sucessos / total * 100) if total > 0 else 0
-                self.escrever_log("=" * 50, "info")
-                self.escrever_log("🎉 AUTOMAÇÃO CONCLUÍDA!", "success")
-                self.escrever_log(
-                    f"✅ Sucessos: {sucessos}/{total} ({taxa_sucesso:.1f}%)", "success"
-                )
-                if numeros_invalidos > 0:
-                    self.escrever_log(
-                        f"⚠️ Números sem WhatsApp: {numeros_invalidos}/{total}",
-                        "warning",
-                    )
-                self.escrever_log(
-                    f"❌ Falhas: {falhas}/{total}", "error" if falhas > 0 else "info"
-                )
-                self.escrever_log("=" * 50, "info")
-
-                self.texto_status.set(
-                    f"Concluído: {sucessos} sucessos, {falhas} falhas"
+            if inicio:
+                # Agendada: espera a hora e continua de onde a tela parou
+                campanha = CampanhaAgendada(
+                    self.arquivo_campanha or "Campanha",
+                    self.lista_telefones,
+                    mensagem,
+                    self.colunas_planilha,
+                    modelo,
+                    inicio,
+                    indice_atual=self.indice_atual,
+                    concluidos=set(self.indices_concluidos),
                 )
-
-                relatorio = f"✅ Envios finalizados!\n\n✅ Sucessos: {sucessos}/{total} ({taxa_sucesso:.1f}%)"
-                if numeros_invalidos > 0:
-                    relatorio += f"\n⚠️ Números sem WhatsApp: {numeros_invalidos}"
-                relatorio += f"\n❌ Falhas: {falhas}\n\n📊 Histórico salvo em: historico_envios.csv"
-
-                messagebox.showinfo("Automação Concluída", relatorio)
+                placar = self.rodar_agenda([campanha]).get(campanha.nome)
             else:
-                self.escrever_log(
-                    f"⏹️ Automação interrompida. Progresso salvo: {self.indice_atual + 1}/{total}",
-                    "warning",
-                )
+                placar = self.rodar_campanha(mensagem, modelo)
+            if placar and placar.concluida:
+                messagebox.showinfo("Automação Concluída", self.relatorio_final(placar))
 
         except Exception as e:
             self.escrever_log(f"Erro na automação: {str(e)}", "error")
@@ -1457,24 +1566,15 @@ class AutomatizadorWhatsApp:
 
     def parar_automacao(self):
         """Para automação em execução"""
-        self.ta_rodando = False
-        self.ta_pausado = False
-        self.escrever_log("Parando automação...", "warning")
-        self.texto_status.set("Parando...")
+        self.parar()
 
     def finalizar_automacao(self):
         """Finaliza automação e limpa recursos"""
-        self.ta_rodando = False
-        self.ta_pausado = False
-
-        if self.navegador:
-            try:
-                self.navegador.quit()
-                self.escrever_log("Navegador fechado", "info")
-            except:
-                pass
-            self.navegador = None
+        self.encerrar()
+        # Vem da thread de envio: a tela volta ao normal depois do que já tá na fila
+        self.fila_tela.put((self.liberar_tela, ()))
 
+    def liberar_tela(self):
         self.btn_iniciar.config(state="normal")
         self.btn_teste.config(state="normal")
         self.btn_pausar.config(state="disabled", text="⏸️ PAUSAR")
@@ -1485,7 +1585,7 @@ class AutomatizadorWhatsApp:
             "Parando...",
             "Configurando navegador para teste...",
             "Configurando navegador...",
-        ):
+        ) or self.texto_status.get().startswith("Agendada"):
             self.texto_status.set("Pronto para iniciar")
 
     def executar(self):
@@ -1502,11 +1602,14 @@ class AutomatizadorWhatsApp:
 
             self.parar_automacao()
 
-        if self.navegador:
-            try:
-                self.navegador.quit()
-            except:
-                pass
+        self.fechar_navegadores()
+        REGISTRO_SELETORES.salvar()
+
+        if self.historico:
+            self.historico.fechar()
+
+        if self.banco:
+            self.banco.fechar()
 
         self.janela.destroy()
 
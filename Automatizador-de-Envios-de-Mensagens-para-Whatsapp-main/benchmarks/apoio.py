@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Coisas em comum dos benchmarks: importar o motor de envio, abrir um Chrome
+de teste e montar o motor sem tela apontado pro WhatsApp falso
+"""
+
+import collections
+import os
+import statistics
+import sys
+
+PASTA_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PASTA_PROJETO not in sys.path:
+    sys.path.insert(0, PASTA_PROJETO)
+
+import whatsapp_motor as automatizador  # noqa: E402
+
+# Benchmark roda contra página falsa: não mexe nos seletores aprendidos de verdade
+automatizador.REGISTRO_SELETORES.caminho = None
+
+
+class MotorSemLog(automatizador.MotorEnvio):
+    """Motor de envio que só mostra o log se pedir (mostrar_log=True)"""
+
+    def __init__(self, config, mostrar_log=False):
+        super().__init__(config)
+        self.mostrar_log = mostrar_log
+        self.status = {}  # índice -> status, no lugar da grade da tela
+
+    def escrever_log(self, mensagem, tipo="info", nao_repetir=False):
+        if self.mostrar_log:
+            print(f"    [{tipo}] {automatizador.PREFIXO_LOG.get()}{mensagem}")
+
+    def marcar_destinatario(self, indice, status):
+        self.status[indice] = status
+
+
+def criar_app_sem_tela(
+    url_base,
+    enviar_tudo_junto=True,
+    navegacao_interna=False,
+    mostrar_log=False,
+    classe=MotorSemLog,
+):
+    """
+    MotorEnvio apontado pro WhatsApp falso, sem pausa entre envios e já
+    "rodando" (pra chamar direto o mandar_mensagem ou o executar_pool)
+    """
+    config = automatizador.ConfigEnvio(
+        mensagem_unica=enviar_tudo_junto,
+        navegacao_interna=navegacao_interna,
+        ritmo={"modo": automatizador.RITMO_FIXO, "pausa_fixa": 0},
+        url_whatsapp=url_base,
+    )
+    app = classe(config, mostrar_log)
+    app.ta_rodando = True
+    app.medidor = automatizador.MedidorFases()
+    return app
+
+
+def importar_tela():
+    """Módulo da janela (Tkinter), só pros benchmarks que medem a tela"""
+    import WhatsApp_Automatizador_CODIGO_COMPLETO as tela
+
+    return tela
+
+
+def abrir_chrome_teste(visivel=False):
+    """Chrome limpo pra bater no WhatsApp falso (headless por padrão)"""
+    config = automatizador.Options()
+    if not visivel:
+        config.add_argument("--headless=new")
+    config.add_argument("--no-sandbox")
+    config.add_argument("--disable-dev-shm-usage")
+    config.add_argument("--window-size=1200,800")
+    return automatizador.webdriver.Chrome(options=config)
+
+
+def resumo_tempos(tempos):
+    """Texto com média, mediana e pior caso de uma lista de tempos (segundos)"""
+    if not tempos:
+        return "sem amostras"
+    return (
+        f"média {statistics.mean(tempos):.2f}s | "
+        f"mediana {statistics.median(tempos):.2f}s | "
+        f"pior {max(tempos):.2f}s | n={len(tempos)}"
+    )
+
+
+class ContadorIdas:
+    """Conta cada comando que vai pro chromedriver (WebElement também passa por aqui)"""
+
+    def __init__(self, navegador):
+        self.total = 0
+        self.por_comando = collections.Counter()
+        original = navegador.execute
+
+        def execute(comando, parametros=None):
+            self.total += 1
+            self.por_comando[comando] += 1
+            return original(comando, parametros)
+
+        navegador.execute = execute
+
+    def zerar(self):
+        self.total = 0
+        self.por_comando.clear()
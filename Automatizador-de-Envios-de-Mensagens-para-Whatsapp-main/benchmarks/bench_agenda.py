@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulação da agenda com relógio de mentira (dias de envio em milissegundos)
+Três campanhas com início e prioridade diferentes, contatos de todos os fusos
+do Brasil, janela de horário e limite por hora/dia de cada número. Roda pelo
+MotorEnvio.simular_agenda (mesmas decisões do envio de verdade) e confere:
+ninguém fora do horário local, nenhum número passou do limite, nenhuma
+campanha antes da hora nem na frente de outra mais urgente, todo mundo uma vez
+
+Uso: python benchmarks/bench_agenda.py [--contatos 1500] [--sessoes 3]
+     [--por-hora 40] [--por-dia 250] [--janela 09:00-18:00] [--dias seg-sex]
+"""
+
+import argparse
+import bisect
+import collections
+import time
+from datetime import datetime
+
+from apoio import MotorSemLog, automatizador
+
+# Um DDD de cada fuso: Brasília, Manaus, Acre
+DDDS = ("11", "61", "92", "65", "68")
+
+# Sexta 17h de Brasília: a primeira campanha já pega o fim de semana
+INICIO = datetime(2026, 10, 16, 17, 0, tzinfo=automatizador.FUSOS[-3]).timestamp()
+
+
+def hora_brasilia(momento):
+    return datetime.fromtimestamp(momento, automatizador.FUSOS[-3]).strftime(
+        "%a %d/%m %H:%M"
+    )
+
+
+def montar_campanhas(contatos):
+    def telefones(prefixo, quantos):
+        return [f"55{DDDS[i % len(DDDS)]}9{prefixo}{i:07d}" for i in range(quantos)]
+
+    return [
+        automatizador.CampanhaAgendada(
+            "Promoção", telefones(1, contatos), "oi", inicio=INICIO
+        ),
+        automatizador.CampanhaAgendada(
+            "Aviso urgente",
+            telefones(2, contatos // 10),
+            "urgente",
+            inicio=INICIO + 2.5 * automatizador.UM_DIA,  # segunda 5h
+            prioridade=5,
+        ),
+        automatizador.CampanhaAgendada(
+            "Pesquisa",
+            telefones(3, contatos // 5),
+            "pesquisa",
+            inicio=INICIO + 3 * automatizador.UM_DIA,  # segunda 17h
+        ),
+    ]
+
+
+def maior_em_periodo(momentos, periodo):
+    """Maior quantidade de envios em qualquer janela deslizante de `periodo`"""
+    momentos = sorted(momentos)
+    return max(
+        (
+            i + 1 - bisect.bisect_right(momentos, momento - periodo)
+            for i, momento in enumerate(momentos)
+        ),
+        default=0,
+    )
+
+
+def conferir(envios, campanhas, janela, por_hora, por_dia):
+    """Lista de problemas encontrados (vazia = agenda respeitada)"""
+    problemas = []
+    por_nome = {campanha.nome: campanha for campanha in campanhas}
+    ultimo = {}
+    for momento, _, nome, _ in envios:
+        ultimo[nome] = max(ultimo.get(nome, momento), momento)
+
+    fora = [e for e in envios if janela.espera(e[3], e[0]) > 0]
+    if fora:
+        problemas.append(f"{len(fora)} envios fora do horário local (ex.: {fora[0]})")
+
+    antes = [e for e in envios if e[0] < por_nome[e[2]].inicio]
+    if antes:
+        problemas.append(f"{len(antes)} envios antes da campanha começar")
+
+    furou = 0
+    for momento, _, nome, _ in envios:
+        campanha = por_nome[nome]
+        furou += any(
+            outra.prioridade > campanha.prioridade
+            and outra.inicio <= momento < ultimo.get(outra.nome, 0)
+            for outra in campanhas
+        )
+    if furou:
+        problemas.append(f"{furou} envios na frente de campanha mais urgente")
+
+    por_remetente = collections.defaultdict(list)
+    for momento, remetente, _, _ in envios:
+        por_remetente[remetente].append(momento)
+    for remetente, momentos in por_remetente.items():
+        na_hora = maior_em_periodo(momentos, automatizador.UMA_HORA)
+        no_dia = maior_em_periodo(momentos, automatizador.UM_DIA)
+        if por_hora and na_hora > por_hora:
+            problemas.append(f"{remetente}: {na_hora} envios numa hora")
+        if por_dia and no_dia > por_dia:
+            problemas.append(f"{remetente}: {no_dia} envios em 24h")
+
+    contagem = collections.Counter((nome, numero) for _, _, nome, numero in envios)
+    repetidos = sum(1 for vezes in contagem.values() if vezes > 1)
+    faltando = sum(len(c.telefones) for c in campanhas) - len(contagem)
+    if repetidos or faltando:
+        problemas.append(f"{repetidos} repetidos, {faltando} sem envio")
+    return problemas, por_remetente
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contatos", type=int, default=1500)
+    parser.add_argument("--sessoes", type=int, default=3)
+    parser.add_argument("--por-hora", type=int, default=40)
+    parser.add_argument("--por-dia", type=int, default=250)
+    parser.add_argument("--janela", default="09:00-18:00")
+    parser.add_argument("--dias", default="seg-sex")
+    parser.add_argument("--pausa", type=float, default=20)
+    args = parser.parse_args()
+
+    janela = automatizador.JanelaEnvio.de_texto(args.janela, args.dias)
+    motor = MotorSemLog(
+        automatizador.ConfigEnvio(
+            qtd_sessoes=args.sessoes,
+            ritmo={"modo": automatizador.RITMO_FIXO, "pausa_fixa": args.pausa},
+            janela=janela,
+            max_por_hora=args.por_hora,
+            max_por_dia=args.por_dia,
+        )
+    )
+    campanhas = montar_campanhas(args.contatos)
+
+    inicio = time.perf_counter()
+    envios = motor.simular_agenda(campanhas, inicio=INICIO)
+    duracao = time.perf_counter() - inicio
+
+    simulado = (max(e[0] for e in envios) - INICIO) / automatizador.UM_DIA
+    print(
+        f"{len(envios)} envios, {args.sessoes} sessões, janela {janela.descrever()}, "
+        f"máx {args.por_hora}/h e {args.por_dia}/dia por número"
+    )
+    print(f"  {simulado:.1f} dias de agenda simulados em {duracao * 1000:.0f}ms\n")
+
+    for campanha in campanhas:
+        momentos = [e[0] for e in envios if e[2] == campanha.nome]
+        print(
+            f"  {campanha.nome:<14} prioridade {campanha.prioridade} | pode começar "
+            f"{hora_brasilia(campanha.inicio)} | 1º envio "
+            f"{hora_brasilia(min(momentos))} | último {hora_brasilia(max(momentos))} "
+            f"| {len(momentos)} envios"
+        )
+
+    problemas, por_remetente = conferir(
+        envios, campanhas, janela, args.por_hora, args.por_dia
+    )
+    print()
+    for remetente, momentos in sorted(por_remetente.items()):
+        print(
+            f"  {remetente}: {len(momentos)} envios | pior hora "
+            f"{maior_em_periodo(momentos, automatizador.UMA_HORA)} | pior 24h "
+            f"{maior_em_periodo(momentos, automatizador.UM_DIA)}"
+        )
+    print()
+    if problemas:
+        for problema in problemas:
+            print(f"  ❌ {problema}")
+        raise SystemExit(1)
+    print("  ✅ Horário, limites, início e prioridade respeitados; todo mundo uma vez")
+
+
+if __name__ == "__main__":
+    main()
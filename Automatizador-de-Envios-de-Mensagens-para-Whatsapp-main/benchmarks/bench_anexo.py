@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do anexo (imagem/PDF com legenda) contra o WhatsApp falso local
+Sem cache: send_keys(caminho) no input de arquivo a cada contato (o
+chromedriver lê o arquivo do disco e manda ele inteiro toda vez)
+Com cache: o arquivo é lido e convertido uma vez, guardado na página e só
+colado em cada contato. Mostra o tempo de cada fase do envio do anexo
+
+Uso: python benchmarks/bench_anexo.py [--contatos 10] [--tamanho-kb 2048] [--visivel]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from selenium.webdriver.common.by import By
+
+from apoio import (
+    automatizador,
+    abrir_chrome_teste,
+    criar_app_sem_tela,
+    resumo_tempos,
+)
+from whatsapp_falso import iniciar_servidor
+
+
+def criar_imagem_falsa(tamanho_kb):
+    """PNG de mentira (só o cabeçalho certo) do tamanho pedido"""
+    caminho = os.path.join(tempfile.mkdtemp(prefix="bench_anexo_"), "promo.png")
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(b"\x89PNG\r\n\x1a\n" + os.urandom(tamanho_kb * 1024))
+    return caminho
+
+
+def enviar_sem_cache(app, caminho):
+    """Mesmo fluxo do enviar_anexo, mas subindo o arquivo do disco toda vez"""
+
+    def enviar_anexo(navegador, campo_texto, legenda, resultado):
+        automatizador.marcar_bolhas_existentes(navegador)
+        with resultado.fase("anexar"):
+            navegador.find_element(By.CSS_SELECTOR, "input[type='file']").send_keys(
+                caminho
+            )
+        with resultado.fase("abrir_previa"):
+            campo_legenda = automatizador.esperar_legenda_anexo(navegador, 20)
+        with resultado.fase("injetar_texto"):
+            automatizador.inserir_texto_com_emojis(navegador, campo_legenda, legenda)
+        with resultado.fase("enviar"):
+            campo_legenda.send_keys(automatizador.Keys.ENTER)
+        with resultado.fase("confirmar"):
+            status = automatizador.esperar_envio_confirmado(navegador, 20)
+        return status is not None
+
+    return enviar_anexo
+
+
+def rodar(nome, app, navegador, numeros):
+    app.medidor = automatizador.MedidorFases()
+    tempos = []
+    for numero in numeros:
+        inicio = time.perf_counter()
+        resultado = app.mandar_mensagem(navegador, numero, "Promoção de hoje 🎉")
+        tempos.append(time.perf_counter() - inicio)
+        assert resultado, f"{nome}: falhou pra {numero} ({resultado.observacao})"
+        app.medidor.registrar_resultado(resultado)
+
+    print(f"  {nome:<10} {resumo_tempos(tempos)}")
+    percentis = app.medidor.percentis()
+    for fase, rotulo in automatizador.FASES_MEDIDAS:
+        if fase in percentis and fase != "total":
+            numeros_fase = percentis[fase]
+            print(
+                f"      {rotulo:<30} n={numeros_fase['n']:<3} "
+                f"p50 {numeros_fase['p50'] * 1000:7.1f}ms "
+                f"p95 {numeros_fase['p95'] * 1000:7.1f}ms"
+            )
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contatos", type=int, default=10)
+    parser.add_argument("--tamanho-kb", type=int, default=2048)
+    parser.add_argument("--visivel", action="store_true")
+    args = parser.parse_args()
+
+    caminho = criar_imagem_falsa(args.tamanho_kb)
+    servidor, url_base = iniciar_servidor(
+        {"atraso_boot_ms": 300, "atraso_carga_ms": 200, "atraso_anexo_ms": 100}
+    )
+    navegador = abrir_chrome_teste(args.visivel)
+    app = criar_app_sem_tela(url_base, navegacao_interna=True)
+    numeros = [f"55619{i:08d}" for i in range(1, args.contatos + 1)]
+
+    inicio = time.perf_counter()
+    app.anexo = automatizador.AnexoCampanha(caminho)
+    preparar = time.perf_counter() - inicio
+    print(
+        f"Anexo {app.anexo}, {args.contatos} contatos, troca de conversa sem "
+        f"recarregar (ler + conferir + base64 uma vez: {preparar * 1000:.1f}ms)\n"
+    )
+
+    try:
+        app.mandar_mensagem(navegador, "5561900000000", "aquecendo")
+
+        em_cache = app.enviar_anexo
+        app.enviar_anexo = enviar_sem_cache(app, caminho)
+        antes = rodar("sem cache", app, navegador, numeros)
+
+        app.enviar_anexo = em_cache
+        depois = rodar("com cache", app, navegador, numeros)
+
+        print(
+            f"\n  Cache economiza {(sum(antes) - sum(depois)) / len(numeros) * 1000:.0f}ms "
+            "por contato"
+        )
+    finally:
+        navegador.quit()
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
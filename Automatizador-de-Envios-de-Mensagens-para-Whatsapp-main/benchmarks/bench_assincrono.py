@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do envio assíncrono: a mesma campanha no WhatsApp falso com uma
+thread por sessão (Selenium perguntando de tempos em tempos) e com todas as
+sessões num event loop só (DevTools, esperando o aviso da página)
+Compara contatos por hora, a espera da conversa e do check (p50/p95), CPU
+do Python e quantas threads ele abriu
+
+Uso: python benchmarks/bench_assincrono.py [--cenarios rapido realista]
+     [--contatos 20] [--sessoes 3]
+"""
+
+import argparse
+import functools
+
+from apoio import automatizador
+from bench_ponta_a_ponta import rodar_cenario
+from whatsapp_falso import CENARIOS
+
+MODOS = (("thread por sessão", False), ("assíncrono", True))
+
+FASES_COMPARADAS = ("esperar_conversa", "confirmar")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--cenarios",
+        nargs="+",
+        choices=sorted(CENARIOS),
+        default=["rapido", "realista"],
+    )
+    parser.add_argument("--contatos", type=int, default=20)
+    parser.add_argument("--sessoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--visivel", action="store_true")
+    args = parser.parse_args()
+
+    if automatizador.websockets is None:
+        raise SystemExit("Precisa do websockets: pip install websockets")
+    automatizador.FilaTrabalho = functools.partial(
+        automatizador.FilaTrabalho, espera_inicial=1
+    )
+
+    print(f"{args.contatos} contatos, {args.sessoes} sessão(ões), troca interna\n")
+    for cenario in args.cenarios:
+        print(f"  {cenario}")
+        for rotulo, assincrono in MODOS:
+            resultado = rodar_cenario(
+                cenario,
+                argparse.Namespace(
+                    contatos=args.contatos,
+                    sessoes=args.sessoes,
+                    recarregar=False,
+                    assincrono=assincrono,
+                    semente=args.semente,
+                    visivel=args.visivel,
+                ),
+            )
+            fases = " | ".join(
+                f"{fase} p50 {resultado['fases'][fase]['p50']:.2f}s "
+                f"p95 {resultado['fases'][fase]['p95']:.2f}s"
+                for fase in FASES_COMPARADAS
+                if fase in resultado["fases"]
+            )
+            print(
+                f"    {rotulo:<18} {resultado['contatos_por_hora_sem_login']:6.0f} "
+                f"contatos/h | ok {resultado['sucessos']} falhas {resultado['falhas']} "
+                f"| Python CPU {resultado['python_cpu']:.1f}% threads "
+                f"{resultado['python_threads_max']}"
+            )
+            print(f"    {'':<18} {fases}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
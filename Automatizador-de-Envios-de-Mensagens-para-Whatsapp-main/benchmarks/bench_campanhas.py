@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do banco de campanhas: quanto custa criar uma campanha grande e,
+principalmente, retomar ela depois (achar a campanha, contar os status e
+listar quem já foi processado) com e sem o índice por status
+
+Uso: python benchmarks/bench_campanhas.py [--contatos 500000] [--feitos 250000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from apoio import automatizador
+
+
+def cronometrar(nome, funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    print(f"  {nome:<38} {(time.perf_counter() - inicio) * 1000:>9.1f} ms")
+    return resultado
+
+
+def medir_retomada(banco, telefones, mensagem, rotulo):
+    print(f"\nRetomada ({rotulo}):")
+    campanha_id, nova = cronometrar(
+        "abrir_campanha (assinatura + busca)",
+        lambda: banco.abrir_campanha(telefones, mensagem),
+    )
+    assert not nova
+    cronometrar("contar_status", lambda: banco.contar_status(campanha_id))
+    feitos = cronometrar(
+        "resultados_salvos", lambda: banco.resultados_salvos(campanha_id)
+    )
+    cronometrar(
+        "registrar_resultado (1 envio)",
+        lambda: banco.registrar_resultado(
+            campanha_id, len(telefones) - 1, automatizador.ENVIADO
+        ),
+    )
+    return feitos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contatos", type=int, default=500000)
+    parser.add_argument("--feitos", type=int, default=250000)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(prefix="bench_campanhas_"), "c.db")
+    banco = automatizador.BancoCampanhas(caminho)
+    telefones = [f"55619{i:08d}" for i in range(args.contatos)]
+    mensagem = "Mensagem de benchmark"
+
+    print(f"{args.contatos:,} destinatários, {args.feitos:,} já processados\n")
+    campanha_id, _ = cronometrar(
+        "criar campanha", lambda: banco.abrir_campanha(telefones, mensagem)
+    )
+
+    # Outra campanha grande no mesmo banco, pra busca sem índice ter o que varrer
+    banco.abrir_campanha(telefones, "Outra mensagem")
+
+    with banco.conexao:
+        banco.conexao.execute(
+            "UPDATE destinatarios SET status = ? WHERE campanha_id = ? AND posicao < ?",
+            (automatizador.ENVIADO, campanha_id, args.feitos),
+        )
+
+    feitos = medir_retomada(banco, telefones, mensagem, "com índice")
+    assert len(feitos) == args.feitos
+
+    banco.conexao.execute("DROP INDEX idx_destinatarios_status")
+    medir_retomada(banco, telefones, mensagem, "sem índice por status")
+
+    banco.fechar()
+    print(f"\n  Banco em {caminho} ({os.path.getsize(caminho) / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do carregamento da planilha: pd.read_excel + astype(str).tolist()
+(jeito antigo) x leitura linha a linha (openpyxl read_only / csv)
+Cada medida roda num processo separado pra o pico de memória (RSS) ser só dela
+
+Uso: python benchmarks/bench_carregamento.py [--linhas 1000000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from apoio import automatizador
+
+
+def gerar_planilhas(pasta, qtd_linhas):
+    """Gera o mesmo conteúdo em .xlsx e .csv (com repetidos e alguns inválidos)"""
+    import openpyxl
+
+    def linhas():
+        for i in range(qtd_linhas):
+            if i % 50 == 0:
+                yield (f"Cliente {i}", "sem numero")
+            else:
+                yield (f"Cliente {i}", 5561900000000 + i % (qtd_linhas // 2 + 1))
+
+    caminho_xlsx = os.path.join(pasta, "contatos.xlsx")
+    pasta_excel = openpyxl.Workbook(write_only=True)
+    aba = pasta_excel.create_sheet("Contatos")
+    aba.append(("Nome", "Numero"))
+    for linha in linhas():
+        aba.append(linha)
+    pasta_excel.save(caminho_xlsx)
+
+    caminho_csv = os.path.join(pasta, "contatos.csv")
+    with open(caminho_csv, "w", encoding="utf-8") as arquivo:
+        arquivo.write("Nome,Numero\n")
+        arquivo.writelines(f"{nome},{numero}\n" for nome, numero in linhas())
+
+    return caminho_xlsx, caminho_csv
+
+
+def carregar_jeito_antigo(caminho):
+    dataframe = pd.read_excel(caminho)
+    brutos = dataframe["Numero"].astype(str).tolist()
+    return automatizador.limpar_lista_telefones(brutos)
+
+
+def medir_neste_processo(metodo, caminho):
+    inicio = time.perf_counter()
+    if metodo == "antigo":
+        validos, invalidos, duplicados = carregar_jeito_antigo(caminho)
+    else:
+        validos, invalidos, duplicados = automatizador.carregar_contatos(caminho)
+    duracao = time.perf_counter() - inicio
+
+    pico_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        json.dumps(
+            {
+                "segundos": duracao,
+                "pico_mb": pico_kb / 1024,
+                "validos": len(validos),
+                "invalidos": len(invalidos),
+                "duplicados": duplicados,
+            }
+        )
+    )
+
+
+def medir(nome, metodo, caminho):
+    saida = subprocess.run(
+        [sys.executable, __file__, "--medir", metodo, caminho],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    dados = json.loads(saida.strip().splitlines()[-1])
+    print(
+        f"  {nome:<28} {dados['segundos']:>7.2f}s | pico RSS {dados['pico_mb']:>7.0f} MB "
+        f"| {dados['validos']:,} válidos, {dados['invalidos']:,} inválidos, "
+        f"{dados['duplicados']:,} duplicados"
+    )
+    return dados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, default=1000000)
+    parser.add_argument("--medir", nargs=2, metavar=("METODO", "ARQUIVO"))
+    args = parser.parse_args()
+
+    if args.medir:
+        medir_neste_processo(*args.medir)
+        return
+
+    pasta = tempfile.mkdtemp(prefix="bench_carregamento_")
+    print(f"Gerando planilhas com {args.linhas:,} linhas em {pasta}...")
+    caminho_xlsx, caminho_csv = gerar_planilhas(pasta, args.linhas)
+    print()
+
+    antigo = medir("antes: pd.read_excel", "antigo", caminho_xlsx)
+    novo = medir("depois: xlsx linha a linha", "novo", caminho_xlsx)
+    medir("depois: csv linha a linha", "novo", caminho_csv)
+
+    if novo["validos"] != antigo["validos"]:
+        print("\n  ⚠️ Quantidade de válidos diferente entre os dois jeitos!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de pausar / continuar / parar: quanto tempo as sessões levam pra
+reagir ao botão e quantas vezes acordam à toa enquanto estão pausadas
+Sessões de mentira (envio instantâneo, pausa longa entre envios) no pool de
+verdade, com as esperas antigas (olhando as flags de 1 em 1 segundo) x o
+ControleExecucao (Condition que acorda no sinal)
+
+Uso: python benchmarks/bench_controle.py [--sessoes 5] [--rodadas 5] [--semente 3]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from apoio import MotorSemLog, automatizador, criar_app_sem_tela
+
+PAUSA_ENTRE_ENVIOS = 60  # longa de propósito: as sessões ficam dormindo nela
+
+
+class NavegadorFalso:
+    def __init__(self, perfil=None):
+        self.perfil = perfil
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+class CondicaoContada(threading.Condition):
+    """Condition que conta quantas vezes quem espera nela acordou"""
+
+    acordadas = 0
+
+    def wait(self, timeout=None):
+        try:
+            return super().wait(timeout)
+        finally:
+            self.acordadas += 1
+
+
+class MotorEsperaAntiga(MotorSemLog):
+    """As esperas de antes: dorme de 1 em 1 segundo e olha as flags"""
+
+    acordadas = 0
+
+    def esperar_fim_da_pausa(self, sessao):
+        esperou = False
+        while self.ta_pausado and self.sessao_ativa(sessao):
+            esperou = True
+            time.sleep(1)
+            self.acordadas += 1
+        if esperou:
+            self.medir_reacao()
+
+    def dormir_na_sessao(self, sessao, segundos):
+        fim = time.monotonic() + segundos
+        while self.sessao_ativa(sessao) and not self.ta_pausado:
+            restante = fim - time.monotonic()
+            if restante <= 0:
+                return
+            time.sleep(min(restante, 1))
+            self.acordadas += 1
+        self.medir_reacao()
+
+    def medir_reacao(self):
+        self.medir_fase(
+            "reagir_controle", time.perf_counter() - self.controle.momento_sinal
+        )
+
+
+def mandar_na_hora(navegador, numero, texto):
+    resultado = automatizador.ResultadoEnvio(numero)
+    resultado.desfecho = automatizador.DesfechoEnvio.ENVIADO
+    return resultado
+
+
+def acordadas(app):
+    if isinstance(app, MotorEsperaAntiga):
+        return app.acordadas
+    return app.controle._condicao.acordadas
+
+
+def medir(classe, qtd_sessoes, rodadas, sorteio):
+    app = criar_app_sem_tela("http://falso", classe=classe)
+    app.controle._condicao = CondicaoContada()
+    reacoes = []
+    app.medir_fase = lambda fase, segundos: (
+        reacoes.append(segundos) if fase == "reagir_controle" else None
+    )
+    app.config.qtd_sessoes = qtd_sessoes
+    app.config.ritmo = {
+        "modo": automatizador.RITMO_FIXO,
+        "pausa_fixa": PAUSA_ENTRE_ENVIOS,
+    }
+    app.configurar_chrome = NavegadorFalso
+    app.fazer_login_whatsapp = lambda navegador: True
+    app.mandar_mensagem = mandar_na_hora
+    app.lista_telefones = [f"55619{i:08d}" for i in range(1000)]
+    app.historico = automatizador.GravadorHistorico()
+
+    tempos = {"pausar": [], "continuar": [], "parar (pool devolveu)": []}
+    acordadas_por_segundo = []
+
+    for _ in range(rodadas):
+        app.indice_atual = 0
+        app.indices_concluidos = set()
+        app.controle.definir(rodando=True, pausado=False)
+        pool = threading.Thread(target=app.executar_pool, args=("oi",))
+        pool.start()
+        # Botões apertados num momento qualquer (não alinhado com o segundo)
+        time.sleep(1 + sorteio.random())  # todo mundo mandou e tá na pausa
+
+        visto = len(reacoes)
+        app.pausar(True)
+        time.sleep(1.2)
+        tempos["pausar"] += reacoes[visto:]
+
+        antes = acordadas(app)
+        pausado = 2 + sorteio.random()
+        time.sleep(pausado)
+        acordadas_por_segundo.append((acordadas(app) - antes) / pausado)
+
+        visto = len(reacoes)
+        app.pausar(False)
+        time.sleep(1.2)
+        tempos["continuar"] += reacoes[visto:]
+
+        time.sleep(sorteio.random())
+        inicio = time.perf_counter()
+        app.parar()
+        pool.join()
+        tempos["parar (pool devolveu)"].append(time.perf_counter() - inicio)
+
+    app.historico.fechar()
+    return tempos, statistics.mean(acordadas_por_segundo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessoes", type=int, default=5)
+    parser.add_argument("--rodadas", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=3)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_controle_"))
+    print(f"{args.sessoes} sessões, {args.rodadas} rodadas\n")
+    for rotulo, classe in (
+        ("antes (1 em 1 segundo)", MotorEsperaAntiga),
+        ("ControleExecucao", MotorSemLog),
+    ):
+        tempos, acordou = medir(
+            classe, args.sessoes, args.rodadas, random.Random(args.semente)
+        )
+        print(f"  {rotulo}")
+        for acao, amostras in tempos.items():
+            print(
+                f"    {acao:<22} mediana {statistics.median(amostras) * 1000:7.1f}ms "
+                f"| pior {max(amostras) * 1000:7.1f}ms | n={len(amostras)}"
+            )
+        print(f"    Acordadas por segundo, pausado: {acordou:.1f}\n")
+
+
+if __name__ == "__main__":
+    main()
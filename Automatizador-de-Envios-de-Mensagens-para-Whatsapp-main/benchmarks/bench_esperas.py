@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: latência por contato com sleeps fixos (jeito antigo) x esperas por evento
+Roda contra o WhatsApp falso local, não precisa de celular nem internet
+
+Uso: python benchmarks/bench_esperas.py [--contatos 10] [--visivel]
+"""
+
+import argparse
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from apoio import (
+    automatizador,
+    abrir_chrome_teste,
+    criar_app_sem_tela,
+    resumo_tempos,
+)
+from whatsapp_falso import iniciar_servidor
+
+
+def mandar_jeito_antigo(navegador, url_base, numero, texto):
+    """Mesma sequência do mandar_mensagem antigo, com todos os sleeps fixos"""
+    navegador.get(f"{url_base}/send?phone={numero}")
+    time.sleep(8)
+
+    for seletor in automatizador.SELETORES_NUMERO_INVALIDO_PAGINA:
+        elementos = navegador.find_elements(By.XPATH, seletor)
+        if elementos and any(elem.is_displayed() for elem in elementos):
+            return False
+
+    try:
+        WebDriverWait(navegador, 3).until(
+            EC.element_to_be_clickable((By.XPATH, automatizador.XPATH_POPUP_WEB))
+        ).click()
+        time.sleep(3)
+    except TimeoutException:
+        pass
+
+    campo = WebDriverWait(navegador, 20).until(
+        EC.presence_of_element_located((By.XPATH, automatizador.XPATH_CAMPO_TEXTO))
+    )
+    campo.clear()
+    campo.click()
+    time.sleep(0.5)
+    time.sleep(0.3)  # sleep que ficava dentro do inserir_texto_com_emojis
+    automatizador.inserir_texto_com_emojis(navegador, campo, texto)
+    time.sleep(0.5)  # idem
+    time.sleep(1)
+    campo.send_keys(Keys.ENTER)
+    time.sleep(2)
+    time.sleep(3)
+    return True
+
+
+def medir(nome, funcao, numeros):
+    tempos = []
+    for numero in numeros:
+        inicio = time.perf_counter()
+        funcao(numero)
+        tempos.append(time.perf_counter() - inicio)
+    print(f"  {nome:<18} {resumo_tempos(tempos)}")
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contatos", type=int, default=10)
+    parser.add_argument("--atraso-carga", type=int, default=1500)
+    parser.add_argument("--atraso-envio", type=int, default=400)
+    parser.add_argument("--visivel", action="store_true")
+    args = parser.parse_args()
+
+    servidor, url_base = iniciar_servidor(
+        {
+            "atraso_carga_ms": args.atraso_carga,
+            "atraso_envio_ms": args.atraso_envio,
+        }
+    )
+    navegador = abrir_chrome_teste(args.visivel)
+    app = criar_app_sem_tela(url_base)
+    texto = "Mensagem de benchmark 🚀"
+    numeros = [f"55619{i:08d}" for i in range(1, args.contatos + 1)]
+
+    print(
+        f"WhatsApp falso em {url_base} (carga {args.atraso_carga}ms, "
+        f"envio {args.atraso_envio}ms), {args.contatos} contatos\n"
+    )
+
+    try:
+        antes = medir(
+            "antes (sleeps)",
+            lambda n: mandar_jeito_antigo(navegador, url_base, n, texto),
+            numeros,
+        )
+        depois = medir(
+            "depois (eventos)",
+            lambda n: app.mandar_mensagem(navegador, n, texto),
+            numeros,
+        )
+        invalido = medir(
+            "número inválido",
+            lambda n: app.mandar_mensagem(navegador, n, texto),
+            ["5561999990000"] * 3,
+        )
+
+        ganho = sum(antes) / len(antes) - sum(depois) / len(depois)
+        print(f"\n  Economia por contato: {ganho:.2f}s")
+        print(f"  Inválido detectado em média {sum(invalido) / len(invalido):.2f}s")
+    finally:
+        navegador.quit()
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da tabela de destinatários: tempo até a tela responder depois de
+carregar 10 mil, 100 mil e 1 milhão de telefones
+  antes: um Treeview.insert por telefone (como era no carregar planilha)
+  depois: GradeDestinatarios (só as linhas visíveis existem no Tk)
+Também mede quanto custa rolar a grade e marcar status durante o envio
+
+Precisa de tela (no Linux sem tela, roda com xvfb-run)
+Uso: python benchmarks/bench_grade.py [--tamanhos 10000 100000 1000000]
+"""
+
+import argparse
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from apoio import importar_tela
+
+tela = importar_tela()
+
+
+def pronto(janela):
+    """Processa tudo que tá pendente no Tk: daqui pra frente a tela responde"""
+    janela.update()
+
+
+def jeito_antigo(janela, telefones):
+    frame = ttk.Frame(janela)
+    frame.pack(fill="both", expand=True)
+    tree = ttk.Treeview(frame, columns=("msisdn",), show="headings", height=8)
+    tree.heading("msisdn", text="Telefones Normalizados")
+    tree.pack(fill="both", expand=True)
+
+    inicio = time.perf_counter()
+    for msisdn in telefones:
+        tree.insert("", "end", values=(msisdn,))
+    pronto(janela)
+    duracao = time.perf_counter() - inicio
+
+    inicio_limpeza = time.perf_counter()
+    for item in tree.get_children():
+        tree.delete(item)
+    pronto(janela)
+    limpeza = time.perf_counter() - inicio_limpeza
+
+    frame.destroy()
+    return duracao, limpeza
+
+
+def jeito_novo(janela, telefones):
+    frame = ttk.Frame(janela)
+    frame.pack(fill="both", expand=True)
+    frame.columnconfigure(0, weight=1)
+    frame.rowconfigure(0, weight=1)
+    grade = tela.GradeDestinatarios(frame)
+    grade.grid(row=0, column=0, sticky="ewns")
+    pronto(janela)
+
+    inicio = time.perf_counter()
+    grade.carregar(telefones)
+    pronto(janela)
+    duracao = time.perf_counter() - inicio
+
+    # Rolar pela lista inteira em 200 saltos
+    inicio_rolagem = time.perf_counter()
+    for passo in range(200):
+        grade.rolar("moveto", passo / 200)
+        pronto(janela)
+    rolagem = (time.perf_counter() - inicio_rolagem) / 200
+
+    # Status ao vivo: marcar todos os visíveis e redesenhar
+    inicio_status = time.perf_counter()
+    for indice in range(grade.inicio, grade.inicio + grade.qtd_linhas):
+        grade.marcar(indice, tela.ENVIADO)
+    grade.desenhar()
+    pronto(janela)
+    status = time.perf_counter() - inicio_status
+
+    frame.destroy()
+    return duracao, rolagem, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--tamanhos", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument(
+        "--max-antigo",
+        type=int,
+        default=100000,
+        help="acima disso o jeito antigo não é medido (demora demais)",
+    )
+    args = parser.parse_args()
+
+    janela = tk.Tk()
+    janela.geometry("700x400")
+
+    try:
+        for tamanho in args.tamanhos:
+            telefones = [f"55619{i:08d}" for i in range(tamanho)]
+            print(f"  {tamanho:,} telefones:")
+
+            if tamanho <= args.max_antigo:
+                duracao, limpeza = jeito_antigo(janela, telefones)
+                print(
+                    f"    antes  (insert por linha)  pronto em {duracao:.2f}s "
+                    f"(+{limpeza:.2f}s pra apagar na próxima carga)"
+                )
+            else:
+                print("    antes  (insert por linha)  pulado (--max-antigo)")
+
+            duracao, rolagem, status = jeito_novo(janela, telefones)
+            print(
+                f"    depois (grade virtual)     pronto em {duracao * 1000:.1f}ms | "
+                f"rolar {rolagem * 1000:.1f}ms | marcar status {status * 1000:.1f}ms"
+            )
+    finally:
+        janela.destroy()
+
+
+if __name__ == "__main__":
+    main()
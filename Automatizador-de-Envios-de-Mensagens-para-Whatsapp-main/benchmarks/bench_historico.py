@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark do histórico: salvar_no_historico (abre/fecha o CSV a cada
+envio) x GravadorHistorico (fila + thread + lotes) em CSV, JSON Lines e SQLite
+Mede escritas por segundo pra N resultados sintéticos, com 1 e com várias
+threads registrando ao mesmo tempo (como no pool de sessões)
+
+Uso: python benchmarks/bench_historico.py [--linhas 100000] [--threads 4]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from apoio import automatizador
+
+
+def resultados(qtd, deslocamento=0):
+    for i in range(qtd):
+        yield (
+            f"55619{i + deslocamento:08d}",
+            "✅ Sucesso" if i % 10 else "❌ Falha",
+            "Mensagem de benchmark",
+            "Mensagem enviada com sucesso",
+        )
+
+
+def rodar_em_threads(funcao, qtd_linhas, qtd_threads):
+    por_thread = qtd_linhas // qtd_threads
+
+    def trabalho(numero):
+        for resultado in resultados(por_thread, numero * por_thread):
+            funcao(*resultado)
+
+    threads = [threading.Thread(target=trabalho, args=(n,)) for n in range(qtd_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return por_thread * qtd_threads
+
+
+def medir(nome, qtd_linhas, qtd_threads, criar):
+    """criar() devolve (funcao_registrar, funcao_fechar)"""
+    registrar, fechar = criar()
+    inicio = time.perf_counter()
+    total = rodar_em_threads(registrar, qtd_linhas, qtd_threads)
+    fim_registro = time.perf_counter()
+    fechar()
+    fim = time.perf_counter()
+
+    print(
+        f"  {nome:<28} {total / (fim - inicio):>10,.0f} escritas/s "
+        f"(quem registra fica preso {fim_registro - inicio:.2f}s, total {fim - inicio:.2f}s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_historico_"))
+    print(f"{args.linhas:,} resultados sintéticos em {os.getcwd()}\n")
+
+    for qtd_threads in sorted({1, args.threads}):
+        print(f"{qtd_threads} thread(s) registrando:")
+        medir(
+            "salvar_no_historico (antigo)",
+            args.linhas,
+            qtd_threads,
+            lambda: (automatizador.salvar_no_historico, lambda: None),
+        )
+
+        for formato in automatizador.FORMATOS_HISTORICO:
+            for fsync in ("so_no_fim", "a_cada_flush"):
+
+                def criar(formato=formato, fsync=fsync):
+                    gravador = automatizador.GravadorHistorico(
+                        f"historico_{formato}_{fsync}_{qtd_threads}",
+                        formato=formato,
+                        fsync=fsync,
+                    )
+                    return gravador.registrar, gravador.fechar
+
+                medir(f"Gravador {formato} ({fsync})", args.linhas, qtd_threads, criar)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da partida: quanto tempo leva só pra importar cada ponto de entrada
+(janela x motor x linha de comando) e se o tkinter e o pandas vieram junto
+Cada medida é um processo Python novo, sem cache de import em memória
+
+Uso: python benchmarks/bench_inicio.py [--repeticoes 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from apoio import PASTA_PROJETO
+
+MODULOS = (
+    ("janela (Tk)", "WhatsApp_Automatizador_CODIGO_COMPLETO"),
+    ("motor", "whatsapp_motor"),
+    ("linha de comando", "whatsapp_cli"),
+)
+
+MEDIR = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(json.dumps([duracao, "tkinter" in sys.modules, "pandas" in sys.modules]))
+"""
+
+
+def medir(modulo, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", MEDIR.format(modulo=modulo)],
+            cwd=PASTA_PROJETO,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        duracao, tkinter, pandas = json.loads(saida.stdout)
+        tempos.append(duracao)
+    return statistics.median(tempos), tkinter, pandas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Mediana de {args.repeticoes} processos por ponto de entrada\n")
+    for nome, modulo in MODULOS:
+        duracao, tkinter, pandas = medir(modulo, args.repeticoes)
+        print(
+            f"  {nome:<18} {duracao * 1000:6.0f}ms | tkinter: "
+            f"{'sim' if tkinter else 'não'} | pandas: {'sim' if pandas else 'não'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
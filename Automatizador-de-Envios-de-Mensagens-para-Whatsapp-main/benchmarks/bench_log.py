@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do log: a tela continua respondendo com uma enxurrada de linhas?
+Threads jogam N linhas por segundo no escrever_log enquanto a thread do Tk
+mede o atraso de um "tique" agendado a cada 10ms (atraso alto = tela travada)
+
+  antes: uma linha por vez no console + update_idletasks a cada linha
+         (rodando na thread do Tk, porque de outra thread nem é seguro)
+  depois: fila + drenar_log em lote + console limitado a MAX_LINHAS_CONSOLE
+
+Precisa de tela (no Linux sem tela, roda com xvfb-run)
+Uso: python benchmarks/bench_log.py [--linhas-por-segundo 10000] [--segundos 5]
+"""
+
+import argparse
+import queue
+import statistics
+import threading
+import time
+import tkinter as tk
+from tkinter import scrolledtext
+
+from apoio import importar_tela
+
+tela = importar_tela()
+
+TIQUE_MS = 10
+
+
+def criar_app_com_console(janela):
+    app = tela.AutomatizadorWhatsApp.__new__(tela.AutomatizadorWhatsApp)
+    app.janela = janela
+    app.logs_ja_mostrados = set()
+    app.fila_log = queue.SimpleQueue()
+    app.log_arquivo = None
+    app.console_auditoria = scrolledtext.ScrolledText(janela, height=10)
+    app.console_auditoria.pack(fill="both", expand=True)
+    for tipo, cor in (("info", "blue"), ("success", "green"), ("error", "red")):
+        app.console_auditoria.tag_configure(tipo, foreground=cor)
+    return app
+
+
+def escrever_jeito_antigo(app, mensagem, tipo="info"):
+    linha = f"[{time.strftime('%H:%M:%S')}] {mensagem}\n"
+    app.console_auditoria.insert(tk.END, linha, tipo)
+    app.console_auditoria.see(tk.END)
+    app.janela.update_idletasks()
+
+
+def medir_cenario(nome, linhas_por_segundo, segundos, qtd_threads, antigo):
+    janela = tk.Tk()
+    janela.geometry("800x400")
+    app = criar_app_com_console(janela)
+    atrasos = []
+    fim = time.perf_counter() + segundos
+    enviadas = [0]
+
+    def tique(esperado):
+        agora = time.perf_counter()
+        atrasos.append(agora - esperado)
+        if agora < fim:
+            janela.after(TIQUE_MS, tique, time.perf_counter() + TIQUE_MS / 1000)
+        else:
+            janela.quit()
+
+    trava = threading.Lock()
+
+    def produtor(numero):
+        tela.PREFIXO_LOG.set(f"[S{numero}] ")
+        por_thread = linhas_por_segundo / qtd_threads
+        inicio = time.perf_counter()
+        feitas = 0
+        while time.perf_counter() < fim:
+            devidas = int((time.perf_counter() - inicio) * por_thread)
+            while feitas < devidas:
+                app.escrever_log(f"✅ Sucesso: 55619{feitas:08d}", "success")
+                feitas += 1
+            time.sleep(0.001)
+        with trava:
+            enviadas[0] += feitas
+
+    def produtor_antigo():
+        # Mesmo ritmo, mas cada linha entra direto no console na thread do Tk
+        inicio = time.perf_counter()
+        while time.perf_counter() < fim:
+            devidas = int((time.perf_counter() - inicio) * linhas_por_segundo)
+            lote = 0
+            while enviadas[0] < devidas and lote < 200:
+                escrever_jeito_antigo(app, f"✅ Sucesso: 55619{enviadas[0]:08d}")
+                enviadas[0] += 1
+                lote += 1
+            janela.update()
+
+    janela.after(TIQUE_MS, tique, time.perf_counter() + TIQUE_MS / 1000)
+    if antigo:
+        janela.after(0, produtor_antigo)
+    else:
+        app.drenar_log()
+        for numero in range(1, qtd_threads + 1):
+            threading.Thread(target=produtor, args=(numero,), daemon=True).start()
+
+    janela.mainloop()
+    linhas_console = int(app.console_auditoria.index("end-1c").split(".")[0]) - 1
+    janela.destroy()
+
+    atrasos_ms = sorted(atraso * 1000 for atraso in atrasos)
+    p99 = atrasos_ms[int(len(atrasos_ms) * 0.99) - 1] if atrasos_ms else 0
+    print(
+        f"  {nome:<34} {enviadas[0] / segundos:>8,.0f} linhas/s | atraso da tela: "
+        f"mediana {statistics.median(atrasos_ms):.1f}ms, p99 {p99:.1f}ms, "
+        f"pior {atrasos_ms[-1]:.1f}ms | console com {linhas_console:,} linhas"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas-por-segundo", type=int, default=10000)
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    print(
+        f"{args.linhas_por_segundo:,} linhas/s por {args.segundos:.0f}s "
+        f"(tique de {TIQUE_MS}ms)\n"
+    )
+    medir_cenario(
+        "antes (insert + update por linha)",
+        args.linhas_por_segundo,
+        args.segundos,
+        1,
+        antigo=True,
+    )
+    medir_cenario(
+        f"depois (fila + lote, {args.threads} threads)",
+        args.linhas_por_segundo,
+        args.segundos,
+        args.threads,
+        antigo=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
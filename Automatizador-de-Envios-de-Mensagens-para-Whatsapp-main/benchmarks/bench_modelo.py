@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: montar a mensagem personalizada de 1 milhão de destinatários
+Jeito ingênuo (re.sub no texto pra cada destinatário) x ModeloMensagem
+compilado uma vez e montado em lote, conferindo que dão o mesmo texto
+
+Uso: python benchmarks/bench_modelo.py [--destinatarios 1000000]
+"""
+
+import argparse
+import re
+import time
+
+from apoio import automatizador
+
+TEXTO = (
+    "Olá {Nome}! 👋\n\n"
+    "Seu boleto de R$ {Valor} vence em {Vencimento}.\n"
+    "Qualquer dúvida é só responder aqui, {Nome}."
+)
+
+
+def montar_ingenuo(texto, colunas, total):
+    """Uma regex por destinatário, procurando a coluna a cada variável"""
+    padrao = re.compile(r"\{([^{}]+)\}")
+    mensagens = []
+    for indice in range(total):
+        mensagens.append(
+            padrao.sub(lambda achado: colunas[achado.group(1)][indice], texto)
+        )
+    return mensagens
+
+
+def medir(nome, funcao, total):
+    inicio = time.perf_counter()
+    mensagens = funcao()
+    duracao = time.perf_counter() - inicio
+    print(
+        f"  {nome:<22} {duracao:6.2f}s | {total / duracao / 1e6:5.2f} milhões de "
+        f"mensagens/s"
+    )
+    return mensagens, duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--destinatarios", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    total = args.destinatarios
+    colunas = {
+        "Nome": [f"Cliente {i}" for i in range(total)],
+        "Valor": [f"{i % 1000},{i % 100:02d}" for i in range(total)],
+        "Vencimento": [f"{i % 28 + 1:02d}/11/2026" for i in range(total)],
+    }
+    print(f"{total:,} destinatários, {len(colunas)} variáveis\n")
+
+    ingenuo, tempo_ingenuo = medir(
+        "re.sub por destinatário",
+        lambda: montar_ingenuo(TEXTO, colunas, total),
+        total,
+    )
+
+    inicio = time.perf_counter()
+    modelo = automatizador.ModeloMensagem(TEXTO)
+    compilar = time.perf_counter() - inicio
+    em_lote, tempo_lote = medir(
+        "modelo em lote",
+        lambda: modelo.renderizar_em_lote(colunas, total),
+        total,
+    )
+
+    assert ingenuo == em_lote, "os dois jeitos deram mensagens diferentes!"
+    print(f"\n  Compilar o modelo: {compilar * 1e6:.0f}µs")
+    print(f"  Em lote é {tempo_ingenuo / tempo_lote:.1f}x mais rápido (mesmo texto)")
+
+
+if __name__ == "__main__":
+    main()
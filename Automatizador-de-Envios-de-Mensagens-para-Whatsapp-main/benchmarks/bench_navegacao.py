@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark A/B: recarregar a página inteira por contato x trocar de conversa
+dentro do WhatsApp já carregado (pushState + popstate)
+Roda contra o WhatsApp falso local, que simula o custo do boot da SPA
+O falso reage ao popstate de propósito (roteador_interno): isso mede o ganho
+se a troca pegar, não prova que o WhatsApp de verdade aceita a troca
+
+Uso: python benchmarks/bench_navegacao.py [--contatos 10] [--atraso-boot 2500]
+"""
+
+import argparse
+import time
+
+from apoio import abrir_chrome_teste, criar_app_sem_tela, resumo_tempos
+from whatsapp_falso import iniciar_servidor
+
+
+def rodar_cenario(nome, config_pagina, navegacao_interna, numeros, visivel):
+    servidor, url_base = iniciar_servidor(config_pagina)
+    navegador = abrir_chrome_teste(visivel)
+    app = criar_app_sem_tela(url_base, navegacao_interna=navegacao_interna)
+
+    try:
+        # Primeiro contato sempre paga a carga completa, fica fora da conta
+        app.mandar_mensagem(navegador, numeros[0], "aquecendo")
+
+        tempos = []
+        falhas = 0
+        for numero in numeros[1:]:
+            inicio = time.perf_counter()
+            if not app.mandar_mensagem(navegador, numero, "Mensagem de benchmark"):
+                falhas += 1
+            tempos.append(time.perf_counter() - inicio)
+
+        print(f"  {nome:<32} {resumo_tempos(tempos)} | falhas {falhas}")
+        return tempos
+    finally:
+        navegador.quit()
+        servidor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contatos", type=int, default=10)
+    parser.add_argument("--atraso-boot", type=int, default=2500)
+    parser.add_argument("--atraso-carga", type=int, default=300)
+    parser.add_argument("--visivel", action="store_true")
+    args = parser.parse_args()
+
+    config = {
+        "atraso_boot_ms": args.atraso_boot,
+        "atraso_carga_ms": args.atraso_carga,
+    }
+    numeros = [f"55619{i:08d}" for i in range(1, args.contatos + 2)]
+
+    print(
+        f"SPA falsa: boot {args.atraso_boot}ms, abrir conversa {args.atraso_carga}ms, "
+        f"{args.contatos} contatos por cenário\n"
+    )
+
+    a = rodar_cenario("A: get() por contato", config, False, numeros, args.visivel)
+    b = rodar_cenario("B: troca sem recarregar", config, True, numeros, args.visivel)
+    rodar_cenario(
+        "C: troca ligada, SPA sem roteador",
+        dict(config, roteador_interno=False),
+        True,
+        numeros,
+        args.visivel,
+    )
+
+    print(f"\n  B economiza {sum(a) / len(a) - sum(b) / len(b):.2f}s por contato")
+
+
+if __name__ == "__main__":
+    main()
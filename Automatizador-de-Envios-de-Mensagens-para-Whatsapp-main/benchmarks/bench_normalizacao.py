@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da limpeza da lista: limpar_lista_telefones (um re.sub por linha)
+x limpar_lista_telefones_em_lote (pandas/NumPy), em linhas por segundo
+A lista misturada (int + texto + vazio, do jeito que o Excel entrega) vai
+número a número nas duas; que elas dão o mesmo resultado quem garante é o
+tests/test_normalizacao.py
+
+Uso: python benchmarks/bench_normalizacao.py [--linhas 1000000]
+"""
+
+import argparse
+import random
+import time
+
+from apoio import automatizador
+
+
+def gerar_lista(qtd, perfil):
+    sorteio = random.Random(42)
+    lista = []
+    for i in range(qtd):
+        numero = f"619{sorteio.randrange(10**8):08d}"
+        if perfil == "limpa":
+            lista.append("55" + numero)
+        elif perfil == "formatada":
+            lista.append(f"({numero[:2]}) {numero[2:7]}-{numero[7:]}")
+        else:  # misturada: do jeito que vem de planilha de verdade
+            lista.append(
+                sorteio.choice(
+                    [
+                        int("55" + numero),
+                        "55" + numero,
+                        numero,
+                        f"+55 {numero}",
+                        "",
+                        None,
+                    ]
+                )
+            )
+    return lista
+
+
+def medir(nome, funcao, lista):
+    inicio = time.perf_counter()
+    resultado = funcao(lista)
+    duracao = time.perf_counter() - inicio
+    print(f"    {nome:<8} {len(lista) / duracao:>12,.0f} linhas/s ({duracao:.2f}s)")
+    return resultado, duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, default=1000000)
+    args = parser.parse_args()
+
+    for perfil in ("limpa", "formatada", "misturada"):
+        lista = gerar_lista(args.linhas, perfil)
+        print(f"  Lista {perfil} ({args.linhas:,} linhas):")
+        normal, t_normal = medir("normal", automatizador.limpar_lista_telefones, lista)
+        lote, t_lote = medir(
+            "lote", automatizador.limpar_lista_telefones_em_lote, lista
+        )
+        assert normal == lote, "resultado diferente na lista grande!"
+        print(f"    {t_normal / t_lote:.1f}x mais rápido\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do modo por parágrafo: parte por parte (colar, ENTER e esperar o
+check de cada uma, tudo pelo WebDriver) x todas as partes num script só
+Conta as idas ao chromedriver e o tempo por mensagem, e confere se as bolhas
+saíram na ordem certa
+
+Uso: python benchmarks/bench_paragrafos.py [--partes 5] [--mensagens 5] [--visivel]
+"""
+
+import argparse
+import time
+
+from apoio import (
+    abrir_chrome_teste,
+    criar_app_sem_tela,
+    resumo_tempos,
+    ContadorIdas,
+)
+from whatsapp_falso import iniciar_servidor
+
+JS_TEXTOS_BOLHAS = """
+return Array.from(document.querySelectorAll('div.message-out'))
+    .slice(-arguments[0]).map(function (bolha) { return bolha.innerText.trim(); });
+"""
+
+
+def rodar(nome, app, navegador, contador, numeros, partes):
+    texto = "\n\n".join(partes)
+    tempos = []
+    idas = 0
+    fora_de_ordem = 0
+
+    for numero in numeros:
+        contador.zerar()
+        inicio = time.perf_counter()
+        resultado = app.mandar_mensagem(navegador, numero, texto)
+        tempos.append(time.perf_counter() - inicio)
+        idas += contador.total
+
+        assert resultado, f"{nome}: falhou pra {numero} ({resultado.observacao})"
+        if navegador.execute_script(JS_TEXTOS_BOLHAS, len(partes)) != partes:
+            fora_de_ordem += 1
+
+    print(
+        f"  {nome:<16} {resumo_tempos(tempos)} | {idas / len(numeros):.1f} idas/mensagem "
+        f"| fora de ordem: {fora_de_ordem}"
+    )
+    return idas / len(numeros)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--partes", type=int, default=5)
+    parser.add_argument("--mensagens", type=int, default=5)
+    parser.add_argument("--atraso-envio", type=int, default=300)
+    parser.add_argument("--visivel", action="store_true")
+    args = parser.parse_args()
+
+    servidor, url_base = iniciar_servidor(
+        {
+            "atraso_boot_ms": 300,
+            "atraso_carga_ms": 200,
+            "atraso_envio_ms": args.atraso_envio,
+        }
+    )
+    navegador = abrir_chrome_teste(args.visivel)
+    contador = ContadorIdas(navegador)
+    app = criar_app_sem_tela(url_base, enviar_tudo_junto=False)
+    partes = [f"Parágrafo {i} 🚀" for i in range(1, args.partes + 1)]
+    numeros = [f"55619{i:08d}" for i in range(1, args.mensagens + 1)]
+
+    print(
+        f"{args.partes} parágrafos por mensagem, {args.mensagens} mensagens, "
+        f"check depois de {args.atraso_envio}ms\n"
+    )
+
+    try:
+        em_lote = app.enviar_partes_em_lote
+        app.enviar_partes_em_lote = lambda navegador, partes, resultado: None
+        antes = rodar("parte por parte", app, navegador, contador, numeros, partes)
+
+        app.enviar_partes_em_lote = em_lote
+        depois = rodar("script único", app, navegador, contador, numeros, partes)
+
+        print(f"\n  {antes - depois:.1f} idas a menos por mensagem")
+    finally:
+        navegador.quit()
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de ponta a ponta: a campanha inteira pelo motor (Chrome, login com
+QR Code, pool de sessões, envio, repetição de falhas, histórico e banco)
+contra o WhatsApp falso, em cenários com mais ou menos latência e falha
+Mostra contatos por hora, o tempo de cada fase (p50/p95/p99), CPU e memória
+dos Chromes e do Python, e confere no servidor que ninguém recebeu duas vezes
+
+Uso: python benchmarks/bench_ponta_a_ponta.py [--cenarios rapido realista instavel]
+     [--contatos 20] [--sessoes 1] [--recarregar] [--assincrono]
+     [--json resultado.json]
+"""
+
+import argparse
+import collections
+import functools
+import json
+import os
+import resource
+import tempfile
+import threading
+import time
+
+from apoio import automatizador, abrir_chrome_teste, criar_app_sem_tela
+from whatsapp_falso import CENARIOS, CONFIG_PADRAO, iniciar_servidor
+
+# Quanto esperar antes de dar a conversa/envio como falho: no falso tudo
+# abre em segundos, então não precisa do teto de 30s do WhatsApp de verdade
+LIMITES_BENCH = {"tela_inicial": 20, "conversa": 8, "troca_interna": 4, "envio": 5}
+
+
+class AmostradorRecursos(threading.Thread):
+    """
+    A cada intervalo soma CPU e RAM dos Chromes de todas as sessões e anota
+    quantas threads o Python tem
+    """
+
+    def __init__(self, app, intervalo=1.0):
+        super().__init__(daemon=True)
+        self.app = app
+        self.intervalo = intervalo
+        self.parar = threading.Event()
+        self.cpu = []
+        self.rss_mb = []
+        self.threads_max = threading.active_count()
+        self._medidores = {}
+
+    def run(self):
+        while not self.parar.wait(self.intervalo):
+            self.threads_max = max(self.threads_max, threading.active_count())
+            cpu = rss = 0.0
+            medidos = 0
+            for sessao in list(self.app.sessoes):
+                navegador = sessao.navegador
+                if navegador is None:
+                    continue
+                medidor = self._medidores.get(id(navegador))
+                if medidor is None:
+                    medidor = automatizador.MedidorRecursos(navegador)
+                    self._medidores[id(navegador)] = medidor
+                medida = medidor.medir()
+                if medida:
+                    cpu += medida[0]
+                    rss += medida[1]
+                    medidos += 1
+            if medidos:
+                self.cpu.append(cpu)
+                self.rss_mb.append(rss)
+
+
+def tempo_de_login(percentis):
+    """Pior login de uma sessão (abrir página + tela inicial + QR Code)"""
+    fases = ("login_abrir_pagina", "login_tela_inicial", "login_qr")
+    return sum(percentis[fase]["max"] for fase in fases if fase in percentis)
+
+
+def rodar_cenario(nome, args):
+    config_servidor = dict(CENARIOS[nome], semente=args.semente)
+    servidor, url_base = iniciar_servidor(config_servidor)
+    pasta = tempfile.mkdtemp(prefix=f"bench_e2e_{nome}_")
+    os.chdir(pasta)  # histórico e métricas de cada cenário na sua pasta
+
+    app = criar_app_sem_tela(url_base, navegacao_interna=not args.recarregar)
+    app.config.qtd_sessoes = args.sessoes
+    app.config.assincrono = args.assincrono
+    app.config.limites_espera.update(LIMITES_BENCH)
+    app.configurar_chrome = lambda perfil=None: abrir_chrome_teste(args.visivel)
+    app.banco = automatizador.BancoCampanhas(os.path.join(pasta, "campanhas.db"))
+
+    # Um em cada 10 sem WhatsApp (o falso diz que é inválido)
+    numeros = [
+        f"55619{i:04d}0000" if i % 10 == 0 else f"55619{i:08d}"
+        for i in range(1, args.contatos + 1)
+    ]
+    app.usar_lista(numeros, arquivo=f"bench_{nome}")
+
+    amostrador = AmostradorRecursos(app)
+    amostrador.start()
+    cpu_python = time.process_time()
+    inicio = time.perf_counter()
+    try:
+        placar = app.rodar_campanha("Mensagem de benchmark 🚀")
+        duracao = time.perf_counter() - inicio
+        cpu_python = time.process_time() - cpu_python
+    finally:
+        amostrador.parar.set()
+        amostrador.join()
+        medidor = app.medidor
+        app.encerrar()
+        app.banco.fechar()
+
+    time.sleep(1)  # os avisos de "recebida" da página chegam por último
+    servidor.shutdown()
+    if placar is None:
+        raise SystemExit(f"{nome}: nenhuma sessão logou no WhatsApp falso")
+
+    por_telefone = collections.Counter(telefone for telefone, _ in servidor.recebidas)
+    duplicados = {telefone: n for telefone, n in por_telefone.items() if n > 1}
+    assert not duplicados, f"{nome}: contato recebeu mais de uma vez: {duplicados}"
+
+    percentis = medidor.percentis()
+    login = tempo_de_login(percentis)
+    return {
+        "cenario": nome,
+        "config": {**CONFIG_PADRAO, **config_servidor},
+        "contatos": len(numeros),
+        "sessoes": args.sessoes,
+        "assincrono": args.assincrono,
+        "duracao_s": round(duracao, 2),
+        "login_s": round(login, 2),
+        "contatos_por_hora": round(placar.processados / duracao * 3600, 1),
+        "contatos_por_hora_sem_login": round(
+            placar.processados / max(duracao - login, 1e-9) * 3600, 1
+        ),
+        "sucessos": placar.sucessos,
+        "sem_whatsapp": placar.numeros_invalidos,
+        "falhas": placar.falhas,
+        "por_desfecho": {
+            desfecho.value: quantos for desfecho, quantos in placar.por_desfecho.items()
+        },
+        "repeticoes": placar.repeticoes,
+        "recuperados": placar.recuperados,
+        "recebidas_no_servidor": len(servidor.recebidas),
+        "cargas_de_pagina": servidor.contagem["cargas"],
+        "qr_escaneados": servidor.contagem["escaneados"],
+        "chrome_cpu_media": (
+            round(sum(amostrador.cpu) / len(amostrador.cpu), 1)
+            if amostrador.cpu
+            else None
+        ),
+        "chrome_rss_max_mb": (
+            round(max(amostrador.rss_mb)) if amostrador.rss_mb else None
+        ),
+        "python_cpu": round(cpu_python / duracao * 100, 1),
+        "python_rss_max_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        ),
+        "python_threads_max": amostrador.threads_max,
+        "fases": {
+            fase: {chave: round(valor, 4) for chave, valor in numeros_fase.items()}
+            for fase, numeros_fase in percentis.items()
+        },
+    }
+
+
+def imprimir(resultado):
+    print(
+        f"  {resultado['cenario']}: {resultado['contatos_por_hora']:.0f} contatos/h "
+        f"({resultado['contatos_por_hora_sem_login']:.0f} sem contar o login de "
+        f"{resultado['login_s']:.1f}s) | {resultado['duracao_s']:.1f}s no total"
+    )
+    print(
+        f"      ok {resultado['sucessos']} | sem WhatsApp {resultado['sem_whatsapp']} "
+        f"| falhas {resultado['falhas']} | repetições {resultado['repeticoes']} "
+        f"(recuperados {resultado['recuperados']}) | recebidas no servidor "
+        f"{resultado['recebidas_no_servidor']} | cargas de página "
+        f"{resultado['cargas_de_pagina']}"
+    )
+    if resultado["chrome_cpu_media"] is not None:
+        print(
+            f"      Chrome: CPU média {resultado['chrome_cpu_media']:.1f}% | RAM máx "
+            f"{resultado['chrome_rss_max_mb']} MB",
+            end="",
+        )
+    else:
+        print("      Chrome: sem psutil, CPU/RAM não medidos", end="")
+    print(
+        f" || Python: CPU {resultado['python_cpu']:.1f}% | RAM máx "
+        f"{resultado['python_rss_max_mb']} MB | threads {resultado['python_threads_max']}"
+    )
+    for fase, rotulo in automatizador.FASES_MEDIDAS:
+        numeros = resultado["fases"].get(fase)
+        if numeros:
+            print(
+                f"      {rotulo:<30} n={numeros['n']:<4} p50 {numeros['p50']:6.2f}s "
+                f"p95 {numeros['p95']:6.2f}s p99 {numeros['p99']:6.2f}s"
+            )
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--cenarios",
+        nargs="+",
+        choices=sorted(CENARIOS),
+        default=["rapido", "realista", "instavel"],
+    )
+    parser.add_argument("--contatos", type=int, default=20)
+    parser.add_argument("--sessoes", type=int, default=1)
+    parser.add_argument(
+        "--recarregar",
+        action="store_true",
+        help="recarrega a página a cada contato (sem troca interna)",
+    )
+    parser.add_argument(
+        "--assincrono",
+        action="store_true",
+        help="sessões num event loop só, pelo DevTools (precisa do websockets)",
+    )
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--espera-repeticao", type=float, default=1)
+    parser.add_argument("--json", help="salva os números de cada cenário nesse arquivo")
+    parser.add_argument("--visivel", action="store_true")
+    args = parser.parse_args()
+
+    automatizador.FilaTrabalho = functools.partial(
+        automatizador.FilaTrabalho, espera_inicial=args.espera_repeticao
+    )
+    saida_json = os.path.abspath(args.json) if args.json else None
+
+    print(
+        f"{args.contatos} contatos, {args.sessoes} sessão(ões), "
+        f"{'recarregando a página' if args.recarregar else 'troca interna'}, "
+        f"{'assíncrono' if args.assincrono else 'thread por sessão'}, "
+        f"semente {args.semente}\n"
+    )
+    resultados = []
+    for nome in args.cenarios:
+        resultado = rodar_cenario(nome, args)
+        imprimir(resultado)
+        resultados.append(resultado)
+
+    if saida_json:
+        with open(saida_json, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+        print(f"  Números salvos em {saida_json}")
+
+
+if __name__ == "__main__":
+    main()
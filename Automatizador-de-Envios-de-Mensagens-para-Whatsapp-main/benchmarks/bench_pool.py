@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do pool de sessões: vazão com 1, 2, ... N Chromes puxando da mesma fila
+
+Dois modos:
+  --modo falso   navegadores de mentira e envio simulado (testa a fila, o placar,
+                 o ritmo por sessão e a repetição de falhas em segundos, sem
+                 Chrome): 1 em cada 5 contatos falha na primeira tentativa e um
+                 falha sempre
+  --modo chrome  N Chromes headless de verdade contra o WhatsApp falso local
+
+Uso: python benchmarks/bench_pool.py [--modo falso] [--sessoes 4] [--contatos 40]
+"""
+
+import argparse
+import collections
+import csv
+import functools
+import os
+import tempfile
+import time
+
+from apoio import automatizador, abrir_chrome_teste, criar_app_sem_tela
+from whatsapp_falso import iniciar_servidor
+
+
+class NavegadorFalso:
+    """Só o que o pool chama no navegador fora do mandar_mensagem"""
+
+    def __init__(self, perfil=None):
+        self.perfil = perfil
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+def rodar(app, numeros, qtd_sessoes, pausa):
+    app.lista_telefones = list(numeros)
+    app.indice_atual = 0
+    app.indices_concluidos = set()
+    app.config.qtd_sessoes = qtd_sessoes
+    app.config.ritmo = {"modo": automatizador.RITMO_FIXO, "pausa_fixa": pausa}
+
+    app.historico = automatizador.GravadorHistorico()
+    app.medidor = automatizador.MedidorFases()
+
+    inicio = time.perf_counter()
+    placar = app.executar_pool("Mensagem de benchmark")
+    duracao = time.perf_counter() - inicio
+    app.fechar_navegadores()
+    app.historico.fechar()
+
+    por_hora = placar.processados / duracao * 3600 if duracao else 0
+    por_sessao = ", ".join(f"{s.nome}={s.enviados}" for s in app.sessoes)
+    print(
+        f"  {qtd_sessoes} sessão(ões): {placar.processados}/{placar.total} em "
+        f"{duracao:.1f}s ({por_hora:.0f} contatos/h) | ok {placar.sucessos} "
+        f"| inválidos {placar.numeros_invalidos} | falhas {placar.falhas} | {por_sessao}"
+    )
+    if placar.repeticoes:
+        print(f"      {app.resumo_repeticoes(placar)}")
+    for fase, numeros in app.medidor.percentis().items():
+        print(
+            f"      {fase:<20} n={numeros['n']:<4} p50 {numeros['p50']:.2f}s "
+            f"p95 {numeros['p95']:.2f}s p99 {numeros['p99']:.2f}s"
+        )
+    return placar
+
+
+def conferir_historico(esperado):
+    with open("historico_envios.csv", encoding="utf-8") as arquivo:
+        linhas = list(csv.reader(arquivo))[1:]
+    telefones = [linha[2] for linha in linhas]
+    assert len(telefones) == len(set(telefones)), "contato mandado duas vezes!"
+    assert set(telefones) == set(esperado), "faltou contato no histórico"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modo", choices=("falso", "chrome"), default="falso")
+    parser.add_argument("--sessoes", type=int, default=4)
+    parser.add_argument("--contatos", type=int, default=40)
+    parser.add_argument("--pausa", type=int, default=1, help="pausa entre envios (s)")
+    parser.add_argument("--envio-ms", type=int, default=300, help="modo falso")
+    parser.add_argument(
+        "--espera-repeticao", type=float, default=1, help="espera inicial (s)"
+    )
+    args = parser.parse_args()
+
+    automatizador.FilaTrabalho = functools.partial(
+        automatizador.FilaTrabalho, espera_inicial=args.espera_repeticao
+    )
+
+    pasta = tempfile.mkdtemp(prefix="bench_pool_")
+    os.chdir(pasta)  # histórico de cada rodada vai pra pasta temporária
+    numeros = [f"55619{i:08d}" for i in range(1, args.contatos + 1)]
+    numeros[3] = "5561999990000"  # um sem WhatsApp no meio
+
+    servidor = None
+    if args.modo == "chrome":
+        servidor, url_base = iniciar_servidor({"atraso_boot_ms": 500})
+    else:
+        url_base = "http://falso"
+
+    print(f"Modo {args.modo}, {args.contatos} contatos, pausa {args.pausa}s\n")
+
+    try:
+        for qtd in sorted({1, args.sessoes}):
+            if os.path.exists("historico_envios.csv"):
+                os.remove("historico_envios.csv")
+
+            app = criar_app_sem_tela(url_base)
+
+            if args.modo == "chrome":
+                app.configurar_chrome = lambda perfil=None: abrir_chrome_teste()
+            else:
+
+                tentativas = collections.Counter()
+
+                def mandar_falso(navegador, numero, texto):
+                    tentativas[numero] += 1
+                    resultado = automatizador.ResultadoEnvio(numero)
+                    with resultado.fase("total"):
+                        time.sleep(args.envio_ms / 1000)
+                    if numero.endswith("0000"):
+                        resultado.desfecho = automatizador.DesfechoEnvio.NUMERO_INVALIDO
+                    elif numero == numeros[-1] or (
+                        int(numero) % 5 == 0 and tentativas[numero] == 1
+                    ):
+                        resultado.desfecho = (
+                            automatizador.DesfechoEnvio.CONVERSA_NAO_ABRIU
+                        )
+                    else:
+                        resultado.desfecho = automatizador.DesfechoEnvio.ENVIADO
+                    return resultado
+
+                app.configurar_chrome = NavegadorFalso
+                app.fazer_login_whatsapp = lambda navegador: True
+                app.mandar_mensagem = mandar_falso
+
+            rodar(app, numeros, qtd, args.pausa)
+            conferir_historico(numeros)
+    finally:
+        if servidor:
+            servidor.shutdown()
+
+    print(f"\n  Histórico conferido (sem repetidos, sem faltando) em {pasta}")
+
+
+if __name__ == "__main__":
+    main()
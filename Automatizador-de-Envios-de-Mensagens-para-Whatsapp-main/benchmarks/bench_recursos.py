@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de CPU e memória do Chrome por modo de execução (precisa do psutil)
+Abre o Chrome do jeito que o app abre (configurar_chrome), manda alguns
+contatos pro WhatsApp falso local e mede a soma de todos os processos
+
+Uso: python benchmarks/bench_recursos.py [--contatos 10] [--modos headless,escondido]
+"""
+
+import argparse
+import time
+
+from apoio import automatizador, criar_app_sem_tela
+from whatsapp_falso import iniciar_servidor
+
+
+def medir_modo(modo, url_base, numeros):
+    app = criar_app_sem_tela(url_base, navegacao_interna=True)
+    app.config.headless = modo == "headless"
+    app.config.chrome_escondido = modo == "escondido"
+
+    navegador = app.configurar_chrome()
+    medidor = automatizador.MedidorRecursos(navegador)
+    medidor.medir()
+    amostras = []
+
+    try:
+        navegador.get(url_base)
+        inicio = time.perf_counter()
+        for numero in numeros:
+            app.mandar_mensagem(navegador, numero, "Mensagem de benchmark")
+            amostras.append(medidor.medir())
+        duracao = time.perf_counter() - inicio
+    finally:
+        navegador.quit()
+        app.fechar_navegadores()
+
+    amostras = [amostra for amostra in amostras if amostra]
+    if not amostras:
+        print(f"  {modo:<10} sem medidas (psutil instalado?)")
+        return
+
+    cpu_media = sum(cpu for cpu, _, _ in amostras) / len(amostras)
+    rss_pico = max(rss for _, rss, _ in amostras)
+    processos = max(qtd for _, _, qtd in amostras)
+    print(
+        f"  {modo:<10} CPU média {cpu_media:6.1f}% | RAM pico {rss_pico:6.0f} MB | "
+        f"{processos} processos | {duracao / len(numeros):.2f}s por contato"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contatos", type=int, default=10)
+    parser.add_argument("--modos", default="headless,escondido")
+    args = parser.parse_args()
+
+    if automatizador.psutil is None:
+        raise SystemExit("Instale o psutil: pip install psutil")
+
+    servidor, url_base = iniciar_servidor({"atraso_boot_ms": 500})
+    numeros = [f"55619{i:08d}" for i in range(1, args.contatos + 1)]
+
+    try:
+        for modo in args.modos.split(","):
+            medir_modo(modo.strip(), url_base, numeros)
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulação do ritmo entre envios com relógio de mentira (roda em segundos)
+A "conta" aguenta X msg/h; passando disso a conversa começa a não abrir e a
+página fica lenta. No meio da simulação a conta passa a aguentar menos
+(igual quando o WhatsApp aperta o número). Compara a pausa fixa calculada
+pro alvo com o ritmo automático (mesmo alvo, mesmo teto), hora a hora
+
+Uso: python benchmarks/bench_ritmo.py [--alvo 120] [--teto 180] [--aguenta 90]
+"""
+
+import argparse
+import random
+
+from apoio import automatizador
+
+DURACAO_ENVIO = 6.0  # segundos de navegar + esperar + enviar (sem falha)
+
+
+class ContaSimulada:
+    """Falha mais quanto mais rápido do que aguenta; guarda os últimos envios"""
+
+    def __init__(self, aguenta_por_hora, sorteio):
+        self.aguenta_por_hora = aguenta_por_hora
+        self.sorteio = sorteio
+        self.envios = []
+
+    def enviar(self, agora, numero):
+        recentes = [t for t in self.envios if agora - t < 600]
+        ritmo = len(recentes) / 600 * 3600
+        excesso = max(ritmo / self.aguenta_por_hora - 1, 0)
+        self.envios.append(agora)
+
+        resultado = automatizador.ResultadoEnvio(numero)
+        resultado.somar("esperar_conversa", 2.0 + 20 * excesso)
+        resultado.somar("total", DURACAO_ENVIO + 20 * excesso)
+        if self.sorteio.random() < min(0.02 + 1.5 * excesso, 0.9):
+            resultado.desfecho = automatizador.DesfechoEnvio.CONVERSA_NAO_ABRIU
+        else:
+            resultado.desfecho = automatizador.DesfechoEnvio.ENVIADO
+        return resultado
+
+
+def simular(nome, config, aguenta, horas, semente):
+    sorteio = random.Random(semente)
+    conta = ContaSimulada(aguenta, sorteio)
+    ritmo = automatizador.ControladorRitmo(**config, sorteio=random.Random(semente + 1))
+    medidor = automatizador.MedidorFases()
+    por_hora = [[0, 0] for _ in range(horas)]  # [ok, falhas]
+
+    agora = 0.0
+    numero = 0
+    while agora < horas * 3600:
+        if agora >= horas * 3600 / 2:
+            conta.aguenta_por_hora = aguenta / 2  # número foi apertado
+
+        numero += 1
+        resultado = conta.enviar(agora, f"55619{numero:08d}")
+        agora += resultado.tempos["total"]
+        hora = min(int(agora // 3600), horas - 1)
+        por_hora[hora][0 if resultado else 1] += 1
+
+        motivo = ritmo.registrar(resultado)
+        pausa = ritmo.proxima_pausa()
+        medidor.registrar_ritmo(
+            nome, pausa, ritmo.taxa if ritmo.automatico else None, motivo
+        )
+        agora += pausa
+
+    print(f"  {nome}")
+    for hora, (ok, falhas) in enumerate(por_hora):
+        limite = aguenta if hora < horas / 2 else aguenta / 2
+        print(
+            f"    hora {hora + 1}: {ok:4d} ok | {falhas:4d} falhas "
+            f"| conta aguenta {limite:.0f}/h"
+        )
+    total_ok = sum(ok for ok, _ in por_hora)
+    total_falhas = sum(falhas for _, falhas in por_hora)
+    recuos = sum(
+        decisao["motivo"].startswith("recuo") for decisao in medidor.decisoes_ritmo
+    )
+    print(
+        f"    total: {total_ok} ok, {total_falhas} falhas "
+        f"({total_falhas / max(total_ok + total_falhas, 1):.0%}), {recuos} recuos\n"
+    )
+    return total_ok, total_falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alvo", type=float, default=120)
+    parser.add_argument("--teto", type=float, default=180)
+    parser.add_argument("--aguenta", type=float, default=90)
+    parser.add_argument("--horas", type=int, default=6)
+    parser.add_argument("--semente", type=int, default=7)
+    args = parser.parse_args()
+
+    print(
+        f"Alvo {args.alvo:.0f} msg/h, teto {args.teto:.0f} msg/h, conta aguenta "
+        f"{args.aguenta:.0f} msg/h (metade disso depois de {args.horas // 2}h)\n"
+    )
+    pausa_fixa = max(round(3600 / args.alvo - DURACAO_ENVIO), 0)
+    fixo = simular(
+        f"pausa fixa de {pausa_fixa}s",
+        {"modo": automatizador.RITMO_FIXO, "pausa_fixa": pausa_fixa},
+        args.aguenta,
+        args.horas,
+        args.semente,
+    )
+    automatico = simular(
+        "ritmo automático",
+        {
+            "modo": automatizador.RITMO_AUTOMATICO,
+            "alvo_por_hora": args.alvo,
+            "teto_por_hora": args.teto,
+        },
+        args.aguenta,
+        args.horas,
+        args.semente,
+    )
+    print(
+        f"  Automático: {automatico[0] - fixo[0]:+d} enviadas e "
+        f"{automatico[1] - fixo[1]:+d} falhas em relação à pausa fixa"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: idas e voltas ao WebDriver por checagem e por contato
+Antes: um find_elements por seletor + um is_displayed por elemento achado
+Depois: um execute_script só que testa todos os seletores dentro da página
+
+Roda contra o WhatsApp falso local, não precisa de celular nem internet
+
+Uso: python benchmarks/bench_sondagem.py [--contatos 10] [--visivel]
+"""
+
+import argparse
+import time
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from apoio import (
+    automatizador,
+    abrir_chrome_teste,
+    criar_app_sem_tela,
+    ContadorIdas,
+)
+from whatsapp_falso import iniciar_servidor
+
+# ---- jeito antigo, igual era antes da sondagem em JS ----
+
+
+def algum_visivel_antigo(navegador, seletores):
+    for seletor in seletores:
+        try:
+            elementos = navegador.find_elements(By.XPATH, seletor)
+            if any(elem.is_displayed() for elem in elementos):
+                return True
+        except StaleElementReferenceException:
+            continue
+    return False
+
+
+def estado_login_antigo(navegador):
+    if algum_visivel_antigo(navegador, automatizador.SELETORES_QR):
+        return "qr"
+    if algum_visivel_antigo(navegador, automatizador.SELETORES_TELA_LOGADA):
+        return "logado"
+    return None
+
+
+def esperar_conversa_antiga(navegador, tempo_max, medir=None):
+    def checar(d):
+        campos = d.find_elements(By.XPATH, automatizador.XPATH_CAMPO_TEXTO)
+        if campos:
+            return "pronto", campos[0]
+
+        for seletor in automatizador.SELETORES_NUMERO_INVALIDO_PAGINA:
+            if any(elem.is_displayed() for elem in d.find_elements(By.XPATH, seletor)):
+                return "invalido", None
+
+        for botao in d.find_elements(By.XPATH, automatizador.XPATH_POPUP_WEB):
+            if botao.is_displayed() and botao.is_enabled():
+                botao.click()
+                break
+
+        return False
+
+    try:
+        return WebDriverWait(
+            navegador,
+            tempo_max,
+            poll_frequency=automatizador.INTERVALO_CHECAGEM,
+            ignored_exceptions=(StaleElementReferenceException, NoSuchElementException),
+        ).until(checar)
+    except TimeoutException:
+        return "timeout", None
+
+
+# ---- medições ----
+
+
+def medir_checagem_login(nome, funcao, navegador, contador, repeticoes=20):
+    contador.zerar()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        estado = funcao(navegador)
+    duracao = (time.perf_counter() - inicio) / repeticoes
+    print(
+        f"  {nome:<10} estado={estado!s:<7} {contador.total / repeticoes:5.1f} idas "
+        f"| {duracao * 1000:6.1f}ms por checagem"
+    )
+
+
+def medir_contatos(nome, app, navegador, contador, numeros):
+    contador.zerar()
+    inicio = time.perf_counter()
+    for numero in numeros:
+        app.mandar_mensagem(navegador, numero, "Mensagem de benchmark")
+    duracao = time.perf_counter() - inicio
+    por_contato = contador.total / len(numeros)
+    mais_usados = ", ".join(
+        f"{comando}={quantos / len(numeros):.1f}"
+        for comando, quantos in contador.por_comando.most_common(4)
+    )
+    print(
+        f"  {nome:<24} {por_contato:5.1f} idas/contato "
+        f"| {duracao / len(numeros):.2f}s/contato | {mais_usados}"
+    )
+    return por_contato
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contatos", type=int, default=10)
+    parser.add_argument("--atraso-carga", type=int, default=800)
+    parser.add_argument("--visivel", action="store_true")
+    args = parser.parse_args()
+
+    servidor, url_base = iniciar_servidor(
+        {"atraso_boot_ms": 300, "atraso_carga_ms": args.atraso_carga}
+    )
+    navegador = abrir_chrome_teste(args.visivel)
+    contador = ContadorIdas(navegador)
+    app = criar_app_sem_tela(url_base)
+    validos = [f"55619{i:08d}" for i in range(1, args.contatos + 1)]
+    invalidos = ["5561999990000"] * 3
+    esperar_conversa_nova = automatizador.esperar_conversa_pronta
+
+    try:
+        navegador.get(url_base)
+        automatizador.esperar_tela_inicial(navegador, 10)
+
+        print("Checagem de login (tela já logada):")
+        medir_checagem_login("antes", estado_login_antigo, navegador, contador)
+        medir_checagem_login("depois", automatizador.estado_login, navegador, contador)
+
+        print(f"\nPor contato (conversa abre em {args.atraso_carga}ms):")
+        resultados = {}
+        for nome, esperar in (
+            ("antes", esperar_conversa_antiga),
+            ("depois", esperar_conversa_nova),
+        ):
+            automatizador.esperar_conversa_pronta = esperar
+            resultados[nome] = medir_contatos(
+                f"{nome} (válidos)", app, navegador, contador, validos
+            )
+            medir_contatos(
+                f"{nome} (sem WhatsApp)", app, navegador, contador, invalidos
+            )
+
+        print(
+            f"\n  {resultados['antes'] - resultados['depois']:.1f} idas a menos "
+            "por contato válido"
+        )
+    finally:
+        automatizador.esperar_conversa_pronta = esperar_conversa_nova
+        navegador.quit()
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
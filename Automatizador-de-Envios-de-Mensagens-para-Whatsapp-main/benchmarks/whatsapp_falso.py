@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WhatsApp Web de mentira pra rodar benchmark sem celular e sem internet
+Serve uma página local que imita o que o automatizador procura no DOM:
+QR Code (canvas) até o "celular escanear", lista de conversas, campo de
+digitação (contenteditable data-tab=10), os avisos de número inválido, o
+popup "Use WhatsApp Web" e a bolha de saída que começa no relógio e depois
+ganha o check.
+Anexo: colar um arquivo no campo (ou escolher no input de arquivo) abre a
+prévia com a legenda; ENTER na legenda manda
+
+Funciona como SPA: carregar a página custa o "boot" inteiro, trocar de
+conversa pelo roteador (pushState + popstate) custa só abrir a conversa
+
+Latência com variação e falhas sorteadas (conversa que não abre, ENTER que
+se perde, mensagem que fica no relógio) saem de uma semente: mesma semente,
+mesma sequência. Cada mensagem que ganha o check avisa o servidor, que
+guarda em servidor.recebidas pra conferir se ninguém recebeu duas vezes
+
+Uso direto: python benchmarks/whatsapp_falso.py [--porta 8765] [--cenario instavel]
+"""
+
+import argparse
+import collections
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CONFIG_PADRAO = {
+    "atraso_boot_ms": 2500,  # hidratação do app a cada carga completa da página
+    "atraso_carga_ms": 1500,  # quanto a "conversa" demora pra abrir
+    "atraso_envio_ms": 400,  # quanto a bolha fica no relógio
+    "sufixo_invalido": "0000",  # números terminados nisso "não têm WhatsApp"
+    "roteador_interno": True,  # False = ignora pushState (força o fallback)
+    "atraso_anexo_ms": 300,  # quanto a prévia do anexo demora pra abrir
+    "exigir_qr": False,  # True = 1ª carga mostra o QR Code até "escanear"
+    "atraso_scan_ms": 3000,  # quanto o "celular" demora pra escanear o QR
+    "variacao": 0.0,  # cada atraso varia até ±isso (0.3 = ±30%)
+    "chance_popup": 0.0,  # popup "Use WhatsApp Web" antes da conversa abrir
+    "chance_nao_abrir": 0.0,  # conversa fica carregando pra sempre
+    "chance_nao_enviar": 0.0,  # ENTER se perde: nenhuma bolha aparece
+    "chance_sem_check": 0.0,  # bolha aparece mas fica no relógio
+    "semente": 1,  # mesma semente = mesma sequência de sorteios
+    "textos_invalido": [  # um sorteado por número inválido
+        "Phone number shared via url is invalid.",
+        "Número de telefone compartilhado via URL inválido.",
+        "O número de telefone não está cadastrado no WhatsApp.",
+        "This phone number doesn't have WhatsApp.",
+    ],
+}
+
+# Cenários prontos pro bench de ponta a ponta e pro --cenario
+CENARIOS = {
+    "padrao": {},
+    "rapido": {"atraso_boot_ms": 300, "atraso_carga_ms": 200, "atraso_envio_ms": 100},
+    "realista": {"exigir_qr": True, "variacao": 0.3, "chance_popup": 0.05},
+    "instavel": {
+        "exigir_qr": True,
+        "variacao": 0.5,
+        "atraso_envio_ms": 800,
+        "chance_popup": 0.1,
+        "chance_nao_abrir": 0.05,
+        "chance_nao_enviar": 0.03,
+        "chance_sem_check": 0.03,
+    },
+}
+
+PAGINA = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>WhatsApp (falso)</title>
+<style>
+  body { font-family: Arial, sans-serif; margin: 0; display: flex; height: 100vh; }
+  #lateral { width: 30%; border-right: 1px solid #ccc; }
+  #main { flex: 1; display: flex; flex-direction: column; }
+  #mensagens { flex: 1; overflow-y: auto; padding: 10px; }
+  .message-out { background: #d9fdd3; margin: 4px 0 4px auto; padding: 6px; max-width: 60%; }
+  div[contenteditable] { border: 1px solid #999; min-height: 30px; padding: 6px; }
+  #previa { border: 2px dashed #25D366; padding: 10px; }
+  div[role=dialog] { border: 1px solid #999; margin: 20px; padding: 20px; }
+</style>
+</head>
+<body>
+<div id="lateral"></div>
+<div id="main"></div>
+<script>
+var CONFIG = __CONFIG__;
+
+// Cada carga da página sorteia uma sequência diferente (mas repetível)
+var carga = Number(localStorage.getItem('wa-falso-cargas') || 0) + 1;
+localStorage.setItem('wa-falso-cargas', carga);
+var estadoSorteio = (CONFIG.semente * 1000003 + carga) >>> 0;
+
+function sortear() {  // mulberry32
+    estadoSorteio = (estadoSorteio + 0x6D2B79F5) >>> 0;
+    var t = estadoSorteio;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+}
+
+function acontece(chance) {
+    return chance > 0 && sortear() < chance;
+}
+
+function atraso(ms) {
+    return Math.max(ms * (1 + CONFIG.variacao * (2 * sortear() - 1)), 0);
+}
+
+function avisarServidor(caminho, dados) {
+    navigator.sendBeacon(caminho, JSON.stringify(dados));
+}
+
+function telefoneDaUrl() {
+    var achado = /[?&]phone=(\\d+)/.exec(window.location.search);
+    return achado ? achado[1] : null;
+}
+
+function enviar(campo, mensagens, telefone) {
+    var texto = campo.innerText.trim();
+    if (!texto) return;
+    if (acontece(CONFIG.chance_nao_enviar)) return;  // ENTER perdido
+    campo.innerHTML = '';
+
+    var bolha = document.createElement('div');
+    bolha.className = 'message-out';
+    bolha.textContent = texto;
+    var icone = document.createElement('span');
+    icone.setAttribute('data-icon', 'msg-time');
+    bolha.appendChild(icone);
+    mensagens.appendChild(bolha);
+
+    if (acontece(CONFIG.chance_sem_check)) return;  // fica no relógio
+    setTimeout(function () {
+        icone.setAttribute('data-icon', 'msg-check');
+        avisarServidor('/recebida', { telefone: telefone, texto: texto });
+    }, atraso(CONFIG.atraso_envio_ms));
+}
+
+function abrirPrevia(arquivo, campo, mensagens, telefone) {
+    setTimeout(function () {
+        var antiga = document.getElementById('previa');
+        if (antiga) antiga.remove();
+
+        var previa = document.createElement('div');
+        previa.id = 'previa';
+        previa.setAttribute('data-testid', 'media-editor');
+        previa.appendChild(document.createTextNode(
+            arquivo.name + ' (' + Math.round(arquivo.size / 1024) + ' KB)'));
+
+        var legenda = document.createElement('div');
+        legenda.setAttribute('contenteditable', 'true');
+        legenda.setAttribute('aria-label', 'Adicione uma legenda');
+        legenda.addEventListener('paste', function (e) {
+            e.preventDefault();
+            legenda.textContent = e.clipboardData.getData('text/plain');
+        });
+
+        function mandar() {
+            var texto = '[📎 ' + arquivo.name + '] ' + legenda.innerText.trim();
+            previa.remove();
+            campo.textContent = texto;
+            enviar(campo, mensagens, telefone);
+        }
+        legenda.addEventListener('keydown', function (e) {
+            if (e.key === 'Enter' && !e.shiftKey) {
+                e.preventDefault();
+                mandar();
+            }
+        });
+
+        var botao = document.createElement('span');
+        botao.setAttribute('data-icon', 'send');
+        botao.textContent = '➤';
+        botao.addEventListener('click', mandar);
+
+        previa.appendChild(legenda);
+        previa.appendChild(botao);
+        document.getElementById('main').appendChild(previa);
+    }, atraso(CONFIG.atraso_anexo_ms));
+}
+
+var geracao = 0;
+
+function abrirConversa(telefone) {
+    var main = document.getElementById('main');
+    var minhaGeracao = ++geracao;
+    main.innerHTML = '';
+    if (!telefone) return;
+
+    setTimeout(function () {
+        if (minhaGeracao !== geracao) return;  // já trocaram de conversa de novo
+        if (acontece(CONFIG.chance_nao_abrir)) {
+            main.textContent = 'Carregando conversa...';
+            return;
+        }
+        if (telefone.endsWith(CONFIG.sufixo_invalido)) {
+            var textos = CONFIG.textos_invalido;
+            var dialogo = document.createElement('div');
+            dialogo.setAttribute('role', 'dialog');
+            var aviso = document.createElement('div');
+            aviso.textContent = textos[Math.floor(sortear() * textos.length)];
+            dialogo.appendChild(aviso);
+            main.appendChild(dialogo);
+            return;
+        }
+        if (acontece(CONFIG.chance_popup)) {
+            var popup = document.createElement('div');
+            popup.setAttribute('role', 'dialog');
+            popup.appendChild(document.createTextNode(
+                'O WhatsApp está aberto em outra janela. '));
+            var botao = document.createElement('button');
+            botao.textContent = 'Use WhatsApp Web';
+            botao.addEventListener('click', function () {
+                popup.remove();
+                if (minhaGeracao === geracao) montarConversa(main, telefone);
+            });
+            popup.appendChild(botao);
+            main.appendChild(popup);
+            return;
+        }
+        montarConversa(main, telefone);
+    }, atraso(CONFIG.atraso_carga_ms));
+}
+
+function montarConversa(main, telefone) {
+    var mensagens = document.createElement('div');
+    mensagens.id = 'mensagens';
+
+    var campo = document.createElement('div');
+    campo.setAttribute('contenteditable', 'true');
+    campo.setAttribute('data-tab', '10');
+    campo.addEventListener('paste', function (e) {
+        e.preventDefault();
+        if (e.clipboardData.files && e.clipboardData.files.length) {
+            abrirPrevia(e.clipboardData.files[0], campo, mensagens, telefone);
+            return;
+        }
+        campo.textContent = e.clipboardData.getData('text/plain');
+    });
+
+    var entrada = document.createElement('input');
+    entrada.type = 'file';
+    entrada.addEventListener('change', function () {
+        if (entrada.files.length) {
+            abrirPrevia(entrada.files[0], campo, mensagens, telefone);
+        }
+        entrada.value = '';
+    });
+    campo.addEventListener('keydown', function (e) {
+        if (e.key === 'Enter' && !e.shiftKey) {
+            e.preventDefault();
+            enviar(campo, mensagens, telefone);
+        }
+    });
+
+    main.appendChild(mensagens);
+    main.appendChild(campo);
+    main.appendChild(entrada);
+}
+
+function mostrarQr() {
+    var caixa = document.createElement('div');
+    caixa.setAttribute('data-testid', 'qrcode');
+    var qr = document.createElement('canvas');
+    qr.setAttribute('aria-label', 'Scan this QR code to link a device!');
+    qr.width = qr.height = 168;
+    var pincel = qr.getContext('2d');
+    for (var y = 0; y < 21; y++) {
+        for (var x = 0; x < 21; x++) {
+            if (sortear() < 0.5) pincel.fillRect(x * 8, y * 8, 8, 8);
+        }
+    }
+    caixa.appendChild(qr);
+    document.getElementById('lateral').appendChild(caixa);
+
+    // O "celular" escaneia; a sessão fica salva no perfil (localStorage)
+    setTimeout(function () {
+        caixa.remove();
+        localStorage.setItem('wa-falso-logado', '1');
+        avisarServidor('/escaneado', {});
+        mostrarConversas();
+    }, atraso(CONFIG.atraso_scan_ms));
+}
+
+function mostrarConversas() {
+    var lista = document.createElement('div');
+    lista.setAttribute('data-testid', 'chat-list');
+    lista.textContent = 'Conversas';
+    document.getElementById('lateral').appendChild(lista);
+
+    if (CONFIG.roteador_interno) {
+        window.addEventListener('popstate', function () {
+            abrirConversa(telefoneDaUrl());
+        });
+    }
+    abrirConversa(telefoneDaUrl());
+}
+
+setTimeout(function () {
+    if (CONFIG.exigir_qr && !localStorage.getItem('wa-falso-logado')) {
+        mostrarQr();
+    } else {
+        mostrarConversas();
+    }
+}, atraso(CONFIG.atraso_boot_ms));
+</script>
+</body>
+</html>
+"""
+
+
+def iniciar_servidor(config=None, porta=0):
+    """
+    Sobe o WhatsApp falso numa thread separada
+    Retorna: (servidor, url_base) - chama servidor.shutdown() pra derrubar
+    servidor.recebidas: [(telefone, texto)] das mensagens que ganharam o check
+    servidor.contagem: Counter com "cargas" (página inteira) e "escaneados"
+    """
+    config_final = dict(CONFIG_PADRAO)
+    config_final.update(config or {})
+    html = PAGINA.replace("__CONFIG__", json.dumps(config_final)).encode("utf-8")
+    trava = threading.Lock()
+    recebidas = []
+    contagem = collections.Counter()
+
+    class Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/favicon"):
+                self.send_error(404)
+                return
+            with trava:
+                contagem["cargas"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(html)))
+            self.end_headers()
+            self.wfile.write(html)
+
+        def do_POST(self):
+            tamanho = int(self.headers.get("Content-Length") or 0)
+            try:
+                dados = json.loads(self.rfile.read(tamanho) or b"{}")
+            except ValueError:
+                dados = {}
+            with trava:
+                if self.path == "/recebida":
+                    recebidas.append((dados.get("telefone"), dados.get("texto")))
+                elif self.path == "/escaneado":
+                    contagem["escaneados"] += 1
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, formato, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), Manipulador)
+    servidor.recebidas = recebidas
+    servidor.contagem = contagem
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    url_base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    return servidor, url_base
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WhatsApp Web falso local")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--cenario", choices=sorted(CENARIOS), default="padrao")
+    parser.add_argument("--atraso-boot", type=int)
+    parser.add_argument("--atraso-carga", type=int)
+    parser.add_argument("--atraso-envio", type=int)
+    parser.add_argument("--exigir-qr", action="store_true")
+    parser.add_argument("--semente", type=int)
+    args = parser.parse_args()
+
+    config = dict(CENARIOS[args.cenario])
+    for chave, valor in (
+        ("atraso_boot_ms", args.atraso_boot),
+        ("atraso_carga_ms", args.atraso_carga),
+        ("atraso_envio_ms", args.atraso_envio),
+        ("exigir_qr", args.exigir_qr or None),
+        ("semente", args.semente),
+    ):
+        if valor is not None:
+            config[chave] = valor
+
+    servidor, url = iniciar_servidor(config, args.porta)
+    print(f"WhatsApp falso rodando em {url}/send?phone=5561999999999 (Ctrl+C sai)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""Põe a pasta do projeto no caminho pra importar o motor de envio nos testes"""
+
+import os
+import sys
+
+PASTA_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PASTA_PROJETO not in sys.path:
+    sys.path.insert(0, PASTA_PROJETO)
+
+import whatsapp_motor  # noqa: E402
+
+# Teste não mexe nos seletores aprendidos de verdade
+whatsapp_motor.REGISTRO_SELETORES.caminho = None
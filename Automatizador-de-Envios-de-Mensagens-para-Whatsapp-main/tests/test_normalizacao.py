@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+A limpeza em lote (pandas/NumPy) tem que dar exatamente o mesmo resultado
+que a versão número a número, com qualquer coisa que venha numa célula
+"""
+
+import math
+
+from hypothesis import example, given, settings
+from hypothesis import strategies as st
+
+import whatsapp_motor as automatizador
+
+digitos = st.text(alphabet="0123456789", max_size=15)
+
+telefones_texto = st.one_of(
+    digitos,
+    digitos.map(lambda d: "55" + d[:11]),
+    digitos.map(lambda d: f"({d[:2]}) {d[2:7]}-{d[7:11]}"),
+    digitos.map(lambda d: f"  +{d}\t"),
+    digitos.map(lambda d: d.translate(str.maketrans("0123456789", "٠١٢٣٤٥٦٧٨٩"))),
+    digitos.map(lambda d: " " * 80 + d),  # maior que TAMANHO_MAX_LOTE
+    st.text(alphabet="0123456789-. ()+abc²", max_size=20),
+    st.sampled_from(["", "nan", "None", "5561984385187", "61984385187"]),
+    st.text(max_size=20),
+)
+
+celulas = st.one_of(
+    telefones_texto,
+    st.none(),
+    st.just(math.nan),
+    st.integers(min_value=0, max_value=10**15),
+    st.integers(min_value=0, max_value=10**15).map(float),
+    st.floats(allow_nan=True, allow_infinity=True),
+    st.sampled_from([0, 0.0, False, True, 5.5119e12, 5561984385187.0]),
+    st.lists(st.one_of(st.integers(0, 10**13), digitos), max_size=3),
+    st.tuples(digitos),
+)
+
+
+def conferir(lista):
+    esperado = automatizador.limpar_lista_telefones(lista)
+    assert automatizador.limpar_lista_telefones_em_lote(lista) == esperado
+    assert automatizador.normalizar_telefones_em_lote(lista).tolist() == [
+        automatizador.arrumar_numero_telefone(valor) for valor in lista
+    ]
+
+
+@settings(max_examples=500)
+@given(st.lists(celulas, max_size=40))
+@example([61984385187, "61984385187", None, math.nan, 5.5119e12, [61984385187]])
+@example([[1], [2]])
+def test_coluna_misturada_igual_a_normal(lista):
+    conferir(lista)
+
+
+@settings(max_examples=500)
+@given(st.lists(st.one_of(telefones_texto, st.none()), max_size=40))
+def test_coluna_de_texto_igual_a_normal(lista):
+    conferir(lista)
+
+
+@settings(max_examples=300)
+@given(st.lists(st.integers(min_value=0, max_value=10**15), max_size=40))
+def test_coluna_de_inteiros_igual_a_normal(lista):
+    conferir(lista)
+
+
+def test_lista_numa_celula_vai_pros_invalidos():
+    validos, invalidos, duplicados = automatizador.limpar_lista_telefones_em_lote(
+        ["61984385187", [61984385187], ("61984385187",), []]
+    )
+    assert validos == ["5561984385187"]
+    assert invalidos == ["[61984385187]", "('61984385187',)", "[]"]
+    assert duplicados == 0
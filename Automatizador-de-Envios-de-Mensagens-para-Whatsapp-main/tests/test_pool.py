@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Fila de trabalho, placar e campanha salva do pool de sessões, com navegadores
+de mentira (sem Chrome): ordem da fila, tentativas, contagem do placar e
+retomar do banco depois de parar no meio sem mandar pra ninguém duas vezes
+"""
+
+import collections
+import threading
+
+import pytest
+
+import whatsapp_motor as automatizador
+from whatsapp_motor import DesfechoEnvio, FilaTrabalho, PlacarCampanha
+
+
+class Relogio:
+    """Relógio de mentira pra fila: só anda quando o teste mandar"""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def resultado(numero, desfecho):
+    return automatizador.ResultadoEnvio(numero, desfecho)
+
+
+# ==================== FILA ====================
+
+
+def test_fila_sai_sempre_o_menor_indice():
+    fila = FilaTrabalho([(2, "c"), (0, "a"), (1, "b")])
+    assert [fila.pegar(), fila.pegar(), fila.pegar()] == [
+        (0, "a"),
+        (1, "b"),
+        (2, "c"),
+    ]
+    assert fila.pegar() is None
+    assert len(fila) == 3  # os três em andamento
+
+
+def test_repeticao_vencida_passa_na_frente_dos_novos():
+    relogio = Relogio()
+    fila = FilaTrabalho(
+        [(0, "a"), (1, "b"), (2, "c")], espera_inicial=10, relogio=relogio
+    )
+    primeiro = fila.pegar()
+    assert fila.reagendar(primeiro) == 10
+
+    assert fila.pegar() == (1, "b")  # repetição ainda não venceu
+    assert fila.espera_repeticao() == 10
+    relogio.agora = 10
+    assert fila.pegar() == (0, "a")
+    assert fila.tentativas[0] == 2
+
+
+def test_reagendar_dobra_a_espera_e_esgota():
+    relogio = Relogio()
+    fila = FilaTrabalho(
+        [(0, "a")],
+        max_tentativas=3,
+        espera_inicial=5,
+        espera_maxima=8,
+        relogio=relogio,
+    )
+    esperas = []
+    while True:
+        item = fila.pegar()
+        espera = fila.reagendar(item)
+        if espera is None:
+            break
+        esperas.append(espera)
+        relogio.agora += espera
+    assert esperas == [5, 8]  # 5, 10 cortado no máximo
+    assert fila.tentativas[0] == 3
+
+
+@pytest.mark.parametrize("voltar", ["devolver", "adiar"])
+def test_devolver_e_adiar_nao_gastam_tentativa(voltar):
+    relogio = Relogio()
+    fila = FilaTrabalho([(0, "a"), (1, "b")], max_tentativas=1, relogio=relogio)
+    item = fila.pegar()
+    assert fila.tentativas[0] == 1
+
+    if voltar == "devolver":
+        fila.devolver(item)
+    else:
+        fila.adiar(item, 30)
+        assert fila.pegar() == (1, "b")  # adiado só volta depois da espera
+        relogio.agora = 30
+    assert fila.tentativas[0] == 0
+
+    assert fila.pegar() == item
+    # Ainda tem a única tentativa: falhar agora esgota, não repete
+    assert fila.reagendar(item) is None
+
+
+def test_primeiro_pendente_e_o_ponto_de_retomada():
+    fila = FilaTrabalho([(3, "d"), (4, "e"), (5, "f")], relogio=Relogio())
+    assert fila.primeiro_pendente(99) == 3
+    tres = fila.pegar()
+    fila.pegar()
+    fila.concluir(4)
+    assert fila.primeiro_pendente(99) == 3  # o 3 ainda tá em andamento
+    fila.reagendar(tres)
+    fila.pegar()
+    fila.concluir(5)
+    assert fila.primeiro_pendente(99) == 3  # esperando repetição
+    assert FilaTrabalho([]).primeiro_pendente(99) == 99
+
+
+def test_fila_entre_threads_entrega_cada_contato_uma_vez():
+    fila = FilaTrabalho((i, str(i)) for i in range(2000))
+    pegos = collections.Counter()
+    trava = threading.Lock()
+
+    def sessao():
+        while (item := fila.pegar()) is not None:
+            with trava:
+                pegos[item[0]] += 1
+            fila.concluir(item[0])
+
+    threads = [threading.Thread(target=sessao) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(pegos) == 2000 and set(pegos.values()) == {1}
+
+
+# ==================== PLACAR ====================
+
+
+def test_placar_conta_cada_desfecho():
+    placar = PlacarCampanha(total=5, ja_processados=1)
+    placar.registrar(resultado("1", DesfechoEnvio.ENVIADO))
+    placar.registrar(resultado("2", DesfechoEnvio.ENVIADO), tentativas=2)
+    placar.registrar(resultado("3", DesfechoEnvio.NUMERO_INVALIDO), tentativas=2)
+    ultimo = placar.registrar(resultado("4", DesfechoEnvio.ERRO), tentativas=3)
+    placar.registrar_repeticao()
+
+    assert ultimo == placar.processados == 5
+    assert (placar.sucessos, placar.falhas) == (2, 2)
+    assert placar.recuperados == 1
+    assert placar.numeros_invalidos == 1
+    assert [numero for numero, _ in placar.esgotados] == ["4"]  # inválido não
+    assert placar.repeticoes == 1
+    assert placar.por_desfecho == {
+        DesfechoEnvio.ENVIADO: 2,
+        DesfechoEnvio.NUMERO_INVALIDO: 1,
+        DesfechoEnvio.ERRO: 1,
+    }
+
+
+# ==================== CAMPANHA SALVA ====================
+
+
+def test_banco_acha_a_mesma_campanha_depois_de_reabrir(tmp_path):
+    caminho = str(tmp_path / "campanhas.db")
+    telefones = ["5561900000001", "5561900000002", "5561900000003"]
+
+    banco = automatizador.BancoCampanhas(caminho)
+    campanha_id, nova = banco.abrir_campanha(telefones, "oi", "lista.xlsx")
+    assert nova
+    banco.registrar_resultado(campanha_id, 0, automatizador.ENVIADO, sessao="S1")
+    banco.registrar_resultado(campanha_id, 2, automatizador.FALHOU, "caiu", "S2")
+    banco.fechar()
+
+    banco = automatizador.BancoCampanhas(caminho)
+    assert banco.abrir_campanha(telefones, "oi") == (campanha_id, False)
+    assert banco.resultados_salvos(campanha_id) == {
+        0: automatizador.ENVIADO,
+        2: automatizador.FALHOU,
+    }
+    assert banco.contar_status(campanha_id)[automatizador.PENDENTE] == 1
+
+    # Outra mensagem (ou outra lista) é outra campanha
+    assert banco.abrir_campanha(telefones, "tchau")[1]
+    assert banco.abrir_campanha(telefones[::-1], "oi")[1]
+    banco.fechar()
+
+
+class NavegadorFalso:
+    def __init__(self, perfil=None):
+        self.perfil = perfil
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+class MotorFalso(automatizador.MotorEnvio):
+    """Motor com N navegadores de mentira que para sozinho depois de X envios"""
+
+    def __init__(self, caminho_banco, sessoes, parar_depois=None):
+        super().__init__(
+            automatizador.ConfigEnvio(
+                qtd_sessoes=sessoes,
+                ritmo={"modo": automatizador.RITMO_FIXO, "pausa_fixa": 0},
+            )
+        )
+        self.banco = automatizador.BancoCampanhas(caminho_banco)
+        self.parar_depois = parar_depois
+        self.enviados = collections.Counter()
+        self._trava = threading.Lock()
+
+    def escrever_log(self, mensagem, tipo="info", nao_repetir=False):
+        pass
+
+    def configurar_chrome(self, perfil=None):
+        return NavegadorFalso(perfil)
+
+    def fazer_login_whatsapp(self, navegador):
+        return True
+
+    def mandar_mensagem(self, navegador, numero, texto):
+        with self._trava:
+            self.enviados[numero] += 1
+            if self.parar_depois and sum(self.enviados.values()) >= self.parar_depois:
+                self.ta_rodando = False
+        return resultado(numero, DesfechoEnvio.ENVIADO)
+
+
+def test_campanha_parada_no_meio_retoma_sem_repetir_ninguem(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # histórico vai pra pasta do teste
+    caminho = str(tmp_path / "campanhas.db")
+    telefones = [f"55619{i:08d}" for i in range(30)]
+
+    primeiro = MotorFalso(caminho, sessoes=3, parar_depois=10)
+    primeiro.usar_lista(list(telefones))
+    placar = primeiro.rodar_campanha("oi")
+    primeiro.encerrar()
+    assert not placar.concluida
+    enviados_antes = set(primeiro.enviados)
+    assert 10 <= len(enviados_antes) < len(telefones)
+
+    # "Fechou o programa": motor novo, mesma planilha e mesma mensagem
+    segundo = MotorFalso(caminho, sessoes=3)
+    segundo.usar_lista(list(telefones))
+    placar = segundo.rodar_campanha("oi")
+    segundo.encerrar()
+
+    assert placar.concluida
+    assert not enviados_antes & set(segundo.enviados)
+    todos = primeiro.enviados + segundo.enviados
+    assert set(todos) == set(telefones)
+    assert set(todos.values()) == {1}
+
+    banco = automatizador.BancoCampanhas(caminho)
+    campanha_id = banco.buscar_campanha(
+        automatizador.assinatura_campanha(telefones, "oi")
+    )
+    assert banco.contar_status(campanha_id) == {automatizador.ENVIADO: 30}
+    banco.fechar()
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Automatizador WhatsApp pela linha de comando (sem janela)
+Serve pra rodar num servidor, no agendador de tarefas ou num script: lê a
+planilha, manda a campanha com o mesmo motor da janela e sai com código 0
+se a campanha foi até o fim (1 se parou no meio ou não logou)
+
+Exemplos:
+  python whatsapp_cli.py contatos.xlsx --mensagem "Oi {Nome}!" --pausa 20
+  python whatsapp_cli.py contatos.csv --arquivo-mensagem promo.txt \\
+      --ritmo-automatico 120 --teto 180 --sessoes 2 --perfil loja --headless
+  python whatsapp_cli.py contatos.csv --mensagem "teste" --teste 61999999999
+  python whatsapp_cli.py contatos.xlsx --mensagem "Oi!" --inicio "2026-10-20 08:00" \\
+      --janela 09:00-18:00 --dias seg-sex --por-hora 40 --por-dia 300
+  python whatsapp_cli.py --agenda campanhas.json --perfil loja --simular
+
+Ctrl+C uma vez pede pra parar (termina o envio atual e salva o progresso);
+rodando de novo com a mesma planilha e mensagem continua de onde parou
+"""
+
+import argparse
+import collections
+import json
+import sys
+import threading
+import time
+from datetime import datetime
+
+from whatsapp_motor import (
+    MotorEnvio,
+    ConfigEnvio,
+    ControladorRitmo,
+    ModeloMensagem,
+    CampanhaAgendada,
+    JanelaEnvio,
+    AnexoCampanha,
+    AnexoInvalido,
+    PlanilhaSemColunaNumero,
+    carregar_contatos,
+    arrumar_numero_telefone,
+    limpar_nome_perfil,
+    ler_data_hora,
+    formatar_momento,
+    FASES_MEDIDAS,
+    FORMATOS_HISTORICO,
+    DURACAO_ENVIO_SIMULADA,
+    MAX_DIAS_SIMULACAO,
+    MAX_SESSOES,
+    RITMO_FIXO,
+    RITMO_ALEATORIO,
+    RITMO_AUTOMATICO,
+)
+
+INTERVALO_PROGRESSO = 10  # segundos entre as linhas de [PROGRESSO]
+TIPOS_LOG_QUIETO = ("warning", "error")
+
+
+class MotorTerminal(MotorEnvio):
+    """Motor que mostra o andamento no terminal, sem encher de linha"""
+
+    def __init__(self, config, quieto=False):
+        super().__init__(config)
+        self.quieto = quieto
+        self._ultimo_progresso = 0.0
+        self._total = 0
+
+    def escrever_log(self, mensagem, tipo="info", nao_repetir=False):
+        if self.quieto and tipo not in TIPOS_LOG_QUIETO:
+            return
+        super().escrever_log(mensagem, tipo, nao_repetir)
+
+    def mostrar_progresso(self, processados, total=None):
+        if total is not None:
+            self._total = total
+        agora = time.monotonic()
+        fim = self._total and processados >= self._total
+        if agora - self._ultimo_progresso < INTERVALO_PROGRESSO and not fim:
+            return
+        self._ultimo_progresso = agora
+
+        linha = f"[PROGRESSO] {processados}/{self._total}"
+        if self._total:
+            linha += f" ({processados / self._total:.0%})"
+        if self.medidor:
+            por_hora_agora, _ = self.medidor.mensagens_por_hora()
+            linha += f" | {por_hora_agora:.0f} msg/h"
+            alvo = self.medidor.ritmo_alvo()
+            if alvo:
+                linha += f" (mirando {alvo:.0f} msg/h)"
+        print(linha, flush=True)
+
+
+def montar_parser():
+    parser = argparse.ArgumentParser(
+        description="Manda a campanha do WhatsApp sem abrir a janela",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Exemplos:", 1)[1],
+    )
+    parser.add_argument(
+        "contatos", nargs="?", help="planilha .xlsx/.xls/.csv com a coluna Numero"
+    )
+
+    texto = parser.add_mutually_exclusive_group()
+    texto.add_argument("--mensagem", help="texto da mensagem (aceita {Coluna})")
+    texto.add_argument(
+        "--arquivo-mensagem", metavar="ARQUIVO", help="lê a mensagem de um .txt"
+    )
+
+    pausa = parser.add_mutually_exclusive_group()
+    pausa.add_argument(
+        "--pausa", type=float, default=20, metavar="SEG", help="pausa fixa (padrão 20)"
+    )
+    pausa.add_argument(
+        "--pausa-aleatoria",
+        type=float,
+        nargs=2,
+        metavar=("MIN", "MAX"),
+        help="pausa sorteada entre MIN e MAX segundos",
+    )
+    pausa.add_argument(
+        "--ritmo-automatico",
+        type=float,
+        metavar="ALVO",
+        help="mira ALVO msg/h por sessão e recua quando o WhatsApp reclama",
+    )
+    parser.add_argument(
+        "--teto",
+        type=float,
+        metavar="MSG_H",
+        help="máximo de msg/h do ritmo automático (padrão 1,5x o alvo)",
+    )
+
+    parser.add_argument(
+        "--sessoes", type=int, default=1, help=f"sessões paralelas (1 a {MAX_SESSOES})"
+    )
+    parser.add_argument("--perfil", help="perfil salvo do Chrome (login guardado)")
+    parser.add_argument(
+        "--headless", action="store_true", help="Chrome sem janela nenhuma"
+    )
+    parser.add_argument(
+        "--escondido", action="store_true", help="Chrome com janela fora da tela"
+    )
+    parser.add_argument(
+        "--por-paragrafo",
+        action="store_true",
+        help="um envio por parágrafo em vez da mensagem inteira",
+    )
+    parser.add_argument(
+        "--troca-interna",
+        action="store_true",
+        help="abre a próxima conversa sem recarregar a página (experimental)",
+    )
+    parser.add_argument(
+        "--assincrono",
+        action="store_true",
+        help="todas as sessões numa thread só, pelo DevTools (precisa do websockets)",
+    )
+    parser.add_argument("--anexo", help="imagem ou PDF (a mensagem vira legenda)")
+    parser.add_argument(
+        "--historico", choices=sorted(FORMATOS_HISTORICO), default="csv"
+    )
+    parser.add_argument(
+        "--teste",
+        nargs="?",
+        const="",
+        metavar="NUMERO",
+        help="manda só pra NUMERO (ou pro 1º da planilha) e sai",
+    )
+    parser.add_argument(
+        "--quieto", action="store_true", help="só avisos, erros e o progresso"
+    )
+
+    agenda = parser.add_argument_group("agenda")
+    agenda.add_argument(
+        "--inicio",
+        metavar="QUANDO",
+        help="só começa nessa hora ('AAAA-MM-DD HH:MM' ou 'HH:MM')",
+    )
+    agenda.add_argument(
+        "--janela",
+        metavar="HH:MM-HH:MM",
+        help="só manda nesse horário, na hora local de cada DDD",
+    )
+    agenda.add_argument(
+        "--dias", metavar="DIAS", help="dias da janela (padrão seg-sex; ex.: seg,qua)"
+    )
+    agenda.add_argument(
+        "--por-hora",
+        type=int,
+        metavar="N",
+        help="máximo de envios por hora de cada número",
+    )
+    agenda.add_argument(
+        "--por-dia",
+        type=int,
+        metavar="N",
+        help="máximo de envios em 24h de cada número",
+    )
+    agenda.add_argument(
+        "--agenda",
+        metavar="ARQUIVO",
+        help="JSON com várias campanhas (contatos, mensagem, inicio, prioridade)",
+    )
+    agenda.add_argument(
+        "--simular",
+        action="store_true",
+        help="mostra quando cada envio sairia (relógio de mentira, sem Chrome) e sai",
+    )
+    return parser
+
+
+def config_ritmo(args, parser):
+    """Mesmas regras da tela (ler_config_ritmo), vindas dos argumentos"""
+    if args.ritmo_automatico is not None:
+        teto = args.teto or args.ritmo_automatico * 1.5
+        if args.ritmo_automatico <= 0 or teto < args.ritmo_automatico:
+            parser.error("o alvo tem que ser positivo e o teto não pode ser menor")
+        return {
+            "modo": RITMO_AUTOMATICO,
+            "alvo_por_hora": args.ritmo_automatico,
+            "teto_por_hora": teto,
+        }
+    if args.teto is not None:
+        parser.error("--teto só vale junto com --ritmo-automatico")
+    if args.pausa_aleatoria:
+        minima, maxima = args.pausa_aleatoria
+        if minima < 0 or minima >= maxima:
+            parser.error("a pausa mínima tem que ser menor que a máxima")
+        return {"modo": RITMO_ALEATORIO, "pausa_minima": minima, "pausa_maxima": maxima}
+    if args.pausa < 0:
+        parser.error("a pausa não pode ser negativa")
+    return {"modo": RITMO_FIXO, "pausa_fixa": args.pausa}
+
+
+def ler_mensagem(args, parser):
+    if args.mensagem is not None:
+        mensagem = args.mensagem
+    else:
+        try:
+            with open(args.arquivo_mensagem, encoding="utf-8") as arquivo:
+                mensagem = arquivo.read()
+        except OSError as erro:
+            parser.error(f"não deu pra ler a mensagem: {erro}")
+    mensagem = mensagem.strip()
+    if not mensagem:
+        parser.error("a mensagem está vazia")
+    return mensagem
+
+
+def config_janela(args, parser):
+    if args.janela is None:
+        if args.dias:
+            parser.error("--dias só vale junto com --janela")
+        return None
+    try:
+        return JanelaEnvio.de_texto(args.janela, args.dias or "seg-sex")
+    except ValueError as erro:
+        parser.error(str(erro))
+
+
+def ler_inicio(texto, parser):
+    if not texto:
+        return 0.0
+    try:
+        return ler_data_hora(texto)
+    except ValueError as erro:
+        parser.error(str(erro))
+
+
+def carregar_campanha(contatos, mensagem, parser, nome=None, inicio=0.0, prioridade=0):
+    """Lê a planilha, confere as variáveis da mensagem e monta a campanha"""
+    colunas = {}
+    try:
+        telefones, rejeitados, duplicados = carregar_contatos(contatos, colunas=colunas)
+    except PlanilhaSemColunaNumero as erro:
+        parser.error(str(erro))
+    except Exception as erro:
+        parser.error(f"não deu pra ler {contatos}: {erro}")
+    if not telefones:
+        parser.error(f"nenhum telefone válido em {contatos}")
+    print(
+        f"✅ {len(telefones)} válidos | ⚠️ {len(rejeitados)} rejeitados | "
+        f"🔄 {duplicados} duplicatas"
+    )
+
+    modelo = ModeloMensagem(mensagem)
+    faltando = modelo.faltando(colunas)
+    if faltando:
+        parser.error(
+            f"a mensagem usa {', '.join(f'{{{nome}}}' for nome in faltando)}, "
+            f"mas {contatos} só tem: {', '.join(colunas) or 'a coluna Numero'}"
+        )
+    return CampanhaAgendada(
+        nome or contatos, telefones, mensagem, colunas, modelo, inicio, prioridade
+    )
+
+
+def ler_agenda(caminho, parser):
+    """
+    Campanhas de um JSON, por exemplo:
+    [{"contatos": "clientes.xlsx", "mensagem": "Oi {Nome}!", "inicio": "08:00"},
+     {"contatos": "vip.csv", "arquivo_mensagem": "vip.txt", "prioridade": 5}]
+    """
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            itens = json.load(arquivo)
+    except (OSError, ValueError) as erro:
+        parser.error(f"não deu pra ler a agenda: {erro}")
+    if not isinstance(itens, list) or not itens:
+        parser.error("a agenda tem que ser uma lista de campanhas")
+
+    campanhas = []
+    for posicao, item in enumerate(itens, 1):
+        if not isinstance(item, dict) or "contatos" not in item:
+            parser.error(f"campanha {posicao} da agenda sem 'contatos'")
+        if not (item.get("mensagem") or item.get("arquivo_mensagem")):
+            parser.error(f"campanha {posicao} da agenda sem mensagem")
+        mensagem = ler_mensagem(
+            argparse.Namespace(
+                mensagem=item.get("mensagem"),
+                arquivo_mensagem=item.get("arquivo_mensagem"),
+            ),
+            parser,
+        )
+        campanhas.append(
+            carregar_campanha(
+                item["contatos"],
+                mensagem,
+                parser,
+                nome=item.get("nome", f"{posicao}. {item['contatos']}"),
+                inicio=ler_inicio(item.get("inicio"), parser),
+                prioridade=int(item.get("prioridade", 0)),
+            )
+        )
+    return campanhas
+
+
+def imprimir_simulacao(motor, campanhas):
+    """Quando cada campanha rodaria, quantos envios por dia e por número"""
+    envios = motor.simular_agenda(campanhas)
+    print(
+        f"\nSimulação: cada envio levando {DURACAO_ENVIO_SIMULADA}s + a pausa, "
+        "sem falha nenhuma"
+    )
+    for campanha in campanhas:
+        momentos = [momento for momento, _, nome, _ in envios if nome == campanha.nome]
+        linha = f"  {campanha.nome}: {len(momentos)}/{len(campanha.telefones)} envios"
+        if momentos:
+            linha += f", de {formatar_momento(min(momentos))} a {formatar_momento(max(momentos))}"
+        if len(momentos) < len(campanha.telefones):
+            linha += f" (o resto não coube em {MAX_DIAS_SIMULACAO} dias)"
+        print(linha)
+
+    por_dia = collections.Counter(
+        (datetime.fromtimestamp(momento).strftime("%d/%m"), remetente)
+        for momento, remetente, _, _ in envios
+    )
+    for dia in sorted({dia for dia, _ in por_dia}, key=lambda d: d[3:] + d[:2]):
+        numeros = " | ".join(
+            f"{remetente} {quantos}"
+            for (outro_dia, remetente), quantos in sorted(por_dia.items())
+            if outro_dia == dia
+        )
+        print(f"  {dia}: {numeros}")
+
+
+def rodar_em_segundo_plano(motor, alvo, *args):
+    """
+    Roda o envio numa thread e espera aqui; o primeiro Ctrl+C pede pra parar
+    com calma, o segundo desiste de esperar
+    """
+    saida = {}
+    thread = threading.Thread(
+        target=lambda: saida.setdefault("valor", alvo(*args)), daemon=True
+    )
+    thread.start()
+    parando = False
+    while thread.is_alive():
+        try:
+            thread.join(0.5)
+        except KeyboardInterrupt:
+            if parando:
+                print("\nSaindo sem esperar o envio atual", file=sys.stderr)
+                break
+            parando = True
+            motor.parar()
+    return saida.get("valor")
+
+
+def imprimir_percentis(medidor):
+    percentis = medidor.percentis() if medidor else {}
+    if not percentis:
+        return
+    print("\nTempo por fase:")
+    for fase, rotulo in FASES_MEDIDAS:
+        if fase in percentis:
+            numeros = percentis[fase]
+            print(
+                f"  {rotulo:<30} n={numeros['n']:<5} p50 {numeros['p50']:6.2f}s "
+                f"p95 {numeros['p95']:6.2f}s p99 {numeros['p99']:6.2f}s"
+            )
+
+
+def main(argv=None):
+    parser = montar_parser()
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.sessoes <= MAX_SESSOES:
+        parser.error(f"--sessoes deve ser um número de 1 a {MAX_SESSOES}")
+    if args.teste is not None and args.sessoes > 1:
+        parser.error("--teste usa uma sessão só")
+    if args.agenda:
+        if args.contatos or args.mensagem or args.arquivo_mensagem or args.inicio:
+            parser.error(
+                "com --agenda a planilha, a mensagem e o início vêm do arquivo"
+            )
+        if args.teste is not None:
+            parser.error("--teste não vale junto com --agenda")
+    elif not args.contatos or (args.mensagem is None and not args.arquivo_mensagem):
+        parser.error("informe a planilha e --mensagem ou --arquivo-mensagem")
+    for opcao, valor in (("--por-hora", args.por_hora), ("--por-dia", args.por_dia)):
+        if valor is not None and valor < 1:
+            parser.error(f"{opcao} tem que ser pelo menos 1")
+
+    config = ConfigEnvio(
+        headless=args.headless,
+        chrome_escondido=args.escondido,
+        mensagem_unica=not args.por_paragrafo,
+        navegacao_interna=args.troca_interna,
+        qtd_sessoes=args.sessoes,
+        perfil=limpar_nome_perfil(args.perfil) if args.perfil else None,
+        formato_historico=args.historico,
+        ritmo=config_ritmo(args, parser),
+        assincrono=args.assincrono,
+        janela=config_janela(args, parser),
+        max_por_hora=args.por_hora,
+        max_por_dia=args.por_dia,
+    )
+    motor = MotorTerminal(config, quieto=args.quieto)
+
+    if args.agenda:
+        campanhas = ler_agenda(args.agenda, parser)
+    else:
+        mensagem = ler_mensagem(args, parser)
+        campanhas = [
+            carregar_campanha(
+                args.contatos, mensagem, parser, inicio=ler_inicio(args.inicio, parser)
+            )
+        ]
+    campanha = campanhas[0]
+    telefones, modelo = campanha.telefones, campanha.modelo
+    motor.usar_lista(telefones, campanha.colunas, campanha.nome)
+
+    if args.anexo:
+        try:
+            motor.anexo = AnexoCampanha(args.anexo)
+        except (AnexoInvalido, OSError) as erro:
+            parser.error(f"anexo inválido: {erro}")
+
+    print(f"⏱️ {ControladorRitmo(**config.ritmo).descrever()}")
+
+    if args.simular:
+        imprimir_simulacao(motor, campanhas)
+        return 0
+
+    try:
+        if args.teste is not None:
+            numero = arrumar_numero_telefone(args.teste) if args.teste else telefones[0]
+            if not numero:
+                parser.error(f"número de teste inválido: {args.teste}")
+            mensagem = campanha.mensagem
+            if modelo.tem_variaveis:
+                mensagem = modelo.renderizar(motor.valores_do_destinatario(0))
+            resultado = rodar_em_segundo_plano(
+                motor, motor.enviar_teste, mensagem, numero
+            )
+            imprimir_percentis(motor.medidor)
+            return 0 if resultado else 1
+
+        if args.agenda or args.inicio:
+            placares = (
+                rodar_em_segundo_plano(motor, motor.rodar_agenda, campanhas) or {}
+            )
+            for campanha in campanhas:
+                placar = placares.get(campanha.nome)
+                situacao = (
+                    "concluída"
+                    if campanha.concluida
+                    else (
+                        f"parou em {campanha.indice_atual}/{len(campanha.telefones)}"
+                        if placar
+                        else "não começou"
+                    )
+                )
+                print(f"📋 {campanha.nome}: {situacao}")
+            imprimir_percentis(motor.medidor)
+            return 0 if all(campanha.concluida for campanha in campanhas) else 1
+
+        placar = rodar_em_segundo_plano(
+            motor, motor.rodar_campanha, campanha.mensagem, modelo
+        )
+        if placar and placar.concluida:
+            print("\n" + motor.relatorio_final(placar))
+        imprimir_percentis(motor.medidor)
+        return 0 if placar and placar.concluida else 1
+    finally:
+        motor.encerrar()
+        if motor.banco:
+            motor.banco.fechar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5009 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de envio do Automatizador WhatsApp, sem nada de tela
+Tudo que abre o Chrome, faz login, manda mensagem e guarda o progresso fica
+aqui; a janela (WhatsApp_Automatizador_CODIGO_COMPLETO.py) e a linha de
+comando (whatsapp_cli.py) só montam a ConfigEnvio e mostram o andamento
+O pandas só é importado quando precisa (lista grande ou planilha .xls)
+"""
+
+import time
+import threading
+import tempfile
+import heapq
+import itertools
+import hashlib
+import base64
+import mimetypes
+import shutil
+import queue
+import json
+import sqlite3
+import collections
+import contextlib
+import contextvars
+import asyncio
+import urllib.request
+from array import array
+import numpy as np
+import random
+import re
+import os
+import webbrowser
+from datetime import datetime, timedelta, timezone, time as hora_do_dia
+from dataclasses import dataclass, field
+from enum import Enum
+import csv
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    JavascriptException,
+)
+
+try:
+    import psutil  # opcional: só serve pra medir CPU e memória do Chrome
+except ImportError:
+    psutil = None
+
+try:
+    import websockets  # opcional: só pro envio assíncrono pelo DevTools
+except ImportError:
+    websockets = None
+
+# Com várias sessões cada uma marca as suas linhas do log ([S1], [S2]...).
+# ContextVar vale por thread e também por task do asyncio
+PREFIXO_LOG = contextvars.ContextVar("prefixo_log", default="")
+
+# ==================== FUNÇÕES AUXILIARES ====================
+
+
+def inserir_texto_com_emojis(navegador, elemento, texto):
+    """
+    Insere texto com suporte completo a emojis e caracteres Unicode
+    Usa múltiplas estratégias para garantir funcionamento com WhatsApp Web
+    """
+    if not texto:
+        return
+
+    try:
+        sucesso = navegador.execute_script(
+            """
+            try {
+                var elemento = arguments[0];
+                var texto = arguments[1];
+                
+                elemento.focus();
+                
+                var dataTransfer = new DataTransfer();
+                dataTransfer.setData('text/plain', texto);
+                
+                var pasteEvent = new ClipboardEvent('paste', {
+                    bubbles: true,
+                    cancelable: true,
+                    clipboardData: dataTransfer
+                });
+                
+                elemento.dispatchEvent(pasteEvent);
+                
+                if (!elemento.textContent || elemento.textContent.length === 0) {
+                    elemento.innerHTML = '';
+                    var linhas = texto.split('\\n');
+                    for (var i = 0; i < linhas.length; i++) {
+                        var textNode = document.createTextNode(linhas[i]);
+                        elemento.appendChild(textNode);
+                        if (i < linhas.length - 1) {
+                            elemento.appendChild(document.createElement('br'));
+                        }
+                    }
+                }
+                
+                var range = document.createRange();
+                var sel = window.getSelection();
+                range.selectNodeContents(elemento);
+                range.collapse(false);
+                sel.removeAllRanges();
+                sel.addRange(range);
+                
+                elemento.dispatchEvent(new Event('input', { bubbles: true }));
+                elemento.dispatchEvent(new Event('change', { bubbles: true }));
+                
+                return true;
+            } catch (e) {
+                console.error('Erro ao inserir texto:', e);
+                return false;
+            }
+        """,
+            elemento,
+            texto,
+        )
+
+        if sucesso:
+            # Espera o WhatsApp registrar o texto no campo (em vez de sleep fixo)
+            try:
+                WebDriverWait(navegador, 2, poll_frequency=0.05).until(
+                    lambda d: d.execute_script(
+                        "return arguments[0].textContent.length > 0;", elemento
+                    )
+                )
+            except TimeoutException:
+                pass
+
+        return sucesso
+
+    except Exception as e:
+        print(f"Erro na função inserir_texto_com_emojis: {e}")
+        return False
+
+
+def arrumar_numero_telefone(telefone):
+    """
+    Arruma o número de telefone pro formato que o WhatsApp entende
+    Aceita: (11) 99999-9999, 11999999999, 5511999999999
+    Retorna sempre: 5511999999999 (com código do Brasil)
+    """
+    if isinstance(telefone, (list, tuple, set, dict)) or not telefone:
+        return None  # célula com lista não é um telefone
+
+    telefone_limpo = str(telefone).strip()
+    so_numeros = re.sub(r"[^\d]", "", telefone_limpo)
+
+    if len(so_numeros) == 13 and so_numeros.startswith("55"):
+        return so_numeros
+    elif len(so_numeros) in (10, 11):
+        return "55" + so_numeros
+
+    return None
+
+
+def limpar_lista_telefones(lista_telefones):
+    """
+    Limpa a lista de telefones: remove duplicados e separa os válidos dos inválidos
+    Retorna: (telefones_validos, telefones_invalidos, quantos_eram_duplicados)
+    """
+    telefones_ok = []
+    telefones_ruins = []
+    ja_vimos = set()
+    quantos_duplicados = 0
+
+    for telefone in lista_telefones:
+        telefone_arrumado = arrumar_numero_telefone(telefone)
+
+        if telefone_arrumado:
+            if telefone_arrumado not in ja_vimos:
+                telefones_ok.append(telefone_arrumado)
+                ja_vimos.add(telefone_arrumado)
+            else:
+                quantos_duplicados += 1
+        else:
+            telefones_ruins.append(str(telefone))
+
+    return telefones_ok, telefones_ruins, quantos_duplicados
+
+
+# Texto maior que isso numa célula não entra no array do NumPy
+TAMANHO_MAX_LOTE = 64
+
+# Colunas que valem o caminho do NumPy: só texto ou só inteiro (vazio pode).
+# Misturada (int + texto + None do Excel, lista numa célula...) vai número a
+# número: converter pra texto do NumPy custa mais do que ganha e lista explode
+TIPOS_COLUNA_EM_LOTE = ("string", "integer")
+
+
+def coluna_vale_lote(serie):
+    import pandas as pd
+
+    return pd.api.types.infer_dtype(serie, skipna=True) in TIPOS_COLUNA_EM_LOTE
+
+
+def normalizar_telefones_em_lote(valores):
+    """
+    Mesma regra do arrumar_numero_telefone, só que pra lista inteira de uma vez
+    com as operações de texto vetorizadas do NumPy (bem mais rápido em lista
+    grande de texto ou de inteiro; coluna misturada vai número a número)
+    Retorna uma Series (mesma ordem da entrada) com o número arrumado ou None
+    """
+    import pandas as pd
+
+    serie = pd.Series(valores, dtype=object)
+    if serie.empty:
+        return serie
+    if not coluna_vale_lote(serie):
+        return pd.Series(
+            [arrumar_numero_telefone(valor) for valor in serie],
+            index=serie.index,
+            dtype=object,
+        )
+
+    vazios = ~serie.astype(bool).to_numpy()  # mesmo "if not telefone" da versão normal
+
+    # Texto gigante numa célula faria o array de texto do NumPy explodir de
+    # tamanho (toda linha ocupa o tamanho da maior); esses vão pela versão normal
+    tamanho_texto = np.fromiter(
+        (len(valor) if isinstance(valor, str) else 0 for valor in serie),
+        dtype=np.int64,
+        count=len(serie),
+    )
+    longos = tamanho_texto > TAMANHO_MAX_LOTE
+    if longos.any():
+        arrumados = normalizar_telefones_em_lote(serie[~longos])
+        arrumados = arrumados.reindex(serie.index)
+        arrumados[longos] = serie[longos].map(arrumar_numero_telefone)
+        return arrumados.astype(object).where(arrumados.notna(), None)
+
+    # Cada texto vira uma linha de códigos unicode; tirar o que não é dígito
+    # é empurrar os dígitos pra esquerda (argsort estável) e zerar o resto
+    textos = serie.to_numpy(dtype=str)
+    codigos = textos.view(np.uint32).reshape(len(textos), -1)
+    eh_digito = (codigos >= ord("0")) & (codigos <= ord("9"))
+    ordem = np.argsort(~eh_digito, axis=1, kind="stable")
+    so_numeros = np.take_along_axis(np.where(eh_digito, codigos, 0), ordem, axis=1)
+    so_numeros = np.ascontiguousarray(so_numeros).view(textos.dtype).ravel()
+
+    # Fora do ASCII pode ter dígito de outro alfabeto (o \d do re aceita),
+    # então esses poucos vão pelo re.sub igual à versão normal
+    fora_do_ascii = (codigos > 127).any(axis=1)
+    if fora_do_ascii.any():
+        so_numeros[fora_do_ascii] = (
+            serie[fora_do_ascii].map(str).str.replace(r"[^\d]", "", regex=True)
+        ).to_numpy()
+
+    tamanho = np.char.str_len(so_numeros)
+    ja_completo = (tamanho == 13) & np.char.startswith(so_numeros, "55")
+    sem_pais = (tamanho == 10) | (tamanho == 11)
+
+    arrumados = np.where(sem_pais, np.char.add("55", so_numeros), so_numeros)
+    validos = (ja_completo | sem_pais) & ~vazios
+    return pd.Series(
+        np.where(validos, arrumados.astype(object), None),
+        index=serie.index,
+        dtype=object,
+    )
+
+
+def limpar_lista_telefones_em_lote(lista_telefones):
+    """
+    Versão em lote do limpar_lista_telefones (mesma saída, mesma ordem)
+    Retorna: (telefones_validos, telefones_invalidos, quantos_eram_duplicados)
+    """
+    import pandas as pd
+
+    valores = pd.Series(lista_telefones, dtype=object)
+    if not coluna_vale_lote(valores):
+        return limpar_lista_telefones(lista_telefones)
+    arrumados = normalizar_telefones_em_lote(valores)
+
+    validos = arrumados.notna()
+    sem_repetir = arrumados[validos].drop_duplicates()
+    telefones_ruins = valores[~validos].map(str).tolist()
+
+    return (
+        sem_repetir.tolist(),
+        telefones_ruins,
+        int(validos.sum()) - len(sem_repetir),
+    )
+
+
+# ==================== LEITURA DA PLANILHA ====================
+# Lê a planilha linha a linha (openpyxl read_only pro .xlsx, csv pro .csv) em
+# vez de montar o DataFrame inteiro: memória pequena e dá pra mostrar o
+# progresso enquanto carrega. Além do "Numero", as outras colunas com título
+# vêm junto como texto, pras variáveis da mensagem ({Nome}, {Valor}...).
+
+COLUNA_NUMERO = "Numero"
+
+EXTENSOES_XLSX = (".xlsx", ".xlsm")
+
+# Quantas linhas da planilha são arrumadas de uma vez (em lote)
+TAMANHO_BLOCO_CARGA = 50000
+
+# Bloco menor que isso é arrumado número a número (sem pandas/NumPy)
+MIN_LINHAS_EM_LOTE = 2000
+
+
+class PlanilhaSemColunaNumero(Exception):
+    pass
+
+
+def valor_celula_telefone(valor):
+    """Célula vazia vira None; número do Excel (às vezes float) vira texto sem .0"""
+    if valor is None:
+        return None
+    if isinstance(valor, float):
+        if valor != valor:  # NaN
+            return None
+        if valor.is_integer():
+            return str(int(valor))
+    texto = str(valor).strip()
+    return texto or None
+
+
+def valor_celula_texto(valor):
+    """Célula das outras colunas como vai aparecer na mensagem (vazia vira "")"""
+    if valor is None:
+        return ""
+    if isinstance(valor, float):
+        if valor != valor:  # NaN
+            return ""
+        if valor.is_integer():
+            return str(int(valor))
+        return f"{valor:.2f}".replace(".", ",")
+    if isinstance(valor, datetime):
+        if valor.hour or valor.minute:
+            return valor.strftime("%d/%m/%Y %H:%M")
+        return valor.strftime("%d/%m/%Y")
+    return str(valor).strip()
+
+
+def separar_colunas(cabecalho):
+    """
+    Retorna: (índice da coluna Numero, [(índice, título)] das outras colunas com título)
+    Levanta PlanilhaSemColunaNumero se a coluna não existe
+    """
+    coluna_numero = None
+    outras = []
+    for indice, titulo in enumerate(cabecalho):
+        titulo = "" if titulo is None else str(titulo).strip()
+        if titulo == COLUNA_NUMERO and coluna_numero is None:
+            coluna_numero = indice
+        elif titulo:
+            outras.append((indice, titulo))
+
+    if coluna_numero is None:
+        raise PlanilhaSemColunaNumero(COLUNA_NUMERO)
+    return coluna_numero, outras
+
+
+def linhas_com_numero(linhas, cabecalho, colunas):
+    """Gera (numero, (texto das outras colunas...)) das linhas que têm número"""
+    coluna, outras = separar_colunas(cabecalho)
+    if colunas is not None:
+        colunas[:] = [titulo for _, titulo in outras]
+
+    for linha in linhas:
+        if coluna < len(linha):
+            valor = valor_celula_telefone(linha[coluna])
+            if valor is not None:
+                if not outras:
+                    yield valor, ()
+                    continue
+                yield valor, tuple(
+                    valor_celula_texto(linha[indice]) if indice < len(linha) else ""
+                    for indice, _ in outras
+                )
+
+
+def ler_linhas_xlsx(caminho, total=None, colunas=None):
+    import openpyxl  # já vem junto com o pandas pra ler Excel
+
+    pasta = openpyxl.load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        aba = pasta.worksheets[0]
+        if total is not None and aba.max_row:
+            total[0] = aba.max_row - 1
+        linhas = aba.iter_rows(values_only=True)
+        yield from linhas_com_numero(linhas, next(linhas, ()), colunas)
+    finally:
+        pasta.close()
+
+
+def ler_linhas_csv(caminho, colunas=None):
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        amostra = arquivo.read(4096)
+        arquivo.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+
+        linhas = csv.reader(arquivo, dialeto)
+        yield from linhas_com_numero(linhas, next(linhas, []), colunas)
+
+
+def ler_linhas_planilha(caminho, total=None, colunas=None):
+    """
+    Gerador de (numero, (texto das outras colunas...)), uma linha por vez
+    total: lista [None] que recebe o nº de linhas quando o formato informa
+    (o .xlsx guarda isso no cabeçalho; o .csv só dá pra saber lendo tudo)
+    colunas: lista que recebe os títulos das outras colunas (na 1ª linha lida)
+    Levanta PlanilhaSemColunaNumero se a coluna não existe
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in EXTENSOES_XLSX:
+        return ler_linhas_xlsx(caminho, total, colunas)
+    if extensao == ".csv":
+        return ler_linhas_csv(caminho, colunas)
+
+    # .xls e outros formatos antigos: pandas lê tudo de uma vez
+    import pandas as pd
+
+    dataframe = pd.read_excel(caminho, dtype=object)
+    if total is not None:
+        total[0] = len(dataframe)
+    return linhas_com_numero(
+        dataframe.itertuples(index=False, name=None), list(dataframe.columns), colunas
+    )
+
+
+def carregar_contatos(caminho, progresso=None, colunas=None):
+    """
+    Lê a planilha e já limpa a lista (igual ao limpar_lista_telefones)
+    progresso(lidos, total_ou_None) vai sendo chamado durante a leitura
+    colunas: dict que recebe {título: [valores]} das outras colunas, na mesma
+    ordem dos telefones válidos (só o 1º de cada telefone repetido fica)
+    Retorna: (telefones_validos, telefones_invalidos, quantos_eram_duplicados)
+    """
+    total = [None]
+    titulos = []
+    linhas = ler_linhas_planilha(caminho, total, titulos)
+
+    # Lê em blocos: cada bloco é arrumado em lote e a memória continua pequena
+    telefones_ok = []
+    telefones_ruins = []
+    valores_colunas = None
+    ja_vimos = set()
+    quantos_duplicados = 0
+    lidos = 0
+
+    while True:
+        bloco = list(itertools.islice(linhas, TAMANHO_BLOCO_CARGA))
+        if not bloco:
+            break
+        if valores_colunas is None:
+            valores_colunas = [[] for _ in titulos] if colunas is not None else []
+
+        numeros = [numero for numero, _ in bloco]
+        if len(bloco) < MIN_LINHAS_EM_LOTE:
+            # Lista pequena: o jeito normal é rápido e nem precisa carregar o pandas
+            arrumados = [arrumar_numero_telefone(numero) for numero in numeros]
+        else:
+            arrumados = normalizar_telefones_em_lote(numeros).tolist()
+        for (numero, outras), telefone in zip(bloco, arrumados):
+            if telefone is None:
+                telefones_ruins.append(str(numero))
+            elif telefone in ja_vimos:
+                quantos_duplicados += 1
+            else:
+                telefones_ok.append(telefone)
+                ja_vimos.add(telefone)
+                for valores, valor in zip(valores_colunas, outras):
+                    valores.append(valor)
+
+        lidos += len(bloco)
+        if progresso:
+            progresso(lidos, total[0])
+
+    if colunas is not None:
+        colunas.clear()
+        colunas.update(zip(titulos, valores_colunas or [[] for _ in titulos]))
+
+    return telefones_ok, telefones_ruins, quantos_duplicados
+
+
+# ==================== MODELO DA MENSAGEM ====================
+# A mensagem pode ter variáveis com o nome de qualquer coluna da planilha:
+# "Oi {Nome}, seu boleto de R$ {Valor} vence {Vencimento}". O modelo é
+# compilado uma vez e as mensagens de todo mundo são montadas de uma vez
+# antes de começar. Pra escrever chave de verdade: {{ e }}.
+
+PADRAO_VARIAVEL = re.compile(r"\{\{|\}\}|\{([^{}\n]*[^{}\s][^{}\n]*)\}")
+
+
+def chave_coluna(nome):
+    """Nome de coluna/variável sem diferença de maiúscula e espaço nas pontas"""
+    return str(nome).strip().casefold()
+
+
+class ModeloMensagem:
+    """Texto com {variáveis} compilado num str.format posicional"""
+
+    def __init__(self, texto):
+        self.texto = texto
+        self.variaveis = []  # nomes como foram escritos, sem repetir
+        chaves = []
+        pedacos = []
+        fim_anterior = 0
+
+        for achado in PADRAO_VARIAVEL.finditer(texto):
+            pedacos.append(self._literal(texto[fim_anterior : achado.start()]))
+            fim_anterior = achado.end()
+
+            if achado.group(1) is None:  # {{ ou }}
+                pedacos.append(self._literal(achado.group(0)[0]))
+                continue
+
+            chave = chave_coluna(achado.group(1))
+            if chave not in chaves:
+                chaves.append(chave)
+                self.variaveis.append(achado.group(1).strip())
+            pedacos.append(f"{{{chaves.index(chave)}}}")
+
+        pedacos.append(self._literal(texto[fim_anterior:]))
+        self._chaves = chaves
+        self._formatar = "".join(pedacos).format
+
+    @staticmethod
+    def _literal(trecho):
+        return trecho.replace("{", "{{").replace("}", "}}")
+
+    @property
+    def tem_variaveis(self):
+        return bool(self._chaves)
+
+    def faltando(self, colunas):
+        """Variáveis do texto que não são coluna da planilha"""
+        disponiveis = {chave_coluna(nome) for nome in colunas}
+        return [
+            nome
+            for nome, chave in zip(self.variaveis, self._chaves)
+            if chave not in disponiveis
+        ]
+
+    def _valores_por_chave(self, colunas):
+        por_chave = {chave_coluna(nome): valores for nome, valores in colunas.items()}
+        faltando = self.faltando(colunas)
+        if faltando:
+            raise KeyError(", ".join(faltando))
+        return [por_chave[chave] for chave in self._chaves]
+
+    def renderizar(self, valores):
+        """valores: {coluna: texto} de um destinatário"""
+        return self._formatar(*self._valores_por_chave(valores))
+
+    def renderizar_em_lote(self, colunas, total):
+        """
+        Mensagem de cada destinatário, na ordem: colunas = {título: [valores]}
+        Levanta KeyError com os nomes se faltar coluna
+        """
+        if not self._chaves:
+            texto = self._formatar()
+            return [texto] * total
+        return list(map(self._formatar, *self._valores_por_chave(colunas)))
+
+
+# Várias sessões podem salvar ao mesmo tempo, uma de cada vez no arquivo
+_trava_historico = threading.Lock()
+
+
+def salvar_no_historico(telefone, deu_certo, mensagem="", observacao=""):
+    """
+    Salva o resultado do envio num arquivo CSV pra poder ver depois o que aconteceu
+    """
+    arquivo_csv = "historico_envios.csv"
+
+    try:
+        with _trava_historico, open(
+            arquivo_csv, "a", newline="", encoding="utf-8"
+        ) as arquivo:
+            arquivo_novo = arquivo.tell() == 0
+            escritor = csv.writer(arquivo)
+
+            if arquivo_novo:
+                escritor.writerow(
+                    ["Data", "Hora", "Telefone", "Status", "Observacao", "Tamanho_Msg"]
+                )
+
+            agora = datetime.now()
+            data = agora.strftime("%d/%m/%Y")
+            hora = agora.strftime("%H:%M:%S")
+
+            escritor.writerow(
+                [data, hora, telefone, deu_certo, observacao, len(mensagem)]
+            )
+    except Exception as erro:
+        print(f"[ERRO] Não consegui salvar no arquivo CSV: {str(erro)}")
+
+
+# ==================== HISTÓRICO EM LOTE ====================
+# O salvar_no_historico abre e fecha o CSV a cada envio. O GravadorHistorico
+# recebe os resultados numa fila e uma thread só escreve tudo em lotes.
+
+ARQUIVO_HISTORICO = "historico_envios"
+
+FORMATOS_HISTORICO = {"csv": ".csv", "jsonl": ".jsonl", "sqlite": ".db"}
+
+CAMPOS_HISTORICO = ["Data", "Hora", "Telefone", "Status", "Observacao", "Tamanho_Msg"]
+
+# nunca = deixa o sistema decidir | a_cada_flush = fsync junto com cada flush
+# so_no_fim = fsync só quando fecha (padrão: rápido e seguro se o app fechar direito)
+POLITICAS_FSYNC = ("nunca", "a_cada_flush", "so_no_fim")
+
+_FIM_HISTORICO = object()
+
+
+class EscritorCsv:
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, "a", newline="", encoding="utf-8")
+        self.escritor = csv.writer(self.arquivo)
+        if self.arquivo.tell() == 0:
+            self.escritor.writerow(CAMPOS_HISTORICO)
+
+    def escrever(self, linhas):
+        self.escritor.writerows(linhas)
+
+    def flush(self, fsync):
+        self.arquivo.flush()
+        if fsync:
+            os.fsync(self.arquivo.fileno())
+
+    def fechar(self, fsync):
+        self.flush(fsync)
+        self.arquivo.close()
+
+
+class EscritorJsonl(EscritorCsv):
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, "a", encoding="utf-8")
+        self.chaves = [campo.lower() for campo in CAMPOS_HISTORICO]
+
+    def escrever(self, linhas):
+        self.arquivo.writelines(
+            json.dumps(dict(zip(self.chaves, linha)), ensure_ascii=False) + "\n"
+            for linha in linhas
+        )
+
+
+class EscritorSqlite:
+    def __init__(self, caminho, fsync):
+        self.conexao = sqlite3.connect(caminho)
+        modo = "OFF" if fsync == "nunca" else "NORMAL"
+        self.conexao.execute(f"PRAGMA synchronous={modo}")
+        self.conexao.execute(
+            "CREATE TABLE IF NOT EXISTS historico ("
+            "data TEXT, hora TEXT, telefone TEXT, status TEXT, "
+            "observacao TEXT, tamanho_msg INTEGER)"
+        )
+
+    def escrever(self, linhas):
+        self.conexao.executemany(
+            "INSERT INTO historico VALUES (?, ?, ?, ?, ?, ?)", linhas
+        )
+
+    def flush(self, fsync):
+        # O SQLite faz o fsync no commit conforme o PRAGMA synchronous
+        self.conexao.commit()
+
+    def fechar(self, fsync):
+        self.conexao.commit()
+        self.conexao.close()
+
+
+class GravadorHistorico:
+    """
+    Histórico com thread própria: registrar() só joga o resultado na fila
+    (pode chamar de várias sessões ao mesmo tempo) e a thread escreve em lotes
+    Fila limitada: se o disco não der conta, quem registra espera um pouco
+    Sempre chamar fechar() no fim pra garantir que tudo foi pro arquivo
+    """
+
+    def __init__(
+        self,
+        caminho_base=ARQUIVO_HISTORICO,
+        formato="csv",
+        tamanho_fila=10000,
+        tamanho_lote=1000,
+        intervalo_flush=1.0,
+        fsync="so_no_fim",
+    ):
+        if formato not in FORMATOS_HISTORICO:
+            raise ValueError(f"Formato de histórico desconhecido: {formato}")
+        if fsync not in POLITICAS_FSYNC:
+            raise ValueError(f"Política de fsync desconhecida: {fsync}")
+
+        self.caminho = caminho_base + FORMATOS_HISTORICO[formato]
+        self.formato = formato
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_flush = intervalo_flush
+        self.fsync = fsync
+        self.gravados = 0
+
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._fechado = False
+        self._thread = threading.Thread(
+            target=self._rodar, name="GravadorHistorico", daemon=True
+        )
+        self._thread.start()
+
+    def registrar(self, telefone, deu_certo, mensagem="", observacao=""):
+        """Mesmos parâmetros do salvar_no_historico"""
+        self._fila.put((time.time(), telefone, deu_certo, observacao, len(mensagem)))
+
+    def fechar(self):
+        """Espera a fila esvaziar, grava o resto e fecha o arquivo"""
+        if self._fechado:
+            return
+        self._fechado = True
+        self._fila.put(_FIM_HISTORICO)
+        self._thread.join()
+
+    def _abrir_escritor(self):
+        if self.formato == "sqlite":
+            return EscritorSqlite(self.caminho, self.fsync)
+        if self.formato == "jsonl":
+            return EscritorJsonl(self.caminho)
+        return EscritorCsv(self.caminho)
+
+    def _rodar(self):
+        try:
+            escritor = self._abrir_escritor()
+        except Exception as erro:
+            print(f"[ERRO] Não consegui abrir o histórico {self.caminho}: {erro}")
+            escritor = None
+
+        ultimo_flush = time.monotonic()
+        acabou = False
+        segundo_formatado = (None, "", "")  # a maioria das linhas cai no mesmo segundo
+
+        while not acabou:
+            lote = []
+            try:
+                item = self._fila.get(timeout=self.intervalo_flush)
+                while True:
+                    if item is _FIM_HISTORICO:
+                        acabou = True
+                        break
+                    lote.append(item)
+                    if len(lote) >= self.tamanho_lote:
+                        break
+                    item = self._fila.get_nowait()
+            except queue.Empty:
+                pass
+
+            if escritor is None:
+                continue
+
+            try:
+                if lote:
+                    linhas = []
+                    for quando, telefone, status, observacao, tamanho in lote:
+                        segundo = int(quando)
+                        if segundo != segundo_formatado[0]:
+                            agora = time.localtime(segundo)
+                            segundo_formatado = (
+                                segundo,
+                                time.strftime("%d/%m/%Y", agora),
+                                time.strftime("%H:%M:%S", agora),
+                            )
+                        linhas.append(
+                            (
+                                segundo_formatado[1],
+                                segundo_formatado[2],
+                                telefone,
+                                status,
+                                observacao,
+                                tamanho,
+                            )
+                        )
+                    escritor.escrever(linhas)
+                    self.gravados += len(lote)
+
+                if acabou:
+                    escritor.fechar(self.fsync != "nunca")
+                elif time.monotonic() - ultimo_flush >= self.intervalo_flush:
+                    escritor.flush(self.fsync == "a_cada_flush")
+                    ultimo_flush = time.monotonic()
+            except Exception as erro:
+                print(f"[ERRO] Não consegui salvar no histórico: {str(erro)}")
+
+
+def criar_planilha_modelo():
+    """
+    Cria uma planilha de exemplo pro usuário baixar e preencher
+    """
+    try:
+        import pandas as pd
+
+        exemplos = pd.DataFrame(
+            {
+                "Numero": ["5511999999999", "5521998888888", "5585987777777"],
+                "Nome": ["Maria", "João", "Ana"],
+            }
+        )
+
+        pasta_docs = os.path.join(os.path.expanduser("~"), "Documents")
+        arquivo_modelo = os.path.join(pasta_docs, "MODELO_CONTATOS.xlsx")
+        exemplos.to_excel(arquivo_modelo, index=False, sheet_name="Contatos")
+
+        os.startfile(pasta_docs)
+
+        return arquivo_modelo, True
+    except Exception as erro:
+        print(f"[ERRO] Problema ao criar planilha modelo: {str(erro)}")
+        return str(erro), False
+
+
+# ==================== ESPERAS POR EVENTO ====================
+# Em vez de dormir um tempo fixo, cada espera checa a página e volta assim
+# que a condição bate. Os valores abaixo são só o TETO de cada espera.
+
+URL_WHATSAPP = "https://web.whatsapp.com"
+
+LIMITES_ESPERA = {
+    "tela_inicial": 45,  # WhatsApp abrir mostrando as conversas ou o QR Code
+    "conversa": 30,  # campo de digitação ou aviso de número inválido
+    "troca_interna": 8,  # mesma coisa, mas trocando de conversa sem recarregar
+    "envio": 15,  # bolha de saída sair do relógio (enviada)
+    "anexo": 20,  # prévia do anexo abrir com o campo da legenda
+}
+
+# Depois de tantas trocas internas falhando seguidas, desiste e só usa get()
+# nesse navegador. Uma só: se o WhatsApp ignorar o popstate, cada falha custa
+# o limite de "troca_interna" inteiro antes de recarregar
+MAX_FALHAS_TROCA_INTERNA = 1
+
+INTERVALO_CHECAGEM = 0.25
+
+# Ignora o campo da conversa anterior (marcado antes de trocar sem recarregar)
+XPATH_CAMPO_TEXTO = (
+    "//div[@contenteditable='true'][@data-tab='10'][not(@data-wa-auto-antigo)]"
+)
+
+XPATH_POPUP_WEB = "//button[contains(text(), 'Usar o WhatsApp Web') or contains(text(), 'Use WhatsApp Web')]"
+
+SELETORES_NUMERO_INVALIDO_PAGINA = [
+    "//div[contains(text(), 'Número de telefone compartilhado via URL inválido')]",
+    "//div[contains(text(), 'Phone number shared via url is invalid')]",
+    "//div[contains(text(), 'não está cadastrado')]",
+    "//div[contains(text(), 'not registered')]",
+    "//div[contains(text(), 'inválido')]",
+    "//*[contains(text(), 'doesn') and contains(text(), 'WhatsApp')]",
+]
+
+# Os mesmos, só dentro do popup: na troca sem recarregar a conversa anterior
+# ainda tá na tela, e uma mensagem dela com "inválido" parecia o aviso. Depois
+# de recarregar a página não tem conversa velha, aí vale a página toda também
+# (caso o popup de verdade não tenha o role=dialog)
+XPATH_DIALOGO = "//div[@role='dialog']"
+SELETORES_NUMERO_INVALIDO = [
+    XPATH_DIALOGO + seletor for seletor in SELETORES_NUMERO_INVALIDO_PAGINA
+]
+
+SELETORES_QR = [
+    "//div[@data-testid='qrcode']",
+    "//canvas[contains(@aria-label, 'Scan')]",
+    "//div[contains(@class, 'qr-code')]",
+]
+
+SELETORES_TELA_LOGADA = [
+    "//div[@data-testid='chat-list']",
+    "//div[@id='pane-side']",
+    "//div[contains(@class, 'chat-list')]",
+    "//div[@data-testid='chatlist-header']",
+    "//header[contains(@class, 'app-header')]",
+    "//div[@data-testid='search-input']",
+    "//div[contains(@title, 'Pesquisar')]",
+    "//div[@data-testid='menu']",
+    "//span[contains(@title, 'Menu')]",
+    "//div[contains(@class, 'chat') and @data-testid]",
+    "//div[contains(@class, 'app-wrapper-web')]//div[contains(@class, 'two')]",
+]
+
+# Campo da legenda na prévia do anexo (imagem/PDF)
+SELETORES_LEGENDA_ANEXO = [
+    "//div[@contenteditable='true'][contains(@aria-label, 'legenda')]",
+    "//div[@contenteditable='true'][contains(@aria-label, 'caption')]",
+    "//div[@data-testid='media-caption-input-container']//div[@contenteditable='true']",
+    "//div[contains(@class, 'media-caption')]//div[@contenteditable='true']",
+]
+
+# Estados que a sondagem da página reconhece: seletores (XPath) e se o
+# elemento precisa estar aparecendo na tela. Quem chama escolhe quais
+# estados testar e a ordem (o primeiro que bater ganha).
+SONDAS_PAGINA = {
+    "pronto": {"seletores": [XPATH_CAMPO_TEXTO], "visivel": False},
+    "invalido": {"seletores": SELETORES_NUMERO_INVALIDO, "visivel": True},
+    "invalido_pagina": {"seletores": SELETORES_NUMERO_INVALIDO_PAGINA, "visivel": True},
+    "popup": {"seletores": [XPATH_POPUP_WEB], "visivel": True},
+    "qr": {"seletores": SELETORES_QR, "visivel": True},
+    "logado": {"seletores": SELETORES_TELA_LOGADA, "visivel": True},
+    "legenda": {"seletores": SELETORES_LEGENDA_ANEXO, "visivel": True},
+}
+
+ESTADOS_LOGIN = ("qr", "logado")
+ESTADOS_CONVERSA = ("pronto", "invalido", "invalido_pagina", "popup")
+ESTADOS_TROCA_INTERNA = ("pronto", "invalido", "popup")  # sem olhar a página toda
+ESTADOS_INVALIDO = ("invalido", "invalido_pagina")
+
+# Testa todos os seletores dentro da página, numa ida só ao navegador
+# (antes era um find_elements + um is_displayed por elemento, cada um uma ida)
+JS_SONDAR_PAGINA = """
+function visivel(elemento) {
+    if (!elemento.getClientRects().length) return false;
+    var estilo = window.getComputedStyle(elemento);
+    return estilo.visibility !== 'hidden' && estilo.opacity !== '0';
+}
+
+var sondas = arguments[0];
+for (var i = 0; i < sondas.length; i++) {
+    var estado = sondas[i][0], seletores = sondas[i][1], soVisivel = sondas[i][2];
+    for (var j = 0; j < seletores.length; j++) {
+        var achados;
+        try {
+            achados = document.evaluate(seletores[j], document, null,
+                XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        } catch (erro) {
+            continue;
+        }
+        for (var k = 0; k < achados.snapshotLength; k++) {
+            var elemento = achados.snapshotItem(k);
+            if (elemento.nodeType === 1 && (!soVisivel || visivel(elemento))) {
+                return [estado, elemento, seletores[j]];
+            }
+        }
+    }
+}
+return null;
+"""
+
+# Ícones que o WhatsApp coloca na bolha quando a mensagem saiu do celular
+SELETOR_BOLHA_ENVIADA = "[data-icon='msg-check'], [data-icon='msg-dblcheck'], [data-icon='msg-dblcheck-ack']"
+
+JS_MARCAR_BOLHAS = """
+document.querySelectorAll('div.message-out').forEach(function (bolha) {
+    bolha.setAttribute('data-wa-auto-visto', '1');
+});
+"""
+
+# Modo por parágrafo: cola e manda todas as partes num script só, rodando
+# dentro da página. Cada parte só vai depois da bolha da anterior aparecer
+# (garante a ordem); o check de enviada é conferido depois, do Python.
+SELETOR_BOTAO_ENVIAR = (
+    "button[aria-label='Enviar'], button[aria-label='Send'], [data-icon='send']"
+)
+
+JS_ENVIAR_PARTES = """
+var partes = arguments[0], xpathCampo = arguments[1], seletorBotao = arguments[2];
+var limiteMs = arguments[3], terminar = arguments[arguments.length - 1];
+var enviadas = 0;
+
+document.querySelectorAll('div.message-out').forEach(function (bolha) {
+    bolha.setAttribute('data-wa-auto-visto', '1');
+});
+
+function campoAtual() {
+    return document.evaluate(xpathCampo, document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function bolhasNovas() {
+    return document.querySelectorAll('div.message-out:not([data-wa-auto-visto])').length;
+}
+
+function colar(campo, texto) {
+    campo.focus();
+    var dados = new DataTransfer();
+    dados.setData('text/plain', texto);
+    campo.dispatchEvent(new ClipboardEvent('paste', {
+        bubbles: true, cancelable: true, clipboardData: dados
+    }));
+    if (!campo.textContent) {
+        var linhas = texto.split('\\n');
+        for (var i = 0; i < linhas.length; i++) {
+            campo.appendChild(document.createTextNode(linhas[i]));
+            if (i < linhas.length - 1) campo.appendChild(document.createElement('br'));
+        }
+    }
+    campo.dispatchEvent(new Event('input', { bubbles: true }));
+}
+
+function apertarEnter(campo) {
+    campo.dispatchEvent(new KeyboardEvent('keydown', {
+        key: 'Enter', code: 'Enter', keyCode: 13, which: 13,
+        bubbles: true, cancelable: true
+    }));
+}
+
+function proxima() {
+    if (enviadas >= partes.length) return terminar({ enviadas: enviadas, erro: null });
+
+    var campo = campoAtual();
+    if (!campo) return terminar({ enviadas: enviadas, erro: 'campo' });
+
+    var antes = bolhasNovas();
+    colar(campo, partes[enviadas]);
+    if (!campo.textContent) return terminar({ enviadas: enviadas, erro: 'colar' });
+    apertarEnter(campo);
+
+    var inicio = Date.now(), clicouBotao = false;
+    (function esperarBolha() {
+        if (bolhasNovas() > antes) {
+            enviadas++;
+            return proxima();
+        }
+        // ENTER de mentira não pegou: tenta o botão de enviar
+        if (!clicouBotao && Date.now() - inicio > 150 && campo.textContent) {
+            clicouBotao = true;
+            var botao = document.querySelector(seletorBotao);
+            if (botao) (botao.closest('button') || botao).click();
+        }
+        if (Date.now() - inicio > limiteMs) {
+            return terminar({ enviadas: enviadas, erro: 'bolha' });
+        }
+        setTimeout(esperarBolha, 20);
+    })();
+}
+
+proxima();
+"""
+
+# Erros do JS_ENVIAR_PARTES que acontecem antes do ENTER: nada foi submetido,
+# então dá pra mandar parte por parte. 'bolha' (ENTER apertado sem bolha
+# nova) pode ter chegado, aí não repete
+ERROS_LOTE_ANTES_DO_ENTER = {"campo", "colar"}
+
+JS_STATUS_BOLHA_NOVA = """
+var novas = document.querySelectorAll('div.message-out:not([data-wa-auto-visto])');
+if (!novas.length) return null;
+var ultima = novas[novas.length - 1];
+return ultima.querySelector(arguments[0]) ? 'enviada' : 'pendente';
+"""
+
+
+# Troca de conversa dentro do WhatsApp já carregado: empurra a URL de envio
+# pro roteador da página (pushState + popstate) em vez de recarregar tudo.
+# O estado fica no próprio navegador (window / sessionStorage), então um
+# reload de verdade zera tudo sozinho e cada Chrome cuida do seu.
+JS_TROCAR_CONVERSA = """
+var destino = new URL(arguments[0]);
+var maxFalhas = arguments[1];
+
+if (!window.__waAutoConversaAberta) return 'indisponivel';
+if (parseInt(sessionStorage.getItem('waAutoFalhasTroca') || '0', 10) >= maxFalhas) {
+    return 'desligada';
+}
+if (document.querySelector("[role='dialog']")) return 'indisponivel';
+
+document.querySelectorAll("div[contenteditable='true'][data-tab='10']").forEach(function (campo) {
+    campo.setAttribute('data-wa-auto-antigo', '1');
+});
+window.__waAutoConversaAberta = false;
+
+history.pushState(history.state, '', destino.pathname + destino.search);
+window.dispatchEvent(new PopStateEvent('popstate', { state: history.state }));
+return 'trocando';
+"""
+
+JS_CONVERSA_ABERTA = """
+window.__waAutoConversaAberta = true;
+if (arguments[0]) sessionStorage.setItem('waAutoFalhasTroca', '0');
+"""
+
+JS_FALHA_TROCA = """
+var falhas = parseInt(sessionStorage.getItem('waAutoFalhasTroca') || '0', 10) + 1;
+sessionStorage.setItem('waAutoFalhasTroca', String(falhas));
+return falhas;
+"""
+
+
+def sondas_dos_estados(estados, registro=None):
+    """[estado, seletores na ordem do registro, só visível] pros scripts de sondar"""
+    registro = registro or REGISTRO_SELETORES
+    return [
+        [estado, registro.ordem(estado), SONDAS_PAGINA[estado]["visivel"]]
+        for estado in estados
+    ]
+
+
+def sondar_pagina(navegador, estados, registro=None):
+    """
+    Testa os estados (chaves de SONDAS_PAGINA) na ordem, tudo num execute_script só
+    Os seletores de cada estado vão na ordem do registro (o que acertou por
+    último primeiro) e o seletor que bater é anotado nele
+    Retorna: (estado, elemento) do primeiro que bater ou (None, None)
+    """
+    registro = registro or REGISTRO_SELETORES
+    achado = navegador.execute_script(
+        JS_SONDAR_PAGINA, sondas_dos_estados(estados, registro)
+    )
+    if not achado:
+        return None, None
+
+    estado, elemento, seletor = achado
+    registro.registrar_acerto(estado, seletor)
+    return estado, elemento
+
+
+def estado_login(navegador):
+    """Retorna "qr" (pedindo scan), "logado" (lista de conversas) ou None (carregando)"""
+    return sondar_pagina(navegador, ESTADOS_LOGIN)[0]
+
+
+def esperar_tela_inicial(navegador, tempo_max):
+    """
+    Espera o WhatsApp terminar de abrir e volta assim que aparecer a lista de
+    conversas (perfil já logado) ou o QR Code
+    Retorna: "logado", "qr" ou "timeout"
+    """
+    try:
+        return WebDriverWait(
+            navegador,
+            tempo_max,
+            poll_frequency=INTERVALO_CHECAGEM,
+            ignored_exceptions=(JavascriptException,),  # página no meio da carga
+        ).until(lambda d: estado_login(d))
+    except TimeoutException:
+        return "timeout"
+
+
+def esperar_conversa_pronta(navegador, tempo_max, medir=None, estados=ESTADOS_CONVERSA):
+    """
+    Espera a conversa abrir e volta assim que souber o resultado
+    Se aparecer o popup "Usar o WhatsApp Web" clica nele e continua esperando
+    medir(fase, segundos), se informado, recebe o tempo gasto sondando a página
+    e fechando o popup (somado em todas as checagens)
+    Retorna: ("pronto", campo_texto), ("invalido", None), ("invalido_pagina",
+    None) (aviso achado fora de popup) ou ("timeout", None)
+    """
+    medir = medir or (lambda fase, segundos: None)
+
+    def checar(d):
+        inicio = time.perf_counter()
+        estado, elemento = sondar_pagina(d, estados)
+        medir("sondar_pagina", time.perf_counter() - inicio)
+
+        if estado == "pronto":
+            return "pronto", elemento
+        if estado in ESTADOS_INVALIDO:
+            return estado, None
+
+        if estado == "popup" and elemento.is_enabled():
+            inicio = time.perf_counter()
+            elemento.click()
+            medir("fechar_popup", time.perf_counter() - inicio)
+
+        return False
+
+    try:
+        return WebDriverWait(
+            navegador,
+            tempo_max,
+            poll_frequency=INTERVALO_CHECAGEM,
+            ignored_exceptions=(
+                StaleElementReferenceException,
+                NoSuchElementException,
+                JavascriptException,
+            ),
+        ).until(checar)
+    except TimeoutException:
+        return "timeout", None
+
+
+def esperar_legenda_anexo(navegador, tempo_max):
+    """Espera a prévia do anexo abrir; retorna o campo da legenda ou None"""
+    try:
+        return WebDriverWait(
+            navegador,
+            tempo_max,
+            poll_frequency=INTERVALO_CHECAGEM,
+            ignored_exceptions=(JavascriptException,),
+        ).until(lambda d: sondar_pagina(d, ("legenda",))[1])
+    except TimeoutException:
+        return None
+
+
+def marcar_bolhas_existentes(navegador):
+    """Marca as bolhas que já estão na tela pra saber qual é a nova depois do ENTER"""
+    navegador.execute_script(JS_MARCAR_BOLHAS)
+
+
+def esperar_envio_confirmado(navegador, tempo_max):
+    """
+    Espera aparecer uma bolha de saída nova e ela ganhar o check de enviada
+    Retorna: "enviada", "pendente" (bolha ainda no relógio) ou None (nem apareceu)
+    """
+    ultimo_status = [None]
+
+    def checar(d):
+        ultimo_status[0] = d.execute_script(JS_STATUS_BOLHA_NOVA, SELETOR_BOLHA_ENVIADA)
+        return ultimo_status[0] == "enviada"
+
+    try:
+        WebDriverWait(navegador, tempo_max, poll_frequency=INTERVALO_CHECAGEM).until(
+            checar
+        )
+        return "enviada"
+    except TimeoutException:
+        return ultimo_status[0]
+
+
+# ==================== ANEXO ====================
+# Imagem ou PDF mandado junto com a mensagem (a mensagem vira a legenda).
+# O arquivo é lido, conferido e convertido pra base64 UMA vez por campanha;
+# em cada Chrome ele vira um File guardado na própria página e cada envio só
+# cola esse File no campo. Se a página recarregar, manda o base64 de novo
+# (da memória, sem ler o disco).
+
+# Extensão -> bytes que o arquivo precisa ter, como (posição, assinatura)
+TIPOS_ANEXO = {
+    ".jpg": ((0, b"\xff\xd8"),),
+    ".jpeg": ((0, b"\xff\xd8"),),
+    ".png": ((0, b"\x89PNG"),),
+    ".webp": ((0, b"RIFF"), (8, b"WEBP")),  # RIFF sozinho também é WAV, AVI...
+    ".pdf": ((0, b"%PDF"),),
+}
+
+LIMITE_ANEXO_MB = 16
+
+
+class AnexoInvalido(Exception):
+    pass
+
+
+class AnexoCampanha:
+    """Arquivo do anexo já lido e preparado, reaproveitado em todos os envios"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.nome = os.path.basename(caminho)
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao not in TIPOS_ANEXO:
+            raise AnexoInvalido(
+                f"Tipo não suportado ({extensao or 'sem extensão'}). "
+                f"Use: {', '.join(sorted(TIPOS_ANEXO))}"
+            )
+
+        tamanho = os.path.getsize(caminho)
+        if not tamanho:
+            raise AnexoInvalido("Arquivo vazio")
+        if tamanho > LIMITE_ANEXO_MB * 1024 * 1024:
+            raise AnexoInvalido(
+                f"Arquivo com {tamanho / 1024 / 1024:.1f} MB (máximo {LIMITE_ANEXO_MB} MB)"
+            )
+
+        with open(caminho, "rb") as arquivo:
+            conteudo = arquivo.read()
+        if not all(
+            conteudo.startswith(assinatura, posicao)
+            for posicao, assinatura in TIPOS_ANEXO[extensao]
+        ):
+            raise AnexoInvalido(f"O conteúdo não parece um {extensao} de verdade")
+
+        self.tamanho = len(conteudo)
+        self.tipo = mimetypes.guess_type(self.nome)[0] or "application/octet-stream"
+        self.eh_imagem = self.tipo.startswith("image/")
+        self.id = hashlib.sha256(conteudo).hexdigest()[:16]
+        self.base64 = base64.b64encode(conteudo).decode("ascii")
+
+    def __str__(self):
+        return f"{self.nome} ({self.tamanho / 1024:.0f} KB)"
+
+
+# Guarda o File na página (uma vez por carga da página)
+JS_GUARDAR_ANEXO = """
+var binario = atob(arguments[3]);
+var bytes = new Uint8Array(binario.length);
+for (var i = 0; i < binario.length; i++) bytes[i] = binario.charCodeAt(i);
+window.__waAutoAnexo = {
+    id: arguments[0],
+    arquivo: new File([bytes], arguments[1], { type: arguments[2] })
+};
+"""
+
+# Jeitos de pôr o anexo: colar no campo ou jogar no input de arquivo
+MODOS_ANEXO = ("colar", "entrada")
+
+# Cola o File guardado no campo da conversa (ou joga no input de arquivo)
+# Sem modo, usa o que abriu a prévia da última vez nesse navegador
+# (sessionStorage, igual às falhas da troca interna). Retorna [estado, modo]
+JS_ANEXAR = """
+var anexo = window.__waAutoAnexo, campo = arguments[1];
+var modo = arguments[2] || sessionStorage.getItem('waAutoModoAnexo') || 'colar';
+if (!anexo || anexo.id !== arguments[0]) return ['sem_cache', modo];
+
+var dados = new DataTransfer();
+dados.items.add(anexo.arquivo);
+
+if (modo === 'entrada') {
+    var entrada = document.querySelector("input[type='file']");
+    if (!entrada) return ['sem_entrada', modo];
+    entrada.files = dados.files;
+    entrada.dispatchEvent(new Event('change', { bubbles: true }));
+    return ['anexado', modo];
+}
+
+campo.focus();
+campo.dispatchEvent(new ClipboardEvent('paste', {
+    bubbles: true, cancelable: true, clipboardData: dados
+}));
+return ['anexado', modo];
+"""
+
+JS_LEMBRAR_MODO_ANEXO = """
+sessionStorage.setItem('waAutoModoAnexo', arguments[0]);
+"""
+
+
+# ==================== REGISTRO DE SELETORES ====================
+# O WhatsApp muda o HTML de uma versão pra outra, então cada estado tem vários
+# seletores de reserva. O registro lembra qual deles bateu por último e testa
+# ele primeiro, com acertos/erros de cada um salvos em disco pra próxima vez.
+
+ARQUIVO_SELETORES = os.path.join(
+    os.path.expanduser("~"), ".whatsapp_automatizador", "seletores.json"
+)
+
+
+class RegistroSeletores:
+    """
+    Ordem e estatística dos seletores de cada estado de SONDAS_PAGINA
+    Ordem: o último que acertou, depois os com mais acertos, depois a ordem
+    original. Erro = seletor testado antes do vencedor do mesmo estado
+    """
+
+    def __init__(self, caminho=ARQUIVO_SELETORES, sondas=None):
+        self.caminho = caminho
+        self.sondas = sondas or SONDAS_PAGINA
+        self._trava = threading.Lock()
+        self._carregado = False
+        self._mudou = False
+        self._ordens = {}  # cache: estado -> lista de seletores
+        self.ultimo = {}  # estado -> seletor que acertou por último
+        self.contagem = {
+            estado: {
+                seletor: {"acertos": 0, "erros": 0} for seletor in dados["seletores"]
+            }
+            for estado, dados in self.sondas.items()
+        }
+
+    def carregar(self):
+        """Lê o que ficou salvo; seletores que saíram do código são ignorados"""
+        self._carregado = True
+        if not self.caminho or not os.path.exists(self.caminho):
+            return
+        try:
+            with open(self.caminho, encoding="utf-8") as arquivo:
+                salvo = json.load(arquivo)
+        except (OSError, ValueError):
+            return
+
+        for estado, dados in salvo.get("estados", {}).items():
+            contagem = self.contagem.get(estado)
+            if contagem is None:
+                continue
+            for seletor, numeros in dados.get("seletores", {}).items():
+                if seletor in contagem:
+                    contagem[seletor]["acertos"] = int(numeros.get("acertos", 0))
+                    contagem[seletor]["erros"] = int(numeros.get("erros", 0))
+            if dados.get("ultimo") in contagem:
+                self.ultimo[estado] = dados["ultimo"]
+
+    def ordem(self, estado):
+        with self._trava:
+            if not self._carregado:
+                self.carregar()
+
+            if estado not in self._ordens:
+                originais = self.sondas[estado]["seletores"]
+                contagem = self.contagem[estado]
+                ultimo = self.ultimo.get(estado)
+                self._ordens[estado] = sorted(
+                    originais,
+                    key=lambda seletor: (
+                        seletor != ultimo,
+                        -contagem[seletor]["acertos"],
+                        originais.index(seletor),
+                    ),
+                )
+            return self._ordens[estado]
+
+    def registrar_acerto(self, estado, seletor):
+        with self._trava:
+            contagem = self.contagem[estado]
+            if seletor not in contagem:
+                return
+            for testado in self._ordens.get(estado, ()):
+                if testado == seletor:
+                    break
+                contagem[testado]["erros"] += 1
+            contagem[seletor]["acertos"] += 1
+            self._mudou = True
+
+            if self.ultimo.get(estado) != seletor:
+                self.ultimo[estado] = seletor
+                self._ordens.pop(estado, None)  # reordena na próxima sondagem
+
+    def salvar(self):
+        """Grava em disco se teve acerto novo (arquivo temporário + troca)"""
+        with self._trava:
+            if not self._mudou or not self.caminho:
+                return
+            dados = {
+                "estados": {
+                    estado: {"ultimo": self.ultimo.get(estado), "seletores": contagem}
+                    for estado, contagem in self.contagem.items()
+                }
+            }
+            self._mudou = False
+
+        try:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump(dados, arquivo, ensure_ascii=False, indent=2)
+            os.replace(temporario, self.caminho)
+        except OSError:
+            pass
+
+
+REGISTRO_SELETORES = RegistroSeletores()
+
+
+# ==================== PERFIS DO CHROME ====================
+# Perfil salvo = o Chrome lembra do login do WhatsApp, então não precisa
+# escanear QR Code de novo e o app já abre "quente". Sem perfil escolhido
+# continua usando uma pasta temporária (apagada quando a automação acaba).
+
+PASTA_PERFIS = os.path.join(
+    os.path.expanduser("~"), ".whatsapp_automatizador", "perfis"
+)
+
+PREFIXO_PERFIL_TEMPORARIO = "whatsapp_auto_"
+
+# Pastas temporárias mais velhas que isso são lixo de execuções que caíram
+IDADE_MAX_PERFIL_TEMPORARIO_HORAS = 24
+
+
+def limpar_nome_perfil(nome):
+    """Deixa só letra, número, - e _ no nome (vira nome de pasta)"""
+    return re.sub(r"[^\w-]", "_", str(nome or "").strip())
+
+
+def listar_perfis():
+    """Nomes dos perfis salvos, em ordem alfabética"""
+    if not os.path.isdir(PASTA_PERFIS):
+        return []
+    return sorted(
+        nome
+        for nome in os.listdir(PASTA_PERFIS)
+        if os.path.isdir(os.path.join(PASTA_PERFIS, nome))
+    )
+
+
+def pasta_do_perfil(nome):
+    """Pasta do perfil salvo (cria se ainda não existe)"""
+    pasta = os.path.join(PASTA_PERFIS, limpar_nome_perfil(nome))
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def nomes_perfis_sessoes(nome_base, qtd_sessoes):
+    """
+    Um perfil por sessão: a 1ª usa o nome escolhido, as outras ganham -2, -3...
+    Sem nome escolhido todas usam perfil temporário (None)
+    """
+    if not nome_base:
+        return [None] * qtd_sessoes
+    return [nome_base] + [f"{nome_base}-{n}" for n in range(2, qtd_sessoes + 1)]
+
+
+def limpar_perfis_temporarios(idade_max_horas=IDADE_MAX_PERFIL_TEMPORARIO_HORAS):
+    """
+    Apaga as pastas temporárias de perfil que sobraram de execuções antigas
+    Retorna quantas apagou
+    """
+    limite = time.time() - idade_max_horas * 3600
+    pasta_temp = tempfile.gettempdir()
+    apagadas = 0
+
+    for nome in os.listdir(pasta_temp):
+        caminho = os.path.join(pasta_temp, nome)
+        if not nome.startswith(PREFIXO_PERFIL_TEMPORARIO) or not os.path.isdir(caminho):
+            continue
+        try:
+            if os.path.getmtime(caminho) < limite:
+                shutil.rmtree(caminho)
+                apagadas += 1
+        except OSError:
+            continue  # Chrome ainda usando ou sem permissão, fica pra próxima
+
+    return apagadas
+
+
+# ==================== HEADLESS E RECURSOS ====================
+# Headless de verdade: Chrome sem janela nenhuma e sem carregar imagem, vídeo
+# e áudio, que não servem pra mandar texto. Precisa de perfil já logado; se
+# cair no QR Code, o QR vira um PNG que abre no visualizador de imagens.
+
+ARGUMENTOS_HEADLESS = [
+    "--headless=new",
+    "--window-size=1280,900",  # WhatsApp esconde coisas em janela muito pequena
+    "--blink-settings=imagesEnabled=false",
+    "--mute-audio",
+    "--autoplay-policy=user-gesture-required",
+    "--disable-features=MediaRouter,OptimizationHints,Translate",
+    "--disable-notifications",
+    "--hide-scrollbars",
+]
+
+PREFERENCIAS_HEADLESS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+
+# A cada quantos envios de uma sessão o log mostra CPU/RAM do Chrome dela
+INTERVALO_LOG_RECURSOS = 10
+
+# O QR Code do WhatsApp troca sozinho de tempos em tempos, então o PNG é refeito
+INTERVALO_PRINT_QR = 15
+
+
+def abrir_arquivo(caminho):
+    """Abre o arquivo no programa padrão do sistema"""
+    try:
+        os.startfile(caminho)
+    except AttributeError:  # não é Windows
+        webbrowser.open(f"file://{os.path.abspath(caminho)}")
+
+
+def salvar_qr_code(navegador, caminho):
+    """Tira print só do QR Code (ou da tela toda se não achar o elemento)"""
+    for seletor in REGISTRO_SELETORES.ordem("qr"):
+        elementos = navegador.find_elements(By.XPATH, seletor)
+        if elementos:
+            elementos[0].screenshot(caminho)
+            return caminho
+    navegador.save_screenshot(caminho)
+    return caminho
+
+
+class MedidorRecursos:
+    """
+    Mede CPU e memória (RSS) de todos os processos do Chrome de um navegador
+    O chromedriver é o pai de tudo, então soma ele e os filhos
+    Sem psutil instalado medir() devolve None
+    """
+
+    def __init__(self, navegador):
+        self._processos = {}
+        self._pid_raiz = None
+        try:
+            self._pid_raiz = navegador.service.process.pid
+        except AttributeError:
+            pass
+
+    def medir(self):
+        """Retorna (cpu_percent, rss_mb, qtd_processos) ou None"""
+        if psutil is None or self._pid_raiz is None:
+            return None
+
+        try:
+            raiz = psutil.Process(self._pid_raiz)
+            atuais = [raiz] + raiz.children(recursive=True)
+        except psutil.Error:
+            return None
+
+        cpu = 0.0
+        rss = 0
+        vivos = {}
+        for processo in atuais:
+            # Reaproveita o mesmo Process pra cpu_percent comparar com a última medida
+            processo = self._processos.get(processo.pid, processo)
+            try:
+                cpu += processo.cpu_percent(interval=None)
+                rss += processo.memory_info().rss
+                vivos[processo.pid] = processo
+            except psutil.Error:
+                continue
+
+        self._processos = vivos
+        return cpu, rss / (1024 * 1024), len(vivos)
+
+
+# ==================== POOL DE SESSÕES ====================
+# Cada sessão é um Chrome logado num número diferente. Todas puxam o próximo
+# contato da mesma fila, cada uma com a sua pausa entre envios.
+
+MAX_SESSOES = 5
+
+SEM_PERFIL = "(temporário)"
+
+# Falha passageira (conversa não abriu, Chrome deu erro antes de digitar) volta
+# pra fila depois de uma espera que dobra a cada tentativa: 30s, 60s, 120s...
+MAX_TENTATIVAS_ENVIO = 3  # contando a primeira
+ESPERA_REPETICAO_INICIAL = 30
+ESPERA_REPETICAO_MAXIMA = 600
+MAX_ESGOTADOS_LOG = 20  # quantos números que esgotaram aparecem no relatório
+
+
+class FilaTrabalho:
+    """
+    Fila de contatos dividida entre as sessões (sempre sai o menor índice)
+    Guarda o que tá em andamento pra saber de onde retomar se parar no meio
+    Quem falhou de um jeito que dá pra repetir vai pra uma fila de espera e
+    volta na frente dos novos quando a espera acaba
+    """
+
+    def __init__(
+        self,
+        itens,
+        max_tentativas=MAX_TENTATIVAS_ENVIO,
+        espera_inicial=ESPERA_REPETICAO_INICIAL,
+        espera_maxima=ESPERA_REPETICAO_MAXIMA,
+        relogio=time.monotonic,
+    ):
+        self._trava = threading.Lock()
+        self._pendentes = list(itens)  # (indice, numero)
+        heapq.heapify(self._pendentes)
+        self._em_andamento = set()
+        self._repeticoes = []  # (quando, indice, numero)
+        self.tentativas = collections.Counter()  # indice -> vezes que já saiu
+        self.max_tentativas = max_tentativas
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self._relogio = relogio
+
+    def __len__(self):
+        with self._trava:
+            return (
+                len(self._pendentes) + len(self._em_andamento) + len(self._repeticoes)
+            )
+
+    def pegar(self):
+        """
+        Próximo contato pra mandar (repetição vencida primeiro), ou None se
+        não tem nenhum agora. Use espera_repeticao() pra saber se ainda vem
+        alguma repetição
+        """
+        with self._trava:
+            if self._repeticoes and self._repeticoes[0][0] <= self._relogio():
+                _, indice, numero = heapq.heappop(self._repeticoes)
+                item = (indice, numero)
+            elif self._pendentes:
+                item = heapq.heappop(self._pendentes)
+            else:
+                return None
+            self._em_andamento.add(item[0])
+            self.tentativas[item[0]] += 1
+            return item
+
+    def reagendar(self, item):
+        """
+        Põe o contato na fila de repetição com espera exponencial
+        Retorna a espera em segundos, ou None se já esgotou as tentativas
+        """
+        with self._trava:
+            tentativa = self.tentativas[item[0]]
+            if tentativa >= self.max_tentativas:
+                return None
+            espera = min(self.espera_inicial * 2 ** (tentativa - 1), self.espera_maxima)
+            self._em_andamento.discard(item[0])
+            heapq.heappush(self._repeticoes, (self._relogio() + espera, *item))
+            return espera
+
+    def espera_repeticao(self):
+        """Segundos até a próxima repetição vencer (0 se já venceu), None se não tem"""
+        with self._trava:
+            if not self._repeticoes:
+                return None
+            return max(self._repeticoes[0][0] - self._relogio(), 0.0)
+
+    def concluir(self, indice):
+        with self._trava:
+            self._em_andamento.discard(indice)
+
+    def devolver(self, item):
+        """Devolve um contato que a sessão pegou mas não chegou a mandar"""
+        with self._trava:
+            self._em_andamento.discard(item[0])
+            self.tentativas[item[0]] -= 1
+            heapq.heappush(self._pendentes, item)
+
+    def adiar(self, item, espera):
+        """
+        Tira o contato da vez sem contar tentativa e põe de volta daqui a
+        `espera` segundos (ex.: fora do horário dele)
+        """
+        with self._trava:
+            self._em_andamento.discard(item[0])
+            self.tentativas[item[0]] -= 1
+            heapq.heappush(self._repeticoes, (self._relogio() + espera, *item))
+
+    def tem_pendentes(self):
+        with self._trava:
+            return bool(self._pendentes or self._repeticoes)
+
+    def primeiro_pendente(self, padrao):
+        """Menor índice que ainda não foi processado (ponto de retomada)"""
+        with self._trava:
+            candidatos = list(self._em_andamento)
+            candidatos.extend(indice for _, indice, _ in self._repeticoes)
+            if self._pendentes:
+                candidatos.append(self._pendentes[0][0])
+            return min(candidatos) if candidatos else padrao
+
+
+class PlacarCampanha:
+    """Contadores somados de todas as sessões (pode chamar de qualquer thread)"""
+
+    def __init__(self, total, ja_processados=0):
+        self._trava = threading.Lock()
+        self.total = total
+        self.processados = ja_processados
+        self.sucessos = 0
+        self.falhas = 0
+        self.numeros_invalidos = 0
+        self.por_desfecho = collections.Counter()
+        self.repeticoes = 0  # quantas vezes alguém voltou pra fila
+        self.recuperados = 0  # falhou antes e deu certo numa repetição
+        self.esgotados = []  # (numero, observação) de quem falhou em todas
+        self.concluida = False  # passou por todos (não parou no meio)
+
+    def registrar(self, resultado, tentativas=1):
+        """Conta o resultado final de um contato e devolve quantos já foram processados"""
+        with self._trava:
+            self.processados += 1
+            self.por_desfecho[resultado.desfecho] += 1
+            if resultado:
+                self.sucessos += 1
+                if tentativas > 1:
+                    self.recuperados += 1
+            else:
+                self.falhas += 1
+                if resultado.numero_invalido:
+                    self.numeros_invalidos += 1
+                elif tentativas > 1:
+                    self.esgotados.append((resultado.numero, resultado.observacao))
+            return self.processados
+
+    def registrar_repeticao(self):
+        with self._trava:
+            self.repeticoes += 1
+
+
+class SessaoEnvio:
+    """Um Chrome logado num número, com parada e ritmo próprios"""
+
+    def __init__(self, numero, perfil=None, ritmo=None):
+        self.numero = numero
+        self.nome = f"S{numero}"
+        self.perfil = perfil
+        self.ritmo = ritmo
+        self.navegador = None
+        self.pagina = None  # PaginaCDP, só no envio assíncrono
+        self.recursos = None
+        self.logada = False
+        self.parada = False
+        self.enviados = 0
+
+    @property
+    def remetente(self):
+        """Quem manda: o perfil salvo (o mesmo número de uma vez pra outra) ou a sessão"""
+        return self.perfil or self.nome
+
+
+# ==================== CAMPANHAS SALVAS ====================
+# Cada campanha (lista + mensagem) vira um registro no SQLite com o status de
+# cada destinatário. Se o programa fechar ou cair no meio, carregar a mesma
+# planilha com a mesma mensagem retoma de onde parou, sem repetir ninguém.
+
+ARQUIVO_CAMPANHAS = os.path.join(
+    os.path.expanduser("~"), ".whatsapp_automatizador", "campanhas.db"
+)
+
+PENDENTE = "pendente"
+ENVIADO = "enviado"
+SEM_WHATSAPP = "sem_whatsapp"
+FALHOU = "falha"
+
+# Esses dois só aparecem na grade da tela, não vão pro banco
+ENVIANDO = "enviando"
+REPETIR = "repetir"  # falhou e tá esperando pra tentar de novo
+
+ESQUEMA_CAMPANHAS = """
+CREATE TABLE IF NOT EXISTS campanhas (
+    id INTEGER PRIMARY KEY,
+    assinatura TEXT NOT NULL UNIQUE,
+    arquivo TEXT,
+    mensagem TEXT,
+    total INTEGER NOT NULL,
+    criada_em TEXT NOT NULL,
+    atualizada_em TEXT NOT NULL,
+    concluida INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS destinatarios (
+    campanha_id INTEGER NOT NULL REFERENCES campanhas(id) ON DELETE CASCADE,
+    posicao INTEGER NOT NULL,
+    telefone TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (campanha_id, posicao)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_destinatarios_status
+    ON destinatarios (campanha_id, status, posicao);
+CREATE TABLE IF NOT EXISTS tentativas (
+    id INTEGER PRIMARY KEY,
+    campanha_id INTEGER NOT NULL,
+    posicao INTEGER NOT NULL,
+    quando TEXT NOT NULL,
+    status TEXT NOT NULL,
+    observacao TEXT,
+    sessao TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tentativas_destinatario
+    ON tentativas (campanha_id, posicao);
+CREATE INDEX IF NOT EXISTS idx_tentativas_sessao
+    ON tentativas (sessao, quando);
+"""
+
+
+def assinatura_campanha(telefones, mensagem):
+    """Mesma lista (na mesma ordem) + mesma mensagem = mesma campanha"""
+    resumo = hashlib.sha256(mensagem.encode("utf-8"))
+    for telefone in telefones:
+        resumo.update(b"\n" + telefone.encode("utf-8"))
+    return resumo.hexdigest()
+
+
+class BancoCampanhas:
+    """
+    Campanhas, destinatários e tentativas num SQLite só
+    Uma conexão pra todas as sessões, protegida por trava; cada resultado é
+    gravado na hora (commit por envio) pra sobreviver a um fechamento no meio
+    """
+
+    def __init__(self, caminho=ARQUIVO_CAMPANHAS):
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.execute("PRAGMA foreign_keys=ON")
+        self.conexao.executescript(ESQUEMA_CAMPANHAS)
+
+    def buscar_campanha(self, assinatura):
+        """id da campanha com essa assinatura, ou None"""
+        with self._trava:
+            linha = self.conexao.execute(
+                "SELECT id FROM campanhas WHERE assinatura = ?", (assinatura,)
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def abrir_campanha(self, telefones, mensagem, arquivo=""):
+        """
+        Acha a campanha salva dessa lista + mensagem ou cria uma nova
+        Retorna: (id, nova)
+        """
+        assinatura = assinatura_campanha(telefones, mensagem)
+        campanha_id = self.buscar_campanha(assinatura)
+        if campanha_id is not None:
+            return campanha_id, False
+
+        agora = datetime.now().isoformat(timespec="seconds")
+        with self._trava, self.conexao:
+            cursor = self.conexao.execute(
+                "INSERT INTO campanhas (assinatura, arquivo, mensagem, total, "
+                "criada_em, atualizada_em) VALUES (?, ?, ?, ?, ?, ?)",
+                (assinatura, arquivo, mensagem, len(telefones), agora, agora),
+            )
+            campanha_id = cursor.lastrowid
+            self.conexao.executemany(
+                "INSERT INTO destinatarios (campanha_id, posicao, telefone) "
+                "VALUES (?, ?, ?)",
+                ((campanha_id, posicao, tel) for posicao, tel in enumerate(telefones)),
+            )
+        return campanha_id, True
+
+    def contar_status(self, campanha_id):
+        """{status: quantidade} da campanha (sai direto do índice)"""
+        with self._trava:
+            return dict(
+                self.conexao.execute(
+                    "SELECT status, COUNT(*) FROM destinatarios "
+                    "WHERE campanha_id = ? GROUP BY status",
+                    (campanha_id,),
+                )
+            )
+
+    def resultados_salvos(self, campanha_id):
+        """{posição: status} de quem já tem resultado (tudo menos pendente)"""
+        with self._trava:
+            return dict(
+                self.conexao.execute(
+                    "SELECT posicao, status FROM destinatarios "
+                    "WHERE campanha_id = ? AND status != ?",
+                    (campanha_id, PENDENTE),
+                )
+            )
+
+    def registrar_resultado(
+        self, campanha_id, posicao, status, observacao="", sessao=""
+    ):
+        """Atualiza o destinatário e guarda a tentativa (pode chamar de qualquer thread)"""
+        agora = datetime.now().isoformat(timespec="seconds")
+        with self._trava, self.conexao:
+            self.conexao.execute(
+                "UPDATE destinatarios SET status = ?, tentativas = tentativas + 1 "
+                "WHERE campanha_id = ? AND posicao = ?",
+                (status, campanha_id, posicao),
+            )
+            self.conexao.execute(
+                "INSERT INTO tentativas (campanha_id, posicao, quando, status, "
+                "observacao, sessao) VALUES (?, ?, ?, ?, ?, ?)",
+                (campanha_id, posicao, agora, status, observacao, sessao),
+            )
+            self.conexao.execute(
+                "UPDATE campanhas SET atualizada_em = ? WHERE id = ?",
+                (agora, campanha_id),
+            )
+
+    def envios_desde(self, remetente, desde):
+        """time.time() de cada envio com sucesso desse remetente a partir de `desde`"""
+        limite = datetime.fromtimestamp(desde).isoformat(timespec="seconds")
+        with self._trava:
+            linhas = self.conexao.execute(
+                "SELECT quando FROM tentativas "
+                "WHERE sessao = ? AND status = ? AND quando >= ? ORDER BY quando",
+                (remetente, ENVIADO, limite),
+            ).fetchall()
+        return [datetime.fromisoformat(quando).timestamp() for (quando,) in linhas]
+
+    def marcar_concluida(self, campanha_id):
+        with self._trava, self.conexao:
+            self.conexao.execute(
+                "UPDATE campanhas SET concluida = 1, atualizada_em = ? WHERE id = ?",
+                (datetime.now().isoformat(timespec="seconds"), campanha_id),
+            )
+
+    def fechar(self):
+        with self._trava:
+            self.conexao.close()
+
+
+# ==================== RESULTADO DO ENVIO ====================
+# O mandar_mensagem devolve um ResultadoEnvio dizendo exatamente o que
+# aconteceu (e quanto tempo cada fase levou). Placar, histórico, banco da
+# campanha e repetições decidem tudo por ele, nada de ler texto do log.
+
+
+class DesfechoEnvio(Enum):
+    ENVIADO = "enviado"
+    NUMERO_INVALIDO = "numero_invalido"  # WhatsApp avisou que o número não tem conta
+    CONVERSA_NAO_ABRIU = "conversa_nao_abriu"  # campo de digitação não apareceu
+    ENVIO_NAO_CONFIRMADO = "envio_nao_confirmado"  # bolha não apareceu na conversa
+    INTERROMPIDO = "interrompido"  # parou/pausou no meio das partes
+    ERRO = "erro"  # exceção (Chrome caiu, elemento sumiu...)
+
+
+# (status no histórico, observação no histórico, status no banco da campanha)
+REGISTRO_DESFECHO = {
+    DesfechoEnvio.ENVIADO: ("✅ Sucesso", "Mensagem enviada com sucesso", ENVIADO),
+    DesfechoEnvio.NUMERO_INVALIDO: (
+        "⚠️ Sem WhatsApp",
+        "Número não possui WhatsApp cadastrado",
+        SEM_WHATSAPP,
+    ),
+    DesfechoEnvio.CONVERSA_NAO_ABRIU: (
+        "❌ Falha",
+        "Campo de digitação não apareceu",
+        FALHOU,
+    ),
+    DesfechoEnvio.ENVIO_NAO_CONFIRMADO: (
+        "❌ Falha",
+        "Mensagem não apareceu na conversa",
+        FALHOU,
+    ),
+    DesfechoEnvio.INTERROMPIDO: ("❌ Falha", "Envio interrompido no meio", FALHOU),
+    DesfechoEnvio.ERRO: ("❌ Falha", "Erro ao enviar mensagem", FALHOU),
+}
+
+# Desfechos em que dá pra tentar de novo, desde que nada tenha sido submetido
+# (ENTER/script de envio): senão a pessoa pode receber a mensagem duas vezes
+DESFECHOS_REPETIVEIS = {DesfechoEnvio.CONVERSA_NAO_ABRIU, DesfechoEnvio.ERRO}
+
+
+@dataclass
+class ResultadoEnvio:
+    """O que aconteceu num envio (vale como True/False: True = enviado)"""
+
+    numero: str
+    desfecho: DesfechoEnvio = DesfechoEnvio.ERRO
+    partes_enviadas: int = 0
+    partes_total: int = 0
+    tempos: dict = field(default_factory=dict)  # fase -> segundos
+    erro: str = ""
+    submetido: bool = False  # já apertou ENTER ou rodou o script que aperta
+
+    def __bool__(self):
+        return self.desfecho is DesfechoEnvio.ENVIADO
+
+    @property
+    def numero_invalido(self):
+        return self.desfecho is DesfechoEnvio.NUMERO_INVALIDO
+
+    @property
+    def pode_repetir(self):
+        return (
+            self.desfecho in DESFECHOS_REPETIVEIS
+            and self.partes_enviadas == 0
+            and not self.submetido
+        )
+
+    @property
+    def status_historico(self):
+        return REGISTRO_DESFECHO[self.desfecho][0]
+
+    @property
+    def observacao(self):
+        observacao = REGISTRO_DESFECHO[self.desfecho][1]
+        if self.partes_total > 1 and not self:
+            observacao += f" ({self.partes_enviadas}/{self.partes_total} partes)"
+        if self.erro:
+            observacao += f": {self.erro}"
+        return observacao
+
+    @property
+    def status_campanha(self):
+        return REGISTRO_DESFECHO[self.desfecho][2]
+
+    def somar(self, fase, segundos):
+        self.tempos[fase] = self.tempos.get(fase, 0.0) + segundos
+
+    @contextlib.contextmanager
+    def fase(self, nome):
+        """with resultado.fase("navegar"): ... soma o tempo do bloco na fase"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.somar(nome, time.perf_counter() - inicio)
+
+
+# ==================== MÉTRICAS POR FASE ====================
+# Cada envio traz o tempo de cada fase no ResultadoEnvio; o MedidorFases
+# junta tudo (de todas as sessões) e calcula p50/p95/p99 e mensagens por
+# hora pro painel ao vivo. No fim da campanha vai tudo pra um JSON.
+
+# Ordem em que as fases aparecem no painel e no arquivo exportado
+FASES_MEDIDAS = [
+    ("login_abrir_pagina", "Login: abrir WhatsApp"),
+    ("login_tela_inicial", "Login: conversas/QR aparecer"),
+    ("login_qr", "Login: esperar scan do QR"),
+    ("navegar", "Navegar pra conversa"),
+    ("esperar_conversa", "Esperar conversa abrir"),
+    ("sondar_pagina", "  ↳ sondar a página (JS)"),
+    ("fechar_popup", "  ↳ fechar popup"),
+    ("preparar_anexo", "Anexo: guardar na página"),
+    ("anexar", "Anexo: colar o arquivo"),
+    ("abrir_previa", "Anexo: esperar a prévia"),
+    ("injetar_texto", "Colocar o texto"),
+    ("enviar", "Apertar ENTER"),
+    ("enviar_partes", "Colar e enviar as partes (JS)"),
+    ("confirmar", "Esperar o check (enviada)"),
+    ("total", "Total por contato"),
+    ("pausa", "Pausa entre envios"),
+    ("reagir_controle", "Reação a pausar/continuar/parar"),
+]
+
+# Mensagens por hora olhando só os últimos X segundos (ritmo de agora)
+JANELA_TAXA_SEGUNDOS = 600
+
+# Quantas mudanças de ritmo (recuos/retomadas) vão pro JSON no máximo
+MAX_DECISOES_RITMO = 500
+
+
+class MedidorFases:
+    """Tempos de todas as fases de todos os envios (pode chamar de qualquer thread)"""
+
+    def __init__(self, janela_taxa=JANELA_TAXA_SEGUNDOS):
+        self._trava = threading.Lock()
+        self._amostras = collections.defaultdict(lambda: array("d"))
+        self._envios_recentes = collections.deque()
+        self.janela_taxa = janela_taxa
+        self.inicio = time.monotonic()
+        self.criado_em = datetime.now()
+        self.enviados = 0
+        self.por_desfecho = collections.Counter()
+        self.ritmo_por_sessao = {}  # sessão -> msg/h que o controle de ritmo mira
+        self.decisoes_ritmo = collections.deque(maxlen=MAX_DECISOES_RITMO)
+        self.versao = 0  # muda a cada registro, pro painel saber se redesenha
+
+    def registrar(self, fase, segundos):
+        with self._trava:
+            self._amostras[fase].append(segundos)
+            self.versao += 1
+
+    def registrar_resultado(self, resultado):
+        with self._trava:
+            for fase, segundos in resultado.tempos.items():
+                self._amostras[fase].append(segundos)
+            self.por_desfecho[resultado.desfecho.value] += 1
+            self.versao += 1
+            if resultado:
+                self.enviados += 1
+                self._envios_recentes.append(time.monotonic())
+
+    def registrar_ritmo(self, sessao, pausa, taxa=None, motivo=None):
+        """Guarda a pausa escolhida e, no ritmo automático, a taxa e o porquê"""
+        with self._trava:
+            self._amostras["pausa"].append(pausa)
+            self.versao += 1
+            if taxa is not None:
+                self.ritmo_por_sessao[sessao] = taxa
+            if motivo:
+                self.decisoes_ritmo.append(
+                    {
+                        "quando": datetime.now().isoformat(timespec="seconds"),
+                        "sessao": sessao,
+                        "motivo": motivo,
+                        "msg_por_hora": round(taxa, 1),
+                        "pausa": round(pausa, 1),
+                    }
+                )
+
+    def ritmo_alvo(self):
+        """Soma do ritmo que cada sessão tá mirando (msg/h), ou None sem controle"""
+        with self._trava:
+            if not self.ritmo_por_sessao:
+                return None
+            return sum(self.ritmo_por_sessao.values())
+
+    def percentis(self):
+        """{fase: {"n", "media", "p50", "p95", "p99", "max"}} em segundos"""
+        with self._trava:
+            tabela = {}
+            for fase, amostras in self._amostras.items():
+                if not amostras:
+                    continue
+                valores = np.frombuffer(amostras, dtype=np.float64)
+                p50, p95, p99 = np.percentile(valores, (50, 95, 99))
+                tabela[fase] = {
+                    "n": len(valores),
+                    "media": float(valores.mean()),
+                    "p50": float(p50),
+                    "p95": float(p95),
+                    "p99": float(p99),
+                    "max": float(valores.max()),
+                }
+            return tabela
+
+    def mensagens_por_hora(self):
+        """(ritmo na janela recente, média desde o começo)"""
+        agora = time.monotonic()
+        with self._trava:
+            while (
+                self._envios_recentes
+                and agora - self._envios_recentes[0] > self.janela_taxa
+            ):
+                self._envios_recentes.popleft()
+            recentes = len(self._envios_recentes)
+            enviados = self.enviados
+
+        decorrido = max(agora - self.inicio, 1e-9)
+        janela = min(self.janela_taxa, decorrido)
+        return recentes / janela * 3600, enviados / decorrido * 3600
+
+    def resumo(self):
+        por_hora_agora, por_hora_media = self.mensagens_por_hora()
+        percentis = self.percentis()
+        ordem = [fase for fase, _ in FASES_MEDIDAS]
+        with self._trava:
+            ritmo = {
+                "msg_por_hora_por_sessao": {
+                    sessao: round(taxa, 1)
+                    for sessao, taxa in self.ritmo_por_sessao.items()
+                },
+                "decisoes": list(self.decisoes_ritmo),
+            }
+        return {
+            "inicio": self.criado_em.isoformat(timespec="seconds"),
+            "fim": datetime.now().isoformat(timespec="seconds"),
+            "enviados": self.enviados,
+            "mensagens_por_hora": {
+                f"ultimos_{self.janela_taxa}s": round(por_hora_agora, 1),
+                "media": round(por_hora_media, 1),
+            },
+            "desfechos": dict(self.por_desfecho),
+            "ritmo": ritmo,
+            "fases": {
+                fase: {chave: round(valor, 4) for chave, valor in numeros.items()}
+                for fase, numeros in sorted(
+                    percentis.items(),
+                    key=lambda item: (
+                        ordem.index(item[0]) if item[0] in ordem else len(ordem)
+                    ),
+                )
+            },
+        }
+
+    def exportar(self, caminho=None):
+        """Salva o resumo num JSON e retorna o caminho"""
+        caminho = caminho or f"metricas_envio_{self.criado_em:%Y%m%d_%H%M%S}.json"
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(self.resumo(), arquivo, ensure_ascii=False, indent=2)
+        return caminho
+
+
+# ==================== RITMO ENTRE ENVIOS ====================
+# A pausa entre envios sai de um ControladorRitmo por sessão, montado uma vez
+# no começo com o que tava na tela (fixa, aleatória ou automática). No modo
+# automático ele mira X mensagens por hora e ajusta sozinho, igual controle
+# de congestionamento (AIMD): a cada envio saudável sobe um pouquinho, e
+# quando a conversa não abre, o envio não confirma, dá erro ou a página tá
+# lenta ele corta o ritmo na hora. Nunca passa do teto.
+
+RITMO_FIXO = "fixo"
+RITMO_ALEATORIO = "aleatorio"
+RITMO_AUTOMATICO = "automatico"
+
+# Começa na metade do alvo e vai subindo conforme os envios dão certo
+FRACAO_RITMO_INICIAL = 0.5
+# Quanto sobe por envio saudável (fração do alvo): 1/30 leva uns 15 envios
+# pra sair da metade e chegar no alvo
+FRACAO_AUMENTO_RITMO = 1 / 30
+# Quanto sobra do ritmo depois de uma falha / de uma página lenta
+RECUO_FALHA = 0.5
+RECUO_LENTIDAO = 0.8
+# Conversa que demora mais que isso pra abrir conta como página lenta
+LIMITE_CONVERSA_LENTA = 8.0
+# Abaixo disso não desce (uma mensagem a cada 3 min por número)
+PISO_RITMO_POR_HORA = 20
+# Variação aleatória de cada pausa (±15%), pra não ficar um relógio
+VARIACAO_PAUSA = 0.15
+
+DESFECHOS_RECUO = (
+    DesfechoEnvio.CONVERSA_NAO_ABRIU,
+    DesfechoEnvio.ENVIO_NAO_CONFIRMADO,
+    DesfechoEnvio.ERRO,
+)
+
+
+class ControladorRitmo:
+    """
+    Decide a pausa depois de cada envio de uma sessão
+    Fixa e aleatória funcionam igual sempre funcionaram; no automático o
+    ritmo (msg/h) sobe devagar com envio saudável e cai pela metade em falha
+    """
+
+    def __init__(
+        self,
+        modo=RITMO_FIXO,
+        pausa_fixa=20,
+        pausa_minima=15,
+        pausa_maxima=25,
+        alvo_por_hora=120,
+        teto_por_hora=180,
+        sorteio=None,
+    ):
+        self.modo = modo
+        self.pausa_fixa = pausa_fixa
+        self.pausa_minima = pausa_minima
+        self.pausa_maxima = pausa_maxima
+        self.teto_por_hora = teto_por_hora
+        self.alvo_por_hora = min(alvo_por_hora, teto_por_hora)
+        self.piso_por_hora = min(PISO_RITMO_POR_HORA, self.alvo_por_hora)
+        self.taxa = max(self.alvo_por_hora * FRACAO_RITMO_INICIAL, self.piso_por_hora)
+        self.ultimo_envio = 0.0  # segundos que o último envio levou
+        self._sorteio = sorteio or random.Random()
+
+    @property
+    def automatico(self):
+        return self.modo == RITMO_AUTOMATICO
+
+    def registrar(self, resultado):
+        """
+        Ajusta o ritmo pelo desfecho do envio
+        Retorna o motivo quando o ritmo caiu ou voltou pro alvo (pro log e
+        pras métricas), ou None quando foi só o ajuste normal
+        """
+        self.ultimo_envio = resultado.tempos.get("total", 0.0)
+        if not self.automatico:
+            return None
+
+        if resultado.desfecho in DESFECHOS_RECUO:
+            self.taxa = max(self.taxa * RECUO_FALHA, self.piso_por_hora)
+            return f"recuo: {resultado.desfecho.value}"
+        if resultado.tempos.get("esperar_conversa", 0.0) > LIMITE_CONVERSA_LENTA:
+            self.taxa = max(self.taxa * RECUO_LENTIDAO, self.piso_por_hora)
+            return "recuo: página lenta"
+        if not resultado:
+            return None  # sem WhatsApp / interrompido não diz nada da conta
+
+        antes = self.taxa
+        self.taxa = min(
+            self.taxa + self.alvo_por_hora * FRACAO_AUMENTO_RITMO, self.alvo_por_hora
+        )
+        if antes < self.alvo_por_hora == self.taxa:
+            return "chegou no alvo"
+        return None
+
+    def proxima_pausa(self):
+        """Segundos até o próximo envio dessa sessão"""
+        if self.modo == RITMO_ALEATORIO:
+            return float(self._sorteio.randint(self.pausa_minima, self.pausa_maxima))
+        if self.modo == RITMO_FIXO:
+            return float(self.pausa_fixa)
+
+        intervalo = 3600 / self.taxa
+        intervalo *= self._sorteio.uniform(1 - VARIACAO_PAUSA, 1 + VARIACAO_PAUSA)
+        intervalo = max(intervalo, 3600 / self.teto_por_hora)  # teto é teto
+        return max(intervalo - self.ultimo_envio, 0.0)
+
+    def descrever(self):
+        """Texto curto do modo, pro diálogo de confirmação"""
+        if self.modo == RITMO_ALEATORIO:
+            return f"Aleatória ({self.pausa_minima}s a {self.pausa_maxima}s)"
+        if self.modo == RITMO_FIXO:
+            return f"Fixa ({self.pausa_fixa}s)"
+        return (
+            f"Automática (alvo {self.alvo_por_hora:.0f} msg/h, "
+            f"teto {self.teto_por_hora:.0f} msg/h por número)"
+        )
+
+
+# ==================== CONTROLE DE EXECUÇÃO ====================
+# Rodando / pausado guardados numa Condition: quem espera (pausa entre
+# envios, pausa do usuário, repetição, scan do QR Code) dorme até o prazo ou
+# até alguém apertar pausar / continuar / parar, e acorda na hora, em vez de
+# acordar de segundo em segundo pra olhar as flags.
+
+# De quanto em quanto tempo o login confere se o QR Code já foi escaneado
+INTERVALO_CHECAGEM_LOGIN = 1
+
+
+class ControleExecucao:
+    """
+    Estado de rodando / pausado de uma execução, com esperas que acordam no sinal
+    Pode mexer de qualquer thread; as esperas *_async são pro event loop do
+    envio assíncrono
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._futuros = set()  # (loop, Future) das esperas async em andamento
+        self.rodando = False
+        self.pausado = False
+        self.momento_sinal = time.perf_counter()  # último pausar/continuar/parar
+
+    def definir(self, rodando=None, pausado=None):
+        """Muda o estado e acorda todo mundo que tá esperando"""
+        with self._condicao:
+            if rodando is not None:
+                self.rodando = rodando
+            if pausado is not None:
+                self.pausado = pausado
+            self.momento_sinal = time.perf_counter()
+            self._condicao.notify_all()
+            futuros = list(self._futuros)
+
+        for loop, futuro in futuros:
+            with contextlib.suppress(RuntimeError):  # loop já fechou
+                loop.call_soon_threadsafe(self._acordar, futuro)
+
+    @staticmethod
+    def _acordar(futuro):
+        if not futuro.done():
+            futuro.set_result(None)
+
+    def _interrompe(self, na_pausa, acordar):
+        return (
+            not self.rodando
+            or (na_pausa and self.pausado)
+            or (acordar is not None and acordar())
+        )
+
+    def _segue_pausado(self):
+        return self.rodando and self.pausado
+
+    def _medir_reacao(self, medir):
+        if medir:
+            medir("reagir_controle", time.perf_counter() - self.momento_sinal)
+
+    def esperar(self, segundos, na_pausa=True, acordar=None, medir=None):
+        """
+        Dorme até `segundos`, saindo na hora se parar, pausar (se na_pausa) ou
+        acordar() der True. Retorna True se dormiu tudo, False se foi interrompida
+        medir(fase, segundos), se informado, recebe quanto demorou pra acordar
+        depois do sinal
+        """
+        fim = time.monotonic() + segundos
+        with self._condicao:
+            if self._interrompe(na_pausa, acordar):
+                return False
+            while True:
+                restante = fim - time.monotonic()
+                if restante <= 0:
+                    return True
+                self._condicao.wait(restante)
+                if self._interrompe(na_pausa, acordar):
+                    break
+        self._medir_reacao(medir)
+        return False
+
+    def esperar_continuar(self, medir=None):
+        """
+        Enquanto tiver pausado dorme até continuar ou parar
+        Retorna True se pode seguir, False se parou
+        """
+        with self._condicao:
+            if not self._segue_pausado():
+                return self.rodando
+            while self._segue_pausado():
+                self._condicao.wait()
+            rodando = self.rodando
+        self._medir_reacao(medir)
+        return rodando
+
+    @contextlib.contextmanager
+    def _inscricao(self):
+        """
+        Future que o próximo sinal completa. Inscreve antes de conferir o
+        estado, pra um sinal vindo de outra thread nesse meio não se perder
+        """
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        with self._condicao:
+            self._futuros.add((loop, futuro))
+        try:
+            yield futuro
+        finally:
+            with self._condicao:
+                self._futuros.discard((loop, futuro))
+
+    async def esperar_async(self, segundos, na_pausa=True, acordar=None, medir=None):
+        """Igual ao esperar(), sem prender a thread do event loop"""
+        fim = time.monotonic() + segundos
+        esperou = False
+        while True:
+            with self._inscricao() as sinal:
+                if self._interrompe(na_pausa, acordar):
+                    break
+                restante = fim - time.monotonic()
+                if restante <= 0:
+                    return True
+                esperou = True
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(sinal, restante)
+        if esperou:
+            self._medir_reacao(medir)
+        return False
+
+    async def esperar_continuar_async(self, medir=None):
+        """Igual ao esperar_continuar(), sem prender a thread do event loop"""
+        esperou = False
+        while True:
+            with self._inscricao() as sinal:
+                if not self._segue_pausado():
+                    break
+                esperou = True
+                await sinal
+        if esperou:
+            self._medir_reacao(medir)
+        return self.rodando
+
+
+# ==================== AGENDA ====================
+# Campanhas com hora pra começar e prioridade, janela de horário (contada na
+# hora local do destinatário, pelo DDD) e máximo de envios por hora e por dia
+# de cada número que manda. Contato fora da janela volta pra fila pro horário
+# em que ela abre; sessão que bateu o limite dorme até liberar vaga. Com o
+# RelogioVirtual dá pra simular dias de agenda em segundos, sem Chrome.
+
+# Fuso de cada DDD em horas (UTC). Desde 2019 o Brasil não tem horário de
+# verão, então o deslocamento é fixo e não precisa de base de fusos (tzdata).
+# DDD que pega mais de um fuso fica com o da maior parte; o resto é Brasília
+FUSO_BRASILIA = -3
+FUSO_POR_DDD = {
+    **dict.fromkeys((65, 66, 67, 69, 92, 95, 97), -4),  # MT, MS, RO, AM, RR
+    68: -5,  # AC
+}
+FUSOS = {
+    horas: timezone(timedelta(hours=horas))
+    for horas in {FUSO_BRASILIA, *FUSO_POR_DDD.values()}
+}
+
+DIAS_SEMANA = ("seg", "ter", "qua", "qui", "sex", "sab", "dom")  # segunda = 0
+
+UMA_HORA = 3600
+UM_DIA = 86400
+
+# Simulação: quanto leva um envio e até quantos dias de agenda ela anda
+DURACAO_ENVIO_SIMULADA = 10
+MAX_DIAS_SIMULACAO = 60
+
+
+def fuso_do_numero(numero):
+    """Fuso do destinatário pelo DDD ("55" + DDD + número); na dúvida, Brasília"""
+    ddd = numero[2:4] if numero.startswith("55") else ""
+    if not ddd.isdigit():
+        return FUSOS[FUSO_BRASILIA]
+    return FUSOS[FUSO_POR_DDD.get(int(ddd), FUSO_BRASILIA)]
+
+
+def formatar_espera(segundos):
+    """3725 -> '1h02min', 300 -> '5min', 40 -> '40s'"""
+    segundos = int(segundos)
+    if segundos < 60:
+        return f"{segundos}s"
+    horas, minutos = divmod(segundos // 60, 60)
+    return f"{horas}h{minutos:02d}min" if horas else f"{minutos}min"
+
+
+def formatar_momento(momento):
+    """time.time() -> '20/10 08:00' (na hora deste computador)"""
+    return datetime.fromtimestamp(momento).strftime("%d/%m %H:%M")
+
+
+def ler_hora(texto):
+    """'9', '09:30' -> hora do dia"""
+    horas, _, minutos = texto.strip().partition(":")
+    try:
+        return hora_do_dia(int(horas), int(minutos or 0))
+    except ValueError:
+        raise ValueError(f"Hora inválida: '{texto}' (use HH:MM)") from None
+
+
+def ler_dias_semana(texto):
+    """'seg-sex', 'seg,qua,sab' ou 'todos' -> (0, 1, 2, 3, 4), segunda = 0"""
+    texto = texto.strip().lower().replace("á", "a").replace(" ", "")
+    if texto in ("todos", "*"):
+        return tuple(range(7))
+
+    dias = set()
+    for trecho in texto.split(","):
+        primeiro, _, ultimo = trecho.partition("-")
+        try:
+            inicio = DIAS_SEMANA.index(primeiro[:3])
+            fim = DIAS_SEMANA.index((ultimo or primeiro)[:3])
+        except ValueError:
+            raise ValueError(
+                f"Dia inválido: '{trecho}' (use {', '.join(DIAS_SEMANA)})"
+            ) from None
+        # sex-seg passa pelo fim de semana
+        dias.update(
+            range(inicio, fim + 1)
+            if inicio <= fim
+            else (*range(inicio, 7), *range(fim + 1))
+        )
+    return tuple(sorted(dias))
+
+
+def ler_data_hora(texto, agora=None):
+    """
+    '2026-10-20 08:00', '20/10/2026 08:00' ou só '08:00' (a próxima vez que
+    o relógio der essa hora) -> time.time() do momento, na hora deste computador
+    """
+    agora = time.time() if agora is None else agora
+    texto = texto.strip()
+    for formato in ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%d/%m/%Y %H:%M"):
+        try:
+            return datetime.strptime(texto, formato).timestamp()
+        except ValueError:
+            pass
+
+    try:
+        hora = ler_hora(texto)
+    except ValueError:
+        raise ValueError(
+            f"Data inválida: '{texto}' (use AAAA-MM-DD HH:MM ou só HH:MM)"
+        ) from None
+    momento = datetime.combine(datetime.fromtimestamp(agora).date(), hora)
+    if momento.timestamp() <= agora:
+        momento += timedelta(days=1)
+    return momento.timestamp()
+
+
+@dataclass(frozen=True)
+class JanelaEnvio:
+    """Horário em que pode mandar, contado na hora local de cada destinatário"""
+
+    inicio: hora_do_dia = hora_do_dia(9)
+    fim: hora_do_dia = hora_do_dia(18)
+    dias: tuple = (0, 1, 2, 3, 4)  # segunda = 0 ... domingo = 6
+
+    def __post_init__(self):
+        if self.inicio >= self.fim:
+            raise ValueError(
+                "A janela tem que começar antes de acabar (ex.: 09:00-18:00)"
+            )
+        if not self.dias:
+            raise ValueError("A janela precisa de pelo menos um dia da semana")
+
+    @classmethod
+    def de_texto(cls, horario="09:00-18:00", dias="seg-sex"):
+        inicio, separador, fim = horario.partition("-")
+        if not separador:
+            raise ValueError(f"Horário inválido: '{horario}' (use 09:00-18:00)")
+        return cls(ler_hora(inicio), ler_hora(fim), ler_dias_semana(dias))
+
+    def espera(self, numero, agora):
+        """Segundos até a janela abrir pra esse número (0 = tá aberta)"""
+        local = datetime.fromtimestamp(agora, fuso_do_numero(numero))
+        for dias_a_frente in range(8):
+            dia = local.date() + timedelta(days=dias_a_frente)
+            if dia.weekday() not in self.dias:
+                continue
+            if local < datetime.combine(dia, self.fim, local.tzinfo):
+                abre = datetime.combine(dia, self.inicio, local.tzinfo)
+                return max((abre - local).total_seconds(), 0.0)
+
+    def descrever(self):
+        dias = ",".join(DIAS_SEMANA[dia] for dia in self.dias)
+        return f"{dias} {self.inicio:%H:%M}-{self.fim:%H:%M}"
+
+
+class EnviosRecentes:
+    """
+    Envios de um número nas últimas 24h, pra conferir o máximo por hora e por
+    dia em janela deslizante (o envio das 10:15 libera a vaga às 11:15)
+    """
+
+    def __init__(self, envios=()):
+        self._trava = threading.Lock()
+        self._envios = collections.deque(sorted(envios))
+
+    def __len__(self):
+        return len(self._envios)
+
+    def registrar(self, agora):
+        with self._trava:
+            self._envios.append(agora)
+
+    def espera(self, agora, por_hora=None, por_dia=None):
+        """Segundos até poder mandar mais um (0 = já pode)"""
+        with self._trava:
+            while self._envios and self._envios[0] <= agora - UM_DIA:
+                self._envios.popleft()
+            espera = 0.0
+            for maximo, periodo in ((por_hora, UMA_HORA), (por_dia, UM_DIA)):
+                if maximo and len(self._envios) >= maximo:
+                    espera = max(espera, self._envios[-maximo] + periodo - agora)
+            return espera
+
+
+class RelogioReal:
+    """Hora de verdade (time.time)"""
+
+    @staticmethod
+    def agora():
+        return time.time()
+
+
+class RelogioVirtual:
+    """Relógio de mentira pra simulação: só anda quando alguém manda andar"""
+
+    def __init__(self, inicio=None):
+        self.momento = time.time() if inicio is None else inicio
+
+    def agora(self):
+        return self.momento
+
+    def avancar_ate(self, momento):
+        self.momento = max(self.momento, momento)
+
+
+@dataclass
+class CampanhaAgendada:
+    """Uma campanha na fila da agenda, com o ponto onde parou nela"""
+
+    nome: str
+    telefones: list
+    mensagem: str
+    colunas: dict = field(default_factory=dict)
+    modelo: ModeloMensagem = None
+    inicio: float = 0.0  # time.time() de quando pode começar (0 = já)
+    prioridade: int = 0  # maior passa na frente
+    indice_atual: int = 0
+    concluidos: set = field(default_factory=set)
+    concluida: bool = False
+
+    def pendentes(self):
+        return [
+            (indice, numero)
+            for indice, numero in enumerate(self.telefones)
+            if indice >= self.indice_atual and indice not in self.concluidos
+        ]
+
+
+class AgendaEnvio:
+    """
+    Regras de quando mandar (janela e limites por número, conferidos antes de
+    cada envio) e a fila de campanhas agendadas: entre as que já podem
+    começar, vai a de maior prioridade; empate, a que começa antes
+    """
+
+    def __init__(
+        self,
+        campanhas=(),
+        janela=None,
+        por_hora=None,
+        por_dia=None,
+        relogio=None,
+        envios=None,
+    ):
+        self.campanhas = list(campanhas)
+        self.janela = janela
+        self.por_hora = por_hora
+        self.por_dia = por_dia
+        self.relogio = relogio or RelogioReal()
+        self.envios = {} if envios is None else envios  # remetente -> EnviosRecentes
+        self.atual = None  # CampanhaAgendada rodando agora
+
+    @property
+    def tem_limite(self):
+        return bool(self.por_hora or self.por_dia)
+
+    def descrever(self):
+        partes = []
+        if self.janela:
+            partes.append(f"janela {self.janela.descrever()} (hora local de cada DDD)")
+        if self.por_hora:
+            partes.append(f"máx {self.por_hora}/h")
+        if self.por_dia:
+            partes.append(f"máx {self.por_dia}/dia")
+        return ", ".join(partes) + (" por número" if self.tem_limite else "")
+
+    def envios_do(self, sessao):
+        envios = self.envios.get(sessao.remetente)
+        if envios is None:
+            envios = self.envios.setdefault(sessao.remetente, EnviosRecentes())
+        return envios
+
+    def espera_sessao(self, sessao, agora=None):
+        """Segundos até o número dessa sessão poder mandar de novo (0 = já pode)"""
+        if not self.tem_limite:
+            return 0.0
+        agora = self.relogio.agora() if agora is None else agora
+        return self.envios_do(sessao).espera(agora, self.por_hora, self.por_dia)
+
+    def espera_destinatario(self, numero, agora=None):
+        """Segundos até a janela abrir pra esse destinatário (0 = tá aberta)"""
+        if not self.janela:
+            return 0.0
+        agora = self.relogio.agora() if agora is None else agora
+        return self.janela.espera(numero, agora)
+
+    def registrar_envio(self, sessao):
+        self.envios_do(sessao).registrar(self.relogio.agora())
+
+    def _ordem(self, campanha):
+        return (-campanha.prioridade, campanha.inicio, self.campanhas.index(campanha))
+
+    def proxima_campanha(self):
+        """
+        (campanha que roda agora, None), (None, segundos até a próxima poder
+        começar) ou (None, None) se todas acabaram
+        """
+        pendentes = [campanha for campanha in self.campanhas if not campanha.concluida]
+        if not pendentes:
+            return None, None
+        agora = self.relogio.agora()
+        prontas = [campanha for campanha in pendentes if campanha.inicio <= agora]
+        if prontas:
+            return min(prontas, key=self._ordem), None
+        return None, min(campanha.inicio for campanha in pendentes) - agora
+
+    def _mais_urgentes(self):
+        if self.atual is None:
+            return []
+        return [
+            campanha
+            for campanha in self.campanhas
+            if not campanha.concluida and campanha.prioridade > self.atual.prioridade
+        ]
+
+    def mais_urgente(self):
+        """Campanha que já pode começar e passa na frente da atual, ou None"""
+        agora = self.relogio.agora()
+        prontas = [c for c in self._mais_urgentes() if c.inicio <= agora]
+        return min(prontas, key=self._ordem) if prontas else None
+
+    def limitar_espera(self, segundos):
+        """Corta a espera pra acordar quando começar uma campanha mais urgente"""
+        agora = self.relogio.agora()
+        return min([segundos, *(c.inicio - agora for c in self._mais_urgentes())])
+
+
+# ==================== ORQUESTRAÇÃO ASSÍNCRONA (DEVTOOLS) ====================
+# Modo opcional (ConfigEnvio.assincrono): depois do login, cada sessão fala
+# direto com a aba do Chrome pelo DevTools (WebSocket), sem passar pelo
+# chromedriver. Todas as sessões rodam como tasks de um event loop só, numa
+# thread só, e as esperas ficam dentro da página: um MutationObserver avisa
+# quando o campo, o aviso de inválido ou o check aparecem, em vez do Python
+# perguntar de INTERVALO_CHECAGEM em INTERVALO_CHECAGEM.
+# Chrome e login continuam no Selenium (uma vez por sessão, numa thread).
+
+# Teto de espera por uma resposta do DevTools (fora as esperas na página)
+LIMITE_COMANDO_CDP = 30
+
+# Espera dentro da página: checar(false) a cada mudança no DOM (e a cada
+# 500ms, pra mudança só de estilo); no fim do prazo chama checar(true) uma
+# última vez e devolve o que ela der
+JS_OBSERVAR_ATE = """
+function observarAte(checar, limiteMs, terminar) {
+    var acabou = false, observador, rede, prazo;
+    function fim(valor) {
+        if (acabou) return;
+        acabou = true;
+        observador.disconnect();
+        clearInterval(rede);
+        clearTimeout(prazo);
+        terminar(valor === undefined ? null : valor);
+    }
+    function tentar() {
+        if (acabou) return;
+        var valor;
+        try {
+            valor = checar(false);
+        } catch (erro) {
+            return;
+        }
+        if (valor !== null && valor !== undefined && valor !== false) fim(valor);
+    }
+    observador = new MutationObserver(tentar);
+    observador.observe(document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+    rede = setInterval(tentar, 500);
+    prazo = setTimeout(function () {
+        var valor = null;
+        try {
+            valor = checar(true);
+        } catch (erro) {}
+        fim(valor);
+    }, limiteMs);
+    tentar();
+}
+"""
+
+# Mesma sondagem do JS_SONDAR_PAGINA, mas esperando o primeiro estado bater
+# Volta [estado, seletor] (elemento não atravessa o DevTools) ou null
+JS_ESPERAR_ESTADO = (
+    JS_OBSERVAR_ATE + "var sondarPagina = function () {" + JS_SONDAR_PAGINA + """};
+var sondas = arguments[0], limiteMs = arguments[1];
+observarAte(function () {
+    var achado = sondarPagina(sondas);
+    if (!achado) return null;
+    // Popup desabilitado (ainda carregando) não serve: continua esperando
+    if (achado[0] === 'popup' && achado[1].disabled) return null;
+    return [achado[0], achado[2]];
+}, limiteMs, arguments[arguments.length - 1]);
+"""
+)
+
+# Espera a bolha nova ganhar o check; no fim do prazo diz se ela pelo menos
+# saiu ('pendente') ou nem apareceu (null), igual ao esperar_envio_confirmado
+JS_ESPERAR_CHECK = JS_OBSERVAR_ATE + """
+var seletor = arguments[0], limiteMs = arguments[1];
+observarAte(function (acabouTempo) {
+    var novas = document.querySelectorAll('div.message-out:not([data-wa-auto-visto])');
+    if (!novas.length) return null;
+    if (novas[novas.length - 1].querySelector(seletor)) return 'enviada';
+    return acabouTempo ? 'pendente' : null;
+}, limiteMs, arguments[arguments.length - 1]);
+"""
+
+# Marca as bolhas que já estão na tela, limpa o campo e cola o texto nele
+# Volta true quando o WhatsApp registrou o texto (espera até 2s)
+JS_COLAR_NO_CAMPO = JS_OBSERVAR_ATE + """
+var xpathCampo = arguments[0], texto = arguments[1];
+var terminar = arguments[arguments.length - 1];
+
+document.querySelectorAll('div.message-out').forEach(function (bolha) {
+    bolha.setAttribute('data-wa-auto-visto', '1');
+});
+
+var campo = document.evaluate(xpathCampo, document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!campo) return terminar(false);
+
+campo.focus();
+var selecao = window.getSelection();
+var trecho = document.createRange();
+trecho.selectNodeContents(campo);
+selecao.removeAllRanges();
+selecao.addRange(trecho);
+if (campo.textContent) document.execCommand('delete');
+
+var dados = new DataTransfer();
+dados.setData('text/plain', texto);
+campo.dispatchEvent(new ClipboardEvent('paste', {
+    bubbles: true, cancelable: true, clipboardData: dados
+}));
+if (!campo.textContent) {
+    var linhas = texto.split('\\n');
+    for (var i = 0; i < linhas.length; i++) {
+        campo.appendChild(document.createTextNode(linhas[i]));
+        if (i < linhas.length - 1) campo.appendChild(document.createElement('br'));
+    }
+}
+
+// Cursor no fim, pro ENTER cair no campo certo
+trecho = document.createRange();
+trecho.selectNodeContents(campo);
+trecho.collapse(false);
+selecao.removeAllRanges();
+selecao.addRange(trecho);
+campo.dispatchEvent(new Event('input', { bubbles: true }));
+
+observarAte(function () {
+    return campo.textContent.length > 0 || null;
+}, 2000, function (colou) { terminar(!!colou); });
+"""
+
+JS_CLICAR = """
+var elemento = document.evaluate(arguments[0], document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!elemento) return false;
+elemento.click();
+return true;
+"""
+
+
+class ErroCDP(Exception):
+    """Comando do DevTools que voltou com erro, não respondeu ou conexão que caiu"""
+
+
+def ler_alvos_devtools(endereco):
+    """Abas abertas no Chrome (lista /json/list do DevTools em host:porta)"""
+    with urllib.request.urlopen(f"http://{endereco}/json/list", timeout=5) as resposta:
+        return json.loads(resposta.read().decode("utf-8"))
+
+
+class ConexaoCDP:
+    """
+    WebSocket com o DevTools de uma aba. Vários comandos podem estar no ar ao
+    mesmo tempo (cada um com seu id); uma task lê as respostas e os eventos
+    que o Chrome empurra e entrega pra quem tá esperando
+    """
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.ultimo_id = 0
+        self.comandos = 0  # quantos comandos já foram (pros benchmarks)
+        self.fechada = False
+        self.pendentes = {}  # id -> Future da resposta
+        self.esperando_evento = collections.defaultdict(list)  # método -> [Future]
+        self._leitor = asyncio.create_task(self._ler())
+
+    @classmethod
+    async def abrir(cls, url_ws):
+        # Resposta de script pode ser grande; ping não precisa (é local)
+        conexao = await websockets.connect(url_ws, max_size=None, ping_interval=None)
+        return cls(conexao)
+
+    async def _ler(self):
+        erro = ErroCDP("conexão com o DevTools fechou")
+        try:
+            async for bruto in self.conexao:
+                mensagem = json.loads(bruto)
+                if "id" in mensagem:
+                    futuro = self.pendentes.pop(mensagem["id"], None)
+                    if futuro is None or futuro.done():
+                        continue
+                    if "error" in mensagem:
+                        futuro.set_exception(
+                            ErroCDP(mensagem["error"].get("message", "erro"))
+                        )
+                    else:
+                        futuro.set_result(mensagem.get("result", {}))
+                else:
+                    for futuro in self.esperando_evento.pop(mensagem.get("method"), []):
+                        if not futuro.done():
+                            futuro.set_result(mensagem.get("params", {}))
+        except Exception as motivo:
+            erro = ErroCDP(f"conexão com o DevTools caiu: {motivo}")
+        finally:
+            # Ninguém fica esperando resposta que não vem mais
+            self.fechada = True
+            esperando = list(self.pendentes.values())
+            for futuros in self.esperando_evento.values():
+                esperando.extend(futuros)
+            self.pendentes.clear()
+            self.esperando_evento.clear()
+            for futuro in esperando:
+                if not futuro.done():
+                    futuro.set_exception(erro)
+
+    async def comando(self, metodo, limite=LIMITE_COMANDO_CDP, **parametros):
+        """Manda um comando e espera a resposta (ErroCDP se der erro ou demorar)"""
+        if self.fechada:
+            raise ErroCDP("conexão com o DevTools fechada")
+        self.ultimo_id += 1
+        id_comando = self.ultimo_id
+        futuro = asyncio.get_running_loop().create_future()
+        self.pendentes[id_comando] = futuro
+        self.comandos += 1
+        try:
+            await self.conexao.send(
+                json.dumps({"id": id_comando, "method": metodo, "params": parametros})
+            )
+            return await asyncio.wait_for(futuro, limite)
+        except asyncio.TimeoutError:
+            raise ErroCDP(f"{metodo} sem resposta em {limite:.0f}s") from None
+        except websockets.ConnectionClosed as motivo:
+            raise ErroCDP(f"conexão com o DevTools caiu: {motivo}") from None
+        finally:
+            self.pendentes.pop(id_comando, None)
+
+    def evento(self, metodo):
+        """
+        Future do próximo evento `metodo` (ex.: Page.loadEventFired)
+        Pede antes de mandar o comando que causa o evento, pra não perder ele
+        """
+        futuro = asyncio.get_running_loop().create_future()
+        if self.fechada:
+            futuro.set_exception(ErroCDP("conexão com o DevTools fechada"))
+        else:
+            self.esperando_evento[metodo].append(futuro)
+        return futuro
+
+    async def fechar(self):
+        self._leitor.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._leitor
+        await self.conexao.close()
+
+
+class PaginaCDP:
+    """A aba do WhatsApp de uma sessão, comandada direto pelo DevTools"""
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    @classmethod
+    async def conectar(cls, navegador):
+        """Acha a aba que o Selenium tá usando e abre o DevTools dela"""
+        endereco = navegador.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        aba_atual, alvos = await asyncio.gather(
+            asyncio.to_thread(lambda: navegador.current_window_handle),
+            asyncio.to_thread(ler_alvos_devtools, endereco),
+        )
+        paginas = [alvo for alvo in alvos if alvo.get("type") == "page"]
+        # O chromedriver usa o id da aba como window handle
+        alvo = next(
+            (pagina for pagina in paginas if pagina["id"] == aba_atual),
+            paginas[0] if paginas else None,
+        )
+        if alvo is None or "webSocketDebuggerUrl" not in alvo:
+            raise ErroCDP("não achei a aba do WhatsApp no DevTools")
+
+        pagina = cls(await ConexaoCDP.abrir(alvo["webSocketDebuggerUrl"]))
+        await pagina.conexao.comando("Page.enable")
+        return pagina
+
+    async def executar(self, script, *args, limite=LIMITE_COMANDO_CDP):
+        """Igual ao execute_script: `script` é corpo de função e lê arguments[n]"""
+        expressao = (
+            f"(function () {{\n{script}\n}}).apply(null, {json.dumps(list(args))})"
+        )
+        return await self._avaliar(expressao, limite)
+
+    async def executar_async(self, script, *args, limite=LIMITE_COMANDO_CDP):
+        """Igual ao execute_async_script: o último argumento é a função de terminar"""
+        expressao = (
+            "new Promise(function (terminar) {\n"
+            f"(function () {{\n{script}\n}}).apply(null, "
+            f"{json.dumps(list(args))}.concat([terminar]));\n}})"
+        )
+        return await self._avaliar(expressao, limite)
+
+    async def _avaliar(self, expressao, limite):
+        resposta = await self.conexao.comando(
+            "Runtime.evaluate",
+            limite,
+            expression=expressao,
+            returnByValue=True,
+            awaitPromise=True,
+        )
+        falha = resposta.get("exceptionDetails")
+        if falha:
+            descricao = falha.get("exception", {}).get("description") or falha.get(
+                "text", "erro no script"
+            )
+            raise ErroCDP(descricao.split("\n")[0])
+        return resposta.get("result", {}).get("value")
+
+    async def navegar(self, url, limite):
+        """Igual ao get(): abre a URL e espera a página carregar (até `limite`)"""
+        carregou = self.conexao.evento("Page.loadEventFired")
+        resposta = await self.conexao.comando("Page.navigate", url=url)
+        if resposta.get("errorText"):
+            carregou.cancel()
+            raise ErroCDP(f"não abriu {url}: {resposta['errorText']}")
+        try:
+            await asyncio.wait_for(carregou, limite)
+        except asyncio.TimeoutError:
+            pass  # quem chamou espera a conversa; a carga pode terminar depois
+
+    async def apertar_enter(self):
+        """ENTER de verdade (evento confiável), no elemento que tá com o foco"""
+        tecla = {"key": "Enter", "code": "Enter", "windowsVirtualKeyCode": 13}
+        await self.conexao.comando(
+            "Input.dispatchKeyEvent", type="keyDown", text="\r", **tecla
+        )
+        await self.conexao.comando("Input.dispatchKeyEvent", type="keyUp", **tecla)
+
+    async def fechar(self):
+        """Fecha só a conexão do DevTools; o Chrome continua com o Selenium"""
+        await self.conexao.fechar()
+
+
+class OrquestradorAssincrono:
+    """
+    Roda as sessões da campanha como tasks de um event loop só, usando o
+    mesmo MotorEnvio pra fila, ritmo, placar, histórico, banco e log
+    Pausar/parar continua sendo ta_pausado / ta_rodando (e parada de cada
+    sessão), conferidos nos mesmos pontos do loop com threads
+    """
+
+    def __init__(self, motor):
+        self.motor = motor
+
+    def executar(self, fila, mensagem, placar):
+        asyncio.run(self.rodar_sessoes(fila, mensagem, placar))
+
+    async def rodar_sessoes(self, fila, mensagem, placar):
+        sessoes = self.motor.sessoes
+        await asyncio.gather(
+            *(
+                self.rodar_sessao(sessao, fila, mensagem, placar, len(sessoes) > 1)
+                for sessao in sessoes
+            )
+        )
+
+    async def rodar_sessao(self, sessao, fila, mensagem, placar, marcar_log=False):
+        """Mesmo loop do MotorEnvio.rodar_sessao, com as esperas no event loop"""
+        motor = self.motor
+        if marcar_log:
+            PREFIXO_LOG.set(f"[{sessao.nome}] ")  # cada task tem o seu contexto
+
+        try:
+            # Chrome e login vão pelo Selenium, numa thread pra não travar as outras
+            if not await asyncio.to_thread(motor.abrir_sessao, sessao):
+                return
+            if not motor.sessao_ativa(sessao):
+                return
+            sessao.pagina = await PaginaCDP.conectar(sessao.navegador)
+            motor.escrever_log(
+                "[ASSINCRONO] 🔌 Envio pelo DevTools nessa sessão", "info"
+            )
+
+            while motor.sessao_ativa(sessao):
+                await motor.controle.esperar_continuar_async(motor.medir_fase)
+
+                if not motor.sessao_ativa(sessao) or motor.hora_de_ceder():
+                    break
+
+                item = fila.pegar()
+                if item is None:
+                    espera = fila.espera_repeticao()
+                    if espera is None:
+                        break
+                    motor.mostrar_status(
+                        f"Próximo contato em {formatar_espera(espera)}..."
+                    )
+                    await self.dormir(sessao, motor.limitar_espera(espera))
+                    continue
+
+                espera = motor.checar_agenda(sessao, fila, item)
+                if espera is not None:
+                    await self.dormir(sessao, motor.limitar_espera(espera))
+                    continue
+
+                indice, numero = item
+                tentativa = fila.tentativas[indice]
+                motor.marcar_destinatario(indice, ENVIANDO)
+                motor.mostrar_status(
+                    f"Enviando para {numero} ({placar.processados + 1}/{placar.total})..."
+                )
+
+                texto = motor.mensagens[indice] if motor.mensagens else mensagem
+                resultado = await self.mandar_mensagem(sessao.pagina, numero, texto)
+                mudanca_ritmo = motor.concluir_envio(
+                    sessao, fila, placar, item, tentativa, texto, resultado
+                )
+
+                if fila.tem_pendentes() and motor.sessao_ativa(sessao):
+                    if not motor.ta_pausado:
+                        pausa = motor.calcular_pausa(sessao, mudanca_ritmo)
+                        motor.mostrar_status(f"Pausa: {pausa:.0f}s...")
+                        await self.dormir(sessao, pausa)
+
+            if not motor.ta_rodando:
+                motor.escrever_log(
+                    "Automação interrompida pelo usuário", "warning", nao_repetir=True
+                )
+
+            motor.logar_recursos(sessao.recursos, "Chrome no fim da sessão")
+
+        except Exception as erro:
+            motor.escrever_log(f"Erro na sessão: {str(erro)}", "error")
+            sessao.parada = True
+        finally:
+            if sessao.pagina:
+                with contextlib.suppress(Exception):
+                    await sessao.pagina.fechar()
+                sessao.pagina = None
+
+    async def dormir(self, sessao, segundos):
+        """Igual ao dormir_na_sessao, sem prender thread nenhuma"""
+        await self.motor.controle.esperar_async(
+            segundos,
+            acordar=lambda: sessao.parada,
+            medir=self.motor.medir_fase,
+        )
+
+    async def mandar_mensagem(self, pagina, numero_destino, texto_mensagem):
+        """Mesmo que o MotorEnvio.mandar_mensagem (sem anexo), pelo DevTools"""
+        motor = self.motor
+        resultado = ResultadoEnvio(numero_destino)
+        inicio_envio = time.perf_counter()
+
+        try:
+            motor.escrever_log(f"📤 Mandando mensagem pro {numero_destino}...", "info")
+
+            estado = await self.abrir_conversa(pagina, numero_destino, resultado)
+
+            if estado == "invalido":
+                motor.escrever_log(
+                    f"⚠️ NÚMERO INVÁLIDO: {numero_destino} não possui WhatsApp!",
+                    "warning",
+                )
+                resultado.desfecho = DesfechoEnvio.NUMERO_INVALIDO
+                return resultado
+
+            if estado != "pronto":
+                motor.escrever_log(
+                    f"❌ Não achei onde digitar depois de {motor.config.limites_espera['conversa']}s",
+                    "error",
+                )
+                resultado.desfecho = DesfechoEnvio.CONVERSA_NAO_ABRIU
+                return resultado
+
+            motor.escrever_log("✅ Achei onde digitar!", "success")
+
+            partes = motor.dividir_partes(texto_mensagem)
+            resultado.partes_total = len(partes)
+
+            if len(partes) > 1:
+                enviou = await self.enviar_partes_em_lote(pagina, partes, resultado)
+                if enviou is not None:
+                    if not enviou:
+                        resultado.desfecho = DesfechoEnvio.ENVIO_NAO_CONFIRMADO
+                        return resultado
+                    partes = []  # já foram todas
+
+            for parte in partes:
+                # Parou/pausou no meio: não manda o resto dos parágrafos
+                if resultado.partes_enviadas and (
+                    not motor.ta_rodando or motor.ta_pausado
+                ):
+                    resultado.desfecho = DesfechoEnvio.INTERROMPIDO
+                    return resultado
+
+                if not await self.digitar_e_enviar(pagina, parte, resultado):
+                    resultado.desfecho = DesfechoEnvio.ENVIO_NAO_CONFIRMADO
+                    return resultado
+                resultado.partes_enviadas += 1
+
+            if resultado.partes_total > 1:
+                motor.escrever_log(
+                    f"✅ {resultado.partes_total} partes enviadas!", "success"
+                )
+            else:
+                motor.escrever_log("✅ Mensagem enviada!", "success")
+
+            resultado.desfecho = DesfechoEnvio.ENVIADO
+            return resultado
+
+        except Exception as erro:
+            motor.escrever_log(f"❌ Erro crítico: {str(erro)}", "error")
+            resultado.desfecho = DesfechoEnvio.ERRO
+            resultado.erro = str(erro).strip().split("\n")[0] or type(erro).__name__
+            return resultado
+        finally:
+            resultado.somar("total", time.perf_counter() - inicio_envio)
+
+    async def abrir_conversa(self, pagina, numero_destino, resultado):
+        """Mesmo que o MotorEnvio.abrir_conversa; retorna só o estado"""
+        motor = self.motor
+        limites = motor.config.limites_espera
+        url_conversa = f"{motor.config.url_whatsapp}/send?phone={numero_destino}"
+        estado = "timeout"
+        trocou_sem_recarregar = False
+
+        if motor.config.navegacao_interna:
+            with resultado.fase("navegar"):
+                troca = await pagina.executar(
+                    JS_TROCAR_CONVERSA, url_conversa, MAX_FALHAS_TROCA_INTERNA
+                )
+
+            if troca == "trocando":
+                with resultado.fase("esperar_conversa"):
+                    estado = await self.esperar_conversa_pronta(
+                        pagina,
+                        limites["troca_interna"],
+                        resultado.somar,
+                        ESTADOS_TROCA_INTERNA,
+                    )
+                trocou_sem_recarregar = estado != "timeout"
+
+                if not trocou_sem_recarregar:
+                    falhas = await pagina.executar(JS_FALHA_TROCA)
+                    motor.escrever_log(
+                        "⚠️ Troca sem recarregar não funcionou, recarregando a página",
+                        "warning",
+                    )
+                    if falhas >= MAX_FALHAS_TROCA_INTERNA:
+                        motor.escrever_log(
+                            "⚠️ Troca sem recarregar desligada nesse navegador, "
+                            "usando só recarregamento",
+                            "warning",
+                        )
+
+        if estado == "timeout":
+            with resultado.fase("navegar"):
+                await pagina.navegar(url_conversa, limites["conversa"])
+            with resultado.fase("esperar_conversa"):
+                estado = await self.esperar_conversa_pronta(
+                    pagina, limites["conversa"], resultado.somar
+                )
+
+        if estado == "pronto":
+            await pagina.executar(JS_CONVERSA_ABERTA, trocou_sem_recarregar)
+        elif estado == "invalido_pagina":
+            motor.avisar_invalido_fora_do_popup()
+            estado = "invalido"
+
+        return estado
+
+    async def esperar_conversa_pronta(
+        self, pagina, tempo_max, medir, estados=ESTADOS_CONVERSA
+    ):
+        """
+        Espera dentro da página o campo de texto ou o aviso de número inválido
+        Se aparecer o popup "Usar o WhatsApp Web" clica nele e continua esperando
+        Retorna: "pronto", "invalido", "invalido_pagina" ou "timeout"
+        """
+        fim = time.monotonic() + tempo_max
+        while True:
+            restante = fim - time.monotonic()
+            if restante <= 0:
+                return "timeout"
+            try:
+                achado = await pagina.executar_async(
+                    JS_ESPERAR_ESTADO,
+                    sondas_dos_estados(estados),
+                    restante * 1000,
+                    limite=restante + 5,
+                )
+            except ErroCDP:
+                if pagina.conexao.fechada:
+                    raise
+                # Página no meio da carga (o script morreu junto): tenta de novo
+                await asyncio.sleep(INTERVALO_CHECAGEM)
+                continue
+
+            if not achado:
+                return "timeout"
+            estado, seletor = achado
+            REGISTRO_SELETORES.registrar_acerto(estado, seletor)
+            if estado != "popup":
+                return estado
+
+            inicio = time.perf_counter()
+            await pagina.executar(JS_CLICAR, XPATH_POPUP_WEB)
+            medir("fechar_popup", time.perf_counter() - inicio)
+            await asyncio.sleep(INTERVALO_CHECAGEM)  # dá tempo do popup sumir
+
+    async def digitar_e_enviar(self, pagina, texto, resultado):
+        """Cola o texto, aperta ENTER e espera (na página) a bolha ganhar o check"""
+        motor = self.motor
+        limite = motor.config.limites_espera["envio"]
+
+        with resultado.fase("injetar_texto"):
+            colou = await pagina.executar_async(
+                JS_COLAR_NO_CAMPO, XPATH_CAMPO_TEXTO, texto
+            )
+        if not colou:
+            motor.escrever_log("❌ O texto não entrou no campo da conversa", "error")
+            return False
+
+        resultado.submetido = True
+        with resultado.fase("enviar"):
+            await pagina.apertar_enter()
+
+        with resultado.fase("confirmar"):
+            status = await pagina.executar_async(
+                JS_ESPERAR_CHECK,
+                SELETOR_BOLHA_ENVIADA,
+                limite * 1000,
+                limite=limite + 5,
+            )
+        return motor.conferir_status_envio(status)
+
+    async def enviar_partes_em_lote(self, pagina, partes, resultado):
+        """Mesmo que o MotorEnvio.enviar_partes_em_lote, esperando o check na página"""
+        motor = self.motor
+        limite = motor.config.limites_espera["envio"]
+
+        resultado.submetido = True
+        with resultado.fase("enviar_partes"):
+            retorno = await pagina.executar_async(
+                JS_ENVIAR_PARTES,
+                partes,
+                XPATH_CAMPO_TEXTO,
+                SELETOR_BOTAO_ENVIAR,
+                limite * 1000,
+                limite=limite * len(partes) + 5,
+            )
+        resultado.partes_enviadas += retorno["enviadas"]
+
+        if retorno["enviadas"] == 0 and retorno["erro"] in ERROS_LOTE_ANTES_DO_ENTER:
+            resultado.submetido = False
+            motor.escrever_log(
+                f"⚠️ Envio em lote não pegou ({retorno['erro']}), mandando parte por parte",
+                "warning",
+                nao_repetir=True,
+            )
+            return None
+
+        if retorno["erro"]:
+            motor.escrever_log(
+                f"❌ Só {retorno['enviadas']}/{len(partes)} partes apareceram na conversa",
+                "error",
+            )
+            return False
+
+        with resultado.fase("confirmar"):
+            status = await pagina.executar_async(
+                JS_ESPERAR_CHECK,
+                SELETOR_BOLHA_ENVIADA,
+                limite * 1000,
+                limite=limite + 5,
+            )
+
+        if status is None:
+            motor.escrever_log(
+                "❌ As partes sumiram da conversa antes do check", "error"
+            )
+            return False
+        return motor.conferir_status_envio(status)
+
+
+# ==================== MOTOR DE ENVIO ====================
+# O MotorEnvio faz a campanha inteira: Chrome, login, pool de sessões, envio,
+# repetição, ritmo, histórico e banco. Quem usa (a janela ou a linha de
+# comando) monta a ConfigEnvio antes de começar e recebe o andamento pelos
+# ganchos escrever_log / mostrar_status / mostrar_progresso /
+# marcar_destinatario, que podem ser chamados de qualquer thread.
+
+
+@dataclass
+class ConfigEnvio:
+    """Opções de uma execução, lidas uma vez antes de começar"""
+
+    headless: bool = False
+    chrome_escondido: bool = False
+    mensagem_unica: bool = True  # False = um envio por parágrafo (\n\n)
+    # Trocar de conversa sem recarregar: só testado contra o WhatsApp falso
+    navegacao_interna: bool = False
+    qtd_sessoes: int = 1
+    perfil: str = None  # perfil salvo do Chrome; None = pasta temporária
+    formato_historico: str = "csv"
+    ritmo: dict = field(default_factory=dict)  # argumentos do ControladorRitmo
+    url_whatsapp: str = URL_WHATSAPP
+    limites_espera: dict = field(default_factory=lambda: dict(LIMITES_ESPERA))
+    assincrono: bool = False  # sessões num event loop só, pelo DevTools
+    janela: JanelaEnvio = None  # só manda nesse horário (hora local do DDD)
+    max_por_hora: int = None  # envios de cada número por hora (None = sem limite)
+    max_por_dia: int = None  # envios de cada número em 24h (None = sem limite)
+
+
+class MotorEnvio:
+    """
+    Manda a campanha pelo WhatsApp Web sem depender de tela nenhuma
+    Os ganchos só escrevem no terminal; a janela sobrescreve pra mostrar lá
+    """
+
+    def __init__(self, config=None):
+        self.config = config or ConfigEnvio()
+        self.controle = ControleExecucao()  # ta_rodando / ta_pausado moram aqui
+        self.navegador = None
+        self.lista_telefones = []
+        self.logs_ja_mostrados = set()
+        self.indice_atual = 0  # para retomar de onde parou
+        self.indices_concluidos = set()  # processados depois do indice_atual
+        self.sessoes = []
+        self.pastas_temporarias = []
+        self.historico = None
+        self.banco = None  # BancoCampanhas, abre no primeiro envio
+        self.campanha_id = None
+        self.arquivo_campanha = ""
+        self.medidor = None  # MedidorFases da execução atual
+        self.colunas_planilha = {}  # outras colunas da planilha: {título: [valores]}
+        self.mensagens = None  # texto já montado de cada destinatário
+        self.anexo = None  # AnexoCampanha (imagem/PDF), lido uma vez só
+        self.agenda = None  # AgendaEnvio (janela, limites e campanhas agendadas)
+        self.envios_por_remetente = {}  # EnviosRecentes de cada número, entre execuções
+
+    @property
+    def ta_rodando(self):
+        return self.controle.rodando
+
+    @ta_rodando.setter
+    def ta_rodando(self, rodando):
+        self.controle.definir(rodando=rodando)
+
+    @property
+    def ta_pausado(self):
+        return self.controle.pausado
+
+    @ta_pausado.setter
+    def ta_pausado(self, pausado):
+        self.controle.definir(pausado=pausado)
+
+    # ---- ganchos pra quem tá mostrando o andamento ----
+
+    def escrever_log(self, mensagem, tipo="info", nao_repetir=False):
+        if nao_repetir:
+            if mensagem in self.logs_ja_mostrados:
+                return
+            self.logs_ja_mostrados.add(mensagem)
+
+        print(
+            f"[{time.strftime('%H:%M:%S')}] {PREFIXO_LOG.get()}{mensagem}", flush=True
+        )
+
+    def mostrar_status(self, texto):
+        pass
+
+    def mostrar_progresso(self, processados, total=None):
+        pass
+
+    def marcar_destinatario(self, indice, status):
+        pass
+
+    # ---- campanha ----
+
+    def usar_lista(self, telefones, colunas=None, arquivo=""):
+        """Troca a lista de destinatários (e as colunas das variáveis)"""
+        self.lista_telefones = telefones
+        self.colunas_planilha = colunas or {}
+        self.indice_atual = 0
+        self.indices_concluidos = set()
+        self.arquivo_campanha = arquivo
+
+    def rodar_campanha(self, mensagem, modelo=None):
+        """
+        Manda pra lista toda (volta quando acabar ou parar) e escreve o
+        relatório no log. Retorna o placar, ou None se nenhuma sessão logou
+        """
+        self.controle.definir(rodando=True, pausado=False)
+        self.limpar_cache_logs()
+        if self.agenda is None or self.agenda.atual is None:
+            self.agenda = self.montar_agenda()  # fora da rodar_agenda: só as regras
+        self.mensagens = self.montar_mensagens(modelo)
+
+        total = len(self.lista_telefones)
+        self.historico = GravadorHistorico(formato=self.config.formato_historico)
+        self.medidor = MedidorFases()
+        self.carregar_progresso_salvo(mensagem)
+
+        self.mostrar_status("Configurando navegador...")
+        placar = self.executar_pool(mensagem)
+
+        if not any(sessao.logada for sessao in self.sessoes):
+            self.escrever_log("Falha no login do WhatsApp", "error")
+            return None
+
+        placar.concluida = self.ta_rodando and self.indice_atual >= total
+        if not placar.concluida and self.agenda and self.agenda.mais_urgente():
+            return placar  # cedeu a vez: a rodar_agenda volta nela depois
+        if not placar.concluida:
+            self.escrever_log(
+                f"⏹️ Automação interrompida. Progresso salvo: {self.indice_atual + 1}/{total}",
+                "warning",
+            )
+            if self.campanha_id is not None:
+                self.escrever_log(
+                    "💾 Campanha salva: carregue a mesma planilha com a mesma "
+                    "mensagem pra continuar de onde parou",
+                    "info",
+                )
+            return placar
+
+        if self.campanha_id is not None:
+            self.banco.marcar_concluida(self.campanha_id)
+
+        sucessos = placar.sucessos
+        falhas = placar.falhas
+        taxa_sucesso = (sucessos / total * 100) if total > 0 else 0
+        self.escrever_log("=" * 50, "info")
+        self.escrever_log("🎉 AUTOMAÇÃO CONCLUÍDA!", "success")
+        self.escrever_log(
+            f"✅ Sucessos: {sucessos}/{total} ({taxa_sucesso:.1f}%)", "success"
+        )
+        if placar.numeros_invalidos > 0:
+            self.escrever_log(
+                f"⚠️ Números sem WhatsApp: {placar.numeros_invalidos}/{total}",
+                "warning",
+            )
+        self.escrever_log(
+            f"❌ Falhas: {falhas}/{total}", "error" if falhas > 0 else "info"
+        )
+        for desfecho, quantos in placar.por_desfecho.items():
+            if desfecho not in (DesfechoEnvio.ENVIADO, DesfechoEnvio.NUMERO_INVALIDO):
+                self.escrever_log(
+                    f"   • {REGISTRO_DESFECHO[desfecho][1]}: {quantos}", "error"
+                )
+        linha_repeticoes = self.resumo_repeticoes(placar)
+        if linha_repeticoes:
+            self.escrever_log(linha_repeticoes, "info")
+            for numero, observacao in placar.esgotados[:MAX_ESGOTADOS_LOG]:
+                self.escrever_log(f"   • {numero}: {observacao}", "error")
+            if len(placar.esgotados) > MAX_ESGOTADOS_LOG:
+                self.escrever_log(
+                    f"   • ... e mais {len(placar.esgotados) - MAX_ESGOTADOS_LOG} "
+                    "(veja o histórico)",
+                    "error",
+                )
+        self.escrever_log("=" * 50, "info")
+
+        self.mostrar_status(f"Concluído: {sucessos} sucessos, {falhas} falhas")
+        return placar
+
+    def relatorio_final(self, placar):
+        """Resumo curto da campanha concluída (pro aviso da tela ou o terminal)"""
+        total = placar.total
+        taxa_sucesso = (placar.sucessos / total * 100) if total > 0 else 0
+        relatorio = f"✅ Envios finalizados!\n\n✅ Sucessos: {placar.sucessos}/{total} ({taxa_sucesso:.1f}%)"
+        if placar.numeros_invalidos > 0:
+            relatorio += f"\n⚠️ Números sem WhatsApp: {placar.numeros_invalidos}"
+        relatorio += f"\n❌ Falhas: {placar.falhas}"
+        linha_repeticoes = self.resumo_repeticoes(placar)
+        if linha_repeticoes:
+            relatorio += f"\n{linha_repeticoes}"
+        relatorio += f"\n\n📊 Histórico salvo em: {self.historico.caminho}"
+        return relatorio
+
+    def enviar_teste(self, mensagem, numero):
+        """
+        Abre o Chrome, faz login e manda pra um número só
+        Retorna o ResultadoEnvio, ou None se nem chegou a mandar
+        """
+        self.controle.definir(rodando=True, pausado=False)
+        self.historico = GravadorHistorico(formato=self.config.formato_historico)
+        self.medidor = MedidorFases()
+
+        self.mostrar_status("Configurando navegador para teste...")
+        self.navegador = self.configurar_chrome(self.config.perfil)
+
+        if not self.navegador:
+            self.escrever_log("Erro ao configurar navegador", "error")
+            return None
+
+        recursos = MedidorRecursos(self.navegador)
+        recursos.medir()
+
+        self.mostrar_status("Navegando para WhatsApp Web...")
+        inicio = time.perf_counter()
+        self.navegador.get(self.config.url_whatsapp)
+        self.medir_fase("login_abrir_pagina", time.perf_counter() - inicio)
+
+        self.mostrar_status("Aguardando login no WhatsApp...")
+        if not self.fazer_login_whatsapp(self.navegador):
+            self.escrever_log("Falha no login do WhatsApp", "error")
+            return None
+        self.logar_recursos(recursos, "Chrome após login")
+
+        self.mostrar_status(f"TESTE: Enviando para {numero}...")
+        self.mostrar_progresso(0, 1)
+
+        resultado = self.mandar_mensagem(self.navegador, numero, mensagem)
+        self.medidor.registrar_resultado(resultado)
+        if resultado:
+            self.escrever_log("✅ TESTE CONCLUÍDO COM SUCESSO!", "success")
+            self.historico.registrar(
+                numero, "✅ Teste Sucesso", mensagem, "Teste executado com sucesso"
+            )
+            self.mostrar_status("Teste concluído com sucesso!")
+        else:
+            self.escrever_log("❌ TESTE FALHOU", "error")
+            self.historico.registrar(
+                numero, "❌ Teste Falha", mensagem, resultado.observacao
+            )
+            self.mostrar_status("Teste falhou!")
+
+        self.mostrar_progresso(1, 1)
+        self.logar_recursos(recursos, "Chrome após o envio")
+        return resultado
+
+    # ---- agenda ----
+
+    def montar_agenda(self, campanhas=(), relogio=None):
+        """
+        AgendaEnvio com a janela e os limites da config (None se não tem regra
+        nem campanha). Com relógio de mentira os envios contados são só dela
+        """
+        agenda = AgendaEnvio(
+            campanhas,
+            self.config.janela,
+            self.config.max_por_hora,
+            self.config.max_por_dia,
+            relogio,
+            self.envios_por_remetente if relogio is None else None,
+        )
+        if not (agenda.janela or agenda.tem_limite):
+            return agenda if campanhas else None
+        self.escrever_log(f"[AGENDA] 🕘 {agenda.descrever()}", "info")
+        return agenda
+
+    def rodar_agenda(self, campanhas):
+        """
+        Roda as campanhas agendadas uma por vez: entre as que já podem começar,
+        a de maior prioridade; se nenhuma pode ainda, espera a próxima hora de
+        início. Uma mais urgente que chega no meio toma a vez entre um envio e
+        outro, e a que cedeu continua depois de onde parou
+        Volta quando todas acabarem, parar ou o login falhar
+        Retorna {nome: placar} das que chegaram a rodar
+        """
+        self.controle.definir(rodando=True, pausado=False)
+        self.agenda = self.montar_agenda(campanhas)
+        placares = {}
+        try:
+            while self.ta_rodando:
+                campanha, espera = self.agenda.proxima_campanha()
+                if campanha is None:
+                    if espera is None:
+                        break
+                    quando = formatar_momento(self.agenda.relogio.agora() + espera)
+                    self.escrever_log(
+                        f"[AGENDA] ⏰ Próxima campanha começa {quando}",
+                        "info",
+                        nao_repetir=True,
+                    )
+                    self.mostrar_status(f"Agendada: começa {quando}")
+                    self.controle.esperar(espera, na_pausa=False)
+                    continue
+
+                if placares:  # Chrome e histórico da campanha anterior
+                    self.fechar_navegadores()
+                    self.exportar_metricas()
+                    self.historico.fechar()
+
+                placar = self.rodar_agendada(campanha)
+                if placar is None:
+                    break
+                placares[campanha.nome] = placar
+                if not (placar.concluida or self.agenda.mais_urgente()):
+                    break
+        finally:
+            self.agenda.atual = None
+        return placares
+
+    def rodar_agendada(self, campanha):
+        """Roda (ou continua) uma campanha da agenda e guarda onde parou nela"""
+        self.agenda.atual = campanha
+        self.escrever_log(
+            f"[AGENDA] ▶️ {campanha.nome} (prioridade {campanha.prioridade})", "success"
+        )
+        self.usar_lista(campanha.telefones, campanha.colunas, campanha.nome)
+        self.indice_atual = campanha.indice_atual
+        self.indices_concluidos = set(campanha.concluidos)
+
+        placar = self.rodar_campanha(campanha.mensagem, campanha.modelo)
+
+        campanha.indice_atual = self.indice_atual
+        campanha.concluidos = set(self.indices_concluidos)
+        campanha.concluida = bool(placar and placar.concluida)
+        return placar
+
+    def simular_agenda(
+        self, campanhas, duracao_envio=DURACAO_ENVIO_SIMULADA, inicio=None
+    ):
+        """
+        Roda a agenda num relógio de mentira, sem Chrome: cada envio leva
+        `duracao_envio` segundos e sempre dá certo, a pausa entre envios vem do
+        ritmo da config. As decisões (janela, limites, prioridade) são as
+        mesmas do envio de verdade, então mostra antes quando cada campanha
+        vai rodar e testa a agenda em segundos
+        Retorna a lista de envios: (momento, remetente, campanha, numero)
+        """
+        relogio = RelogioVirtual(inicio)
+        agenda_real = self.agenda
+        self.agenda = self.montar_agenda(campanhas, relogio)
+        fim = relogio.agora() + MAX_DIAS_SIMULACAO * UM_DIA
+
+        perfis = nomes_perfis_sessoes(self.config.perfil, self.config.qtd_sessoes)
+        sessoes = [
+            SessaoEnvio(numero, perfil, ControladorRitmo(**self.config.ritmo))
+            for numero, perfil in enumerate(perfis, 1)
+        ]
+        livre_em = {sessao.nome: relogio.agora() for sessao in sessoes}
+        envios = []
+        try:
+            while relogio.agora() < fim:
+                campanha, espera = self.agenda.proxima_campanha()
+                if campanha is None:
+                    if espera is None:
+                        break
+                    relogio.avancar_ate(relogio.agora() + espera)
+                    continue
+
+                self.agenda.atual = campanha
+                fila = FilaTrabalho(campanha.pendentes(), relogio=relogio.agora)
+                while relogio.agora() < fim:
+                    # A próxima sessão a ficar livre é quem age agora
+                    sessao = min(sessoes, key=lambda sessao: livre_em[sessao.nome])
+                    relogio.avancar_ate(livre_em[sessao.nome])
+                    if self.hora_de_ceder():
+                        break
+
+                    item = fila.pegar()
+                    if item is None:
+                        espera = fila.espera_repeticao()
+                        if espera is None:
+                            campanha.concluida = True
+                            break
+                    else:
+                        espera = self.checar_agenda(sessao, fila, item)
+                    if espera is not None:
+                        livre_em[sessao.nome] = relogio.agora() + self.limitar_espera(
+                            espera
+                        )
+                        continue
+
+                    envios.append(
+                        (relogio.agora(), sessao.remetente, campanha.nome, item[1])
+                    )
+                    self.agenda.registrar_envio(sessao)
+                    fila.concluir(item[0])
+                    campanha.concluidos.add(item[0])
+                    livre_em[sessao.nome] = (
+                        relogio.agora() + duracao_envio + sessao.ritmo.proxima_pausa()
+                    )
+                campanha.indice_atual = fila.primeiro_pendente(len(campanha.telefones))
+        finally:
+            self.agenda = agenda_real
+        return envios
+
+    def pausar(self, pausado=True):
+        """Pausa ou continua; quem tava esperando acorda na hora"""
+        self.ta_pausado = pausado
+
+    def parar(self):
+        """Pede pra parar: cada sessão termina o envio atual e sai"""
+        self.controle.definir(rodando=False, pausado=False)
+        self.escrever_log("Parando automação...", "warning")
+        self.mostrar_status("Parando...")
+
+    def encerrar(self):
+        """Fecha tudo depois da execução: Chrome, métricas, seletores e histórico"""
+        self.controle.definir(rodando=False, pausado=False)
+        self.mensagens = None
+
+        self.fechar_navegadores()
+        self.exportar_metricas()
+        REGISTRO_SELETORES.salvar()
+
+        if self.historico:
+            self.historico.fechar()
+            self.historico = None
+
+    # ---- envio ----
+
+    def medir_fase(self, fase, segundos):
+        """Manda um tempo solto (ex: login) pro medidor, se tiver um rodando"""
+        if self.medidor:
+            self.medidor.registrar(fase, segundos)
+
+    def exportar_metricas(self):
+        """Salva os percentis da execução num JSON na pasta atual"""
+        if not self.medidor or not self.medidor.versao:
+            return
+        try:
+            caminho = self.medidor.exportar()
+            self.escrever_log(
+                f"[METRICAS] 📈 Tempos por fase salvos em {caminho}", "info"
+            )
+        except OSError as erro:
+            self.escrever_log(
+                f"[METRICAS-ERRO] Não deu pra salvar as métricas: {erro}", "warning"
+            )
+
+    def limpar_cache_logs(self):
+        self.logs_ja_mostrados.clear()
+
+    def configurar_chrome(self, nome_perfil=None):
+        """
+        Prepara o Chrome pra funcionar com WhatsApp Web
+        USA O CHROME JÁ INSTALADO NO PC (não baixa versão nenhuma)
+        Com nome_perfil usa o perfil salvo (login já feito); sem, pasta temporária
+        """
+        try:
+            if self.config.headless:
+                modo = "headless"
+            elif self.config.chrome_escondido:
+                modo = "escondido"
+            else:
+                modo = "visível"
+            print(f"--> Configurando Chrome ({modo})...")
+
+            if nome_perfil:
+                pasta_perfil = pasta_do_perfil(nome_perfil)
+                print(f"    Usando perfil salvo: {pasta_perfil}")
+            else:
+                pasta_perfil = tempfile.mkdtemp(prefix=PREFIXO_PERFIL_TEMPORARIO)
+                self.pastas_temporarias.append(pasta_perfil)
+                print(f"    Pasta temporária criada: {pasta_perfil}")
+
+            config = Options()
+            config.add_argument(f"--user-data-dir={pasta_perfil}")
+            config.add_argument("--profile-directory=AutoProfile")
+
+            # ESSENCIAL: Esconde que é automação
+            config.add_argument("--disable-blink-features=AutomationControlled")
+            config.add_experimental_option("excludeSwitches", ["enable-automation"])
+            config.add_experimental_option("useAutomationExtension", False)
+
+            # DESLIGA atualização automática
+            config.add_argument("--disable-background-networking")
+            config.add_argument("--disable-background-timer-throttling")
+            config.add_argument("--disable-client-side-phishing-detection")
+            config.add_argument("--disable-default-apps")
+            config.add_argument("--disable-hang-monitor")
+            config.add_argument("--disable-popup-blocking")
+            config.add_argument("--disable-prompt-on-repost")
+            config.add_argument("--disable-sync")
+            config.add_argument("--metrics-recording-only")
+            config.add_argument("--no-first-run")
+            config.add_argument("--safebrowsing-disable-auto-update")
+            config.add_argument("--password-store=basic")
+
+            # Performance
+            config.add_argument("--disable-extensions")
+            config.add_argument("--no-sandbox")
+            config.add_argument("--disable-dev-shm-usage")
+            config.add_argument("--disable-gpu")
+            config.add_argument("--disable-web-security")
+            config.add_argument("--allow-running-insecure-content")
+
+            # User agent
+            config.add_argument(
+                "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+            )
+
+            if self.config.headless:
+                for argumento in ARGUMENTOS_HEADLESS:
+                    config.add_argument(argumento)
+                config.add_experimental_option("prefs", PREFERENCIAS_HEADLESS)
+            elif self.config.chrome_escondido:
+                config.add_argument("--window-size=800,600")
+                config.add_argument("--window-position=200,200")
+            else:
+                config.add_argument("--window-size=1200,800")
+                config.add_argument("--window-position=100,100")
+
+            # ⚡ USA CHROME DO SISTEMA - Sem Service, sem ChromeDriverManager
+            navegador = webdriver.Chrome(options=config)
+
+            # Remove flag de automação
+            navegador.execute_script(
+                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+            )
+
+            print("✓ Chrome configurado e pronto!")
+
+            if nome_perfil:
+                self.escrever_log(
+                    f"[PERFIL] Usando perfil salvo '{nome_perfil}' - se já logou nele, não precisa de QR Code",
+                    "info",
+                )
+            elif self.config.headless:
+                self.escrever_log(
+                    "[QR-REQUIRED] Headless sem perfil salvo: o QR Code vai abrir como imagem",
+                    "warning",
+                )
+            elif not self.config.chrome_escondido:
+                self.escrever_log(
+                    "[QR-REQUIRED] Scan de QR Code necessário para autenticação", "info"
+                )
+            else:
+                self.escrever_log(
+                    "[QR-REQUIRED] QR Code carregará automaticamente - aguarde instruções",
+                    "info",
+                )
+
+            return navegador
+
+        except Exception as err_driver:
+            self.escrever_log(
+                f"[BROWSER-CRITICAL] Falha fatal ao iniciar Chrome: {str(err_driver)}",
+                "error",
+            )
+            return None
+
+    def verificar_se_ta_logado(self, navegador):
+        try:
+            return estado_login(navegador) == "logado"
+
+        except Exception as erro:
+            self.escrever_log(f"❌ Erro ao verificar login: {str(erro)}", "error")
+            return False
+
+    def esconder_janela_chrome(self, navegador):
+        if self.config.chrome_escondido and not self.config.headless:
+            try:
+                navegador.minimize_window()
+                navegador.set_window_position(-2000, -2000)
+                navegador.set_window_size(100, 100)
+            except:
+                pass
+
+    def mostrar_qr_headless(self, navegador, abrir):
+        caminho = os.path.join(
+            tempfile.gettempdir(),
+            f"whatsapp_qr_{threading.current_thread().name}.png",
+        )
+        try:
+            salvar_qr_code(navegador, caminho)
+            if abrir:
+                self.escrever_log(f"[QR-PNG] QR Code salvo em: {caminho}", "warning")
+                abrir_arquivo(caminho)
+        except Exception as erro:
+            self.escrever_log(
+                f"[QR-PNG] Não consegui salvar o QR Code: {erro}", "error"
+            )
+
+    def logar_recursos(self, medidor, momento):
+        """Mostra no log quanto de CPU e RAM o Chrome tá gastando"""
+        medida = medidor.medir() if medidor else None
+
+        if medida is None:
+            if psutil is None:
+                self.escrever_log(
+                    "[RECURSOS] Instale o psutil (pip install psutil) pra ver CPU/RAM do Chrome",
+                    "info",
+                    nao_repetir=True,
+                )
+            return
+
+        cpu, rss_mb, qtd_processos = medida
+        self.escrever_log(
+            f"[RECURSOS] {momento}: CPU {cpu:.1f}% | RAM {rss_mb:.0f} MB | "
+            f"{qtd_processos} processos",
+            "info",
+        )
+
+    def fazer_login_whatsapp(self, navegador, tempo_max_segundos=300):
+        try:
+            timestamp_abertura = time.time()
+            self.escrever_log(
+                "[SESSAO-WA] Aguardando WhatsApp mostrar as conversas ou o QR Code...",
+                "info",
+            )
+
+            # Caminho rápido: com perfil salvo a lista de conversas aparece direto
+            inicio = time.perf_counter()
+            estado = esperar_tela_inicial(
+                navegador, self.config.limites_espera["tela_inicial"]
+            )
+            self.medir_fase("login_tela_inicial", time.perf_counter() - inicio)
+
+            if estado == "logado":
+                self.escrever_log(
+                    f"[AUTH-CACHED] Sessão já ativa - QR Code desnecessário "
+                    f"({time.time() - timestamp_abertura:.1f}s)",
+                    "success",
+                )
+                self.esconder_janela_chrome(navegador)
+                return True
+
+            if estado == "timeout":
+                self.escrever_log(
+                    "[SESSAO-WA-SLOW] Interface demorou, mas prosseguindo...", "warning"
+                )
+
+            self.escrever_log(
+                "[QR-SCAN-REQUIRED] Sessão não encontrada - QR Code scan necessário",
+                "warning",
+            )
+            self.escrever_log(
+                f"[TIMEOUT-CONFIG] Aguardando até {tempo_max_segundos//60}min para scan",
+                "info",
+            )
+
+            timestamp_inicio = time.time()
+            timestamp_ultimo_qr = 0
+            flag_log_aguardo_emitido = False
+
+            while time.time() - timestamp_inicio < tempo_max_segundos:
+                if not self.ta_rodando:
+                    self.escrever_log(
+                        "[AUTH-ABORTED] Processo cancelado manualmente", "warning"
+                    )
+                    return False
+
+                if self.verificar_se_ta_logado(navegador):
+                    self.medir_fase("login_qr", time.time() - timestamp_inicio)
+                    self.escrever_log("[AUTH-SUCCESS] Login detectado!", "success")
+                    self.escrever_log(
+                        "[AUTH-STABLE] Sessão confirmada e estável "
+                        f"({time.time() - timestamp_abertura:.1f}s desde a abertura)",
+                        "success",
+                    )
+                    self.esconder_janela_chrome(navegador)
+                    return True
+
+                if not flag_log_aguardo_emitido:
+                    self.escrever_log(
+                        "[AUTH-PENDING] Aguardando scan de QR Code...",
+                        "info",
+                        nao_repetir=True,
+                    )
+                    flag_log_aguardo_emitido = True
+
+                # Headless não tem janela: o QR Code vai pra um PNG
+                if (
+                    self.config.headless
+                    and time.time() - timestamp_ultimo_qr > INTERVALO_PRINT_QR
+                ):
+                    self.mostrar_qr_headless(navegador, abrir=timestamp_ultimo_qr == 0)
+                    timestamp_ultimo_qr = time.time()
+
+                tempo_decorrido = int(time.time() - timestamp_inicio)
+                if tempo_decorrido % 30 == 0 and tempo_decorrido > 0:
+                    minutos_restantes = int((tempo_max_segundos - tempo_decorrido) / 60)
+                    segundos_restantes = (tempo_max_segundos - tempo_decorrido) % 60
+                    self.escrever_log(
+                        f"[TIMEOUT-STATUS] Tempo restante: {minutos_restantes}m {segundos_restantes}s",
+                        "info",
+                    )
+
+                # Parar acorda na hora; pausar não muda nada enquanto espera o scan
+                self.controle.esperar(INTERVALO_CHECAGEM_LOGIN, na_pausa=False)
+
+            self.escrever_log(
+                "[AUTH-TIMEOUT] Tempo limite excedido - sessão não estabelecida",
+                "error",
+            )
+            return False
+
+        except Exception as err_auth:
+            self.escrever_log(
+                f"[AUTH-EXCEPTION] Erro crítico em autenticação: {str(err_auth)}",
+                "error",
+            )
+            return False
+
+    def mandar_mensagem(self, navegador, numero_destino, texto_mensagem):
+        """
+        Abre a conversa e manda o texto (inteiro ou por parágrafo)
+        Retorna um ResultadoEnvio com o desfecho, as partes e o tempo de cada fase
+        """
+        resultado = ResultadoEnvio(numero_destino)
+        inicio_envio = time.perf_counter()
+
+        try:
+            self.escrever_log(f"📤 Mandando mensagem pro {numero_destino}...", "info")
+
+            estado, campo_texto = self.abrir_conversa(
+                navegador, numero_destino, resultado
+            )
+
+            if estado == "invalido":
+                self.escrever_log(
+                    f"⚠️ NÚMERO INVÁLIDO: {numero_destino} não possui WhatsApp!",
+                    "warning",
+                )
+                resultado.desfecho = DesfechoEnvio.NUMERO_INVALIDO
+                return resultado
+
+            if estado != "pronto":
+                self.escrever_log(
+                    f"❌ Não achei onde digitar depois de {self.config.limites_espera['conversa']}s",
+                    "error",
+                )
+                resultado.desfecho = DesfechoEnvio.CONVERSA_NAO_ABRIU
+                return resultado
+
+            self.escrever_log("✅ Achei onde digitar!", "success")
+
+            partes = self.dividir_partes(texto_mensagem)
+            resultado.partes_total = len(partes)
+            if self.anexo:
+                # Anexo vai com a 1ª parte de legenda; o resto segue como texto
+                if not self.enviar_anexo(navegador, campo_texto, partes[0], resultado):
+                    resultado.desfecho = DesfechoEnvio.ENVIO_NAO_CONFIRMADO
+                    return resultado
+                resultado.partes_enviadas += 1
+                partes = partes[1:]
+
+            if len(partes) > 1:
+                enviou = self.enviar_partes_em_lote(navegador, partes, resultado)
+                if enviou is not None:
+                    if not enviou:
+                        resultado.desfecho = DesfechoEnvio.ENVIO_NAO_CONFIRMADO
+                        return resultado
+                    partes = []  # já foram todas
+
+            for parte in partes:
+                # Parou/pausou no meio: não manda o resto dos parágrafos
+                if resultado.partes_enviadas and (
+                    not self.ta_rodando or self.ta_pausado
+                ):
+                    resultado.desfecho = DesfechoEnvio.INTERROMPIDO
+                    return resultado
+
+                if not self.digitar_e_enviar(navegador, campo_texto, parte, resultado):
+                    resultado.desfecho = DesfechoEnvio.ENVIO_NAO_CONFIRMADO
+                    return resultado
+                resultado.partes_enviadas += 1
+
+            if resultado.partes_total > 1:
+                self.escrever_log(
+                    f"✅ {resultado.partes_total} partes enviadas!", "success"
+                )
+            else:
+                self.escrever_log("✅ Mensagem enviada!", "success")
+
+            resultado.desfecho = DesfechoEnvio.ENVIADO
+            return resultado
+
+        except Exception as erro:
+            self.escrever_log(f"❌ Erro crítico: {str(erro)}", "error")
+            resultado.desfecho = DesfechoEnvio.ERRO
+            resultado.erro = str(erro).strip().split("\n")[0] or type(erro).__name__
+            return resultado
+        finally:
+            resultado.somar("total", time.perf_counter() - inicio_envio)
+
+    def dividir_partes(self, texto_mensagem):
+        """Mensagem inteira ou um pedaço por parágrafo, conforme a configuração"""
+        if self.config.mensagem_unica or "\n\n" not in texto_mensagem:
+            # MENSAGEM ÚNICA
+            self.escrever_log("💬 Mandando mensagem completa", "info")
+            return [texto_mensagem]
+
+        # POR PARÁGRAFOS
+        self.escrever_log("📃 Modo de envio em partes", "info")
+        partes = [p.strip() for p in texto_mensagem.split("\n\n") if p.strip()]
+        self.escrever_log(f"📊 {len(partes)} partes detectadas", "info")
+        return partes
+
+    def abrir_conversa(self, navegador, numero_destino, resultado=None):
+        """
+        Abre a conversa do número e espera o que vier primeiro:
+        campo de texto ou aviso de número inválido
+        Se der, troca de conversa dentro do WhatsApp já carregado (bem mais
+        rápido); se a troca interna não rolar, cai no get() de sempre
+        Retorna o mesmo que esperar_conversa_pronta
+        """
+        if resultado is None:
+            resultado = ResultadoEnvio(numero_destino)
+        url_conversa = f"{self.config.url_whatsapp}/send?phone={numero_destino}"
+        estado, campo_texto = "timeout", None
+        trocou_sem_recarregar = False
+
+        if self.config.navegacao_interna:
+            with resultado.fase("navegar"):
+                troca = navegador.execute_script(
+                    JS_TROCAR_CONVERSA, url_conversa, MAX_FALHAS_TROCA_INTERNA
+                )
+
+            if troca == "trocando":
+                with resultado.fase("esperar_conversa"):
+                    estado, campo_texto = esperar_conversa_pronta(
+                        navegador,
+                        self.config.limites_espera["troca_interna"],
+                        resultado.somar,
+                        ESTADOS_TROCA_INTERNA,
+                    )
+                trocou_sem_recarregar = estado != "timeout"
+
+                if not trocou_sem_recarregar:
+                    falhas = navegador.execute_script(JS_FALHA_TROCA)
+                    self.escrever_log(
+                        "⚠️ Troca sem recarregar não funcionou, recarregando a página",
+                        "warning",
+                    )
+                    if falhas >= MAX_FALHAS_TROCA_INTERNA:
+                        self.escrever_log(
+                            "⚠️ Troca sem recarregar desligada nesse navegador, "
+                            "usando só recarregamento",
+                            "warning",
+                        )
+
+        if estado == "timeout":
+            with resultado.fase("navegar"):
+                navegador.get(url_conversa)
+            with resultado.fase("esperar_conversa"):
+                estado, campo_texto = esperar_conversa_pronta(
+                    navegador, self.config.limites_espera["conversa"], resultado.somar
+                )
+
+        if estado == "pronto":
+            navegador.execute_script(JS_CONVERSA_ABERTA, trocou_sem_recarregar)
+        elif estado == "invalido_pagina":
+            self.avisar_invalido_fora_do_popup()
+            estado = "invalido"
+
+        return estado, campo_texto
+
+    def avisar_invalido_fora_do_popup(self):
+        self.escrever_log(
+            "⚠️ Aviso de número inválido achado fora de popup (sem role=dialog): "
+            "na troca sem recarregar ele não seria visto",
+            "warning",
+            nao_repetir=True,
+        )
+
+    def digitar_e_enviar(self, navegador, campo_texto, texto, resultado=None):
+        """
+        Digita o texto, aperta ENTER e espera a bolha nova ganhar o check
+        Volta assim que o WhatsApp confirmar, sem sleep fixo
+        Se receber o ResultadoEnvio, soma nele o tempo de cada fase
+        """
+        if resultado is None:
+            resultado = ResultadoEnvio("")
+
+        with resultado.fase("injetar_texto"):
+            marcar_bolhas_existentes(navegador)
+            campo_texto.clear()
+            campo_texto.click()
+            inserir_texto_com_emojis(navegador, campo_texto, texto)
+
+        resultado.submetido = True
+        with resultado.fase("enviar"):
+            campo_texto.send_keys(Keys.ENTER)
+
+        with resultado.fase("confirmar"):
+            status = esperar_envio_confirmado(
+                navegador, self.config.limites_espera["envio"]
+            )
+        return self.conferir_status_envio(status)
+
+    def conferir_status_envio(self, status):
+        """Status da bolha nova depois do ENTER: True se dá pra contar como enviada"""
+        if status == "pendente":
+            # Bolha saiu mas ainda tá no relógio: o WhatsApp termina de mandar sozinho
+            self.escrever_log(
+                "⏳ Mensagem ainda no relógio, o WhatsApp vai terminar de enviar",
+                "warning",
+                nao_repetir=True,
+            )
+        elif status is None:
+            self.escrever_log(
+                f"❌ A mensagem não apareceu na conversa depois de {self.config.limites_espera['envio']}s",
+                "error",
+            )
+            return False
+
+        return True
+
+    def enviar_anexo(self, navegador, campo_texto, legenda, resultado):
+        """
+        Cola o anexo (já guardado na página) no campo, espera a prévia, põe a
+        legenda e manda. Espera o check igual à mensagem de texto
+        """
+        anexo = self.anexo
+        marcar_bolhas_existentes(navegador)
+
+        with resultado.fase("anexar"):
+            estado, modo = navegador.execute_script(
+                JS_ANEXAR, anexo.id, campo_texto, None
+            )
+        if estado == "sem_cache":
+            # Página nova (recarregou ou Chrome novo): guarda o File nela
+            with resultado.fase("preparar_anexo"):
+                navegador.execute_script(
+                    JS_GUARDAR_ANEXO, anexo.id, anexo.nome, anexo.tipo, anexo.base64
+                )
+            with resultado.fase("anexar"):
+                estado, modo = navegador.execute_script(
+                    JS_ANEXAR, anexo.id, campo_texto, modo
+                )
+
+        with resultado.fase("abrir_previa"):
+            campo_legenda = None
+            if estado == "anexado":
+                campo_legenda = esperar_legenda_anexo(
+                    navegador, self.config.limites_espera["anexo"]
+                )
+            if campo_legenda is None:
+                # Esse jeito não abriu a prévia: tenta o outro e, se der,
+                # o navegador passa a usar ele primeiro
+                modo = next(outro for outro in MODOS_ANEXO if outro != modo)
+                estado, _ = navegador.execute_script(
+                    JS_ANEXAR, anexo.id, campo_texto, modo
+                )
+                if estado == "anexado":
+                    campo_legenda = esperar_legenda_anexo(
+                        navegador, self.config.limites_espera["anexo"]
+                    )
+                if campo_legenda is not None:
+                    navegador.execute_script(JS_LEMBRAR_MODO_ANEXO, modo)
+                    self.escrever_log(
+                        f"[ANEXO] 📎 Prévia abriu pelo modo '{modo}', esse "
+                        "navegador vai usar ele primeiro",
+                        "info",
+                    )
+
+        if campo_legenda is None:
+            self.escrever_log(
+                f"❌ A prévia do anexo não abriu em {self.config.limites_espera['anexo']}s",
+                "error",
+            )
+            return False
+
+        with resultado.fase("injetar_texto"):
+            if legenda:
+                inserir_texto_com_emojis(navegador, campo_legenda, legenda)
+
+        resultado.submetido = True
+        with resultado.fase("enviar"):
+            campo_legenda.send_keys(Keys.ENTER)
+
+        with resultado.fase("confirmar"):
+            status = esperar_envio_confirmado(
+                navegador, self.config.limites_espera["anexo"]
+            )
+
+        if status is None:
+            self.escrever_log(
+                f"❌ O anexo não apareceu na conversa depois de {self.config.limites_espera['anexo']}s",
+                "error",
+            )
+            return False
+        if status == "pendente":
+            self.escrever_log(
+                "⏳ Anexo ainda no relógio (subindo), o WhatsApp vai terminar de enviar",
+                "warning",
+                nao_repetir=True,
+            )
+        return True
+
+    def enviar_partes_em_lote(self, navegador, partes, resultado):
+        """
+        Cola e manda todas as partes num script só dentro da página (cada uma
+        espera a bolha da anterior aparecer) e depois espera o check da última
+        Retorna True/False, ou None se a primeira parte nem chegou no ENTER (aí
+        quem chamou manda do jeito normal, parte por parte)
+        """
+        limite_ms = self.config.limites_espera["envio"] * 1000
+        navegador.set_script_timeout(
+            self.config.limites_espera["envio"] * len(partes) + 5
+        )
+
+        resultado.submetido = True
+        with resultado.fase("enviar_partes"):
+            retorno = navegador.execute_async_script(
+                JS_ENVIAR_PARTES,
+                partes,
+                XPATH_CAMPO_TEXTO,
+                SELETOR_BOTAO_ENVIAR,
+                limite_ms,
+            )
+        resultado.partes_enviadas += retorno["enviadas"]
+
+        if retorno["enviadas"] == 0 and retorno["erro"] in ERROS_LOTE_ANTES_DO_ENTER:
+            resultado.submetido = False
+            self.escrever_log(
+                f"⚠️ Envio em lote não pegou ({retorno['erro']}), mandando parte por parte",
+                "warning",
+                nao_repetir=True,
+            )
+            return None
+
+        if retorno["erro"]:
+            self.escrever_log(
+                f"❌ Só {retorno['enviadas']}/{len(partes)} partes apareceram na conversa",
+                "error",
+            )
+            return False
+
+        with resultado.fase("confirmar"):
+            status = esperar_envio_confirmado(
+                navegador, self.config.limites_espera["envio"]
+            )
+
+        if status is None:
+            self.escrever_log(
+                "❌ As partes sumiram da conversa antes do check", "error"
+            )
+            return False
+
+        if status == "pendente":
+            self.escrever_log(
+                "⏳ Mensagem ainda no relógio, o WhatsApp vai terminar de enviar",
+                "warning",
+                nao_repetir=True,
+            )
+        return True
+
+    def valores_do_destinatario(self, indice):
+        return {
+            titulo: valores[indice] for titulo, valores in self.colunas_planilha.items()
+        }
+
+    def montar_mensagens(self, modelo):
+        """Monta a mensagem de todos os destinatários de uma vez (None se não tem variável)"""
+        if not modelo or not modelo.tem_variaveis:
+            return None
+
+        inicio = time.perf_counter()
+        mensagens = modelo.renderizar_em_lote(
+            self.colunas_planilha, len(self.lista_telefones)
+        )
+        self.escrever_log(
+            f"[MODELO] {len(mensagens):,} mensagens personalizadas montadas em "
+            f"{time.perf_counter() - inicio:.2f}s ({', '.join(modelo.variaveis)})",
+            "info",
+        )
+        return mensagens
+
+    def resumo_repeticoes(self, placar):
+        """Linha do relatório final sobre as falhas repetidas ("" se não teve)"""
+        if not placar.repeticoes:
+            return ""
+        return (
+            f"🔁 Repetições: {placar.repeticoes} | recuperados: {placar.recuperados} "
+            f"| falharam em todas as tentativas: {len(placar.esgotados)}"
+        )
+
+    def abrir_banco(self):
+        """Abre o banco de campanhas na primeira vez (None se não der)"""
+        if self.banco is None:
+            try:
+                self.banco = BancoCampanhas()
+            except sqlite3.Error as erro:
+                self.escrever_log(
+                    f"[CAMPANHA-ERRO] Sem banco de campanhas, progresso só em memória: {erro}",
+                    "warning",
+                    nao_repetir=True,
+                )
+        return self.banco
+
+    def resumo_campanha_salva(self, mensagem):
+        """Linha pro diálogo de confirmação dizendo se vai retomar uma campanha"""
+        banco = self.abrir_banco()
+        if not banco:
+            return ""
+
+        try:
+            campanha_id = banco.buscar_campanha(
+                assinatura_campanha(self.lista_telefones, mensagem)
+            )
+            if campanha_id is None:
+                return ""
+            contagem = banco.contar_status(campanha_id)
+        except sqlite3.Error:
+            return ""
+
+        processados = sum(contagem.values()) - contagem.get(PENDENTE, 0)
+        if not processados:
+            return ""
+        return (
+            f"💾 Campanha já iniciada antes: {processados}/{len(self.lista_telefones)} "
+            f"processados ({contagem.get(ENVIADO, 0)} enviados), continua do ponto onde parou\n"
+        )
+
+    def carregar_progresso_salvo(self, mensagem):
+        """
+        Abre (ou cria) a campanha dessa lista + mensagem no banco e marca como
+        concluídos os destinatários que já têm resultado salvo
+        """
+        self.campanha_id = None
+        banco = self.abrir_banco()
+        if not banco:
+            return
+
+        try:
+            self.campanha_id, nova = banco.abrir_campanha(
+                self.lista_telefones, mensagem, self.arquivo_campanha
+            )
+            if nova:
+                self.escrever_log(
+                    f"[CAMPANHA-NOVA] #{self.campanha_id} com {len(self.lista_telefones)} destinatários",
+                    "info",
+                )
+                return
+
+            processadas = banco.resultados_salvos(self.campanha_id)
+        except sqlite3.Error as erro:
+            self.escrever_log(f"[CAMPANHA-ERRO] {erro}", "warning")
+            self.campanha_id = None
+            return
+
+        self.indices_concluidos |= processadas.keys()
+        for posicao, status in processadas.items():
+            self.marcar_destinatario(posicao, status)
+        if processadas:
+            self.escrever_log(
+                f"[CAMPANHA-RETOMADA] #{self.campanha_id}: {len(processadas)} já processados, "
+                "pulando esses",
+                "success",
+            )
+
+    def registrar_na_campanha(self, indice, resultado, sessao):
+        """Mostra o resultado na grade e salva no banco da campanha"""
+        self.marcar_destinatario(indice, resultado.status_campanha)
+        if self.campanha_id is None:
+            return
+        try:
+            self.banco.registrar_resultado(
+                self.campanha_id,
+                indice,
+                resultado.status_campanha,
+                "" if resultado else resultado.observacao,
+                sessao.remetente,
+            )
+        except sqlite3.Error as erro:
+            self.escrever_log(
+                f"[CAMPANHA-ERRO] Não salvou o resultado: {erro}",
+                "warning",
+                nao_repetir=True,
+            )
+
+    def executar_pool(self, mensagem):
+        """
+        Roda a campanha com N Chromes em paralelo puxando da mesma fila
+        Começa do indice_atual (pulando o que já foi feito) e no fim atualiza
+        o indice_atual pro primeiro contato que ficou sem processar
+        Retorna o placar somado de todas as sessões
+        """
+        total = len(self.lista_telefones)
+        fila = FilaTrabalho(
+            (i, numero)
+            for i, numero in enumerate(self.lista_telefones)
+            if i >= self.indice_atual and i not in self.indices_concluidos
+        )
+        placar = PlacarCampanha(total, ja_processados=total - len(fila))
+
+        self.mostrar_progresso(placar.processados, total)
+
+        qtd_sessoes = self.config.qtd_sessoes
+        perfis = nomes_perfis_sessoes(self.config.perfil, qtd_sessoes)
+        self.sessoes = [
+            SessaoEnvio(numero, perfil, ControladorRitmo(**self.config.ritmo))
+            for numero, perfil in enumerate(perfis, 1)
+        ]
+        if self.agenda and self.agenda.tem_limite:
+            self.carregar_envios_recentes()
+        if self.usar_assincrono():
+            OrquestradorAssincrono(self).executar(fila, mensagem, placar)
+            self.indice_atual = fila.primeiro_pendente(total)
+            return placar
+
+        threads = [
+            threading.Thread(
+                target=self.rodar_sessao,
+                args=(sessao, fila, mensagem, placar, qtd_sessoes > 1),
+                name=f"Sessao-{sessao.nome}",
+                daemon=True,
+            )
+            for sessao in self.sessoes
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.indice_atual = fila.primeiro_pendente(total)
+        return placar
+
+    def usar_assincrono(self):
+        """Envio assíncrono pedido e possível (precisa do websockets e não faz anexo)"""
+        if not self.config.assincrono:
+            return False
+        if websockets is None:
+            self.escrever_log(
+                "[ASSINCRONO] ⚠️ Falta o pacote websockets (pip install websockets), "
+                "mandando com uma thread por sessão",
+                "warning",
+            )
+            return False
+        if self.anexo:
+            self.escrever_log(
+                "[ASSINCRONO] ⚠️ Anexo ainda vai só pelo Selenium, "
+                "mandando com uma thread por sessão",
+                "warning",
+            )
+            return False
+        return True
+
+    def rodar_sessao(self, sessao, fila, mensagem, placar, marcar_log=False):
+        """Loop de uma sessão: abre o Chrome, faz login e vai puxando da fila"""
+        if marcar_log:
+            PREFIXO_LOG.set(f"[{sessao.nome}] ")
+
+        try:
+            if not self.abrir_sessao(sessao):
+                return
+
+            while self.sessao_ativa(sessao):
+                self.esperar_fim_da_pausa(sessao)
+
+                if not self.sessao_ativa(sessao) or self.hora_de_ceder():
+                    break
+
+                item = fila.pegar()
+                if item is None:
+                    espera = fila.espera_repeticao()
+                    if espera is None:
+                        break
+                    # Só sobrou repetição (ou contato fora do horário) pra depois
+                    self.mostrar_status(
+                        f"Próximo contato em {formatar_espera(espera)}..."
+                    )
+                    self.dormir_na_sessao(sessao, self.limitar_espera(espera))
+                    continue
+
+                espera = self.checar_agenda(sessao, fila, item)
+                if espera is not None:
+                    self.dormir_na_sessao(sessao, self.limitar_espera(espera))
+                    continue
+
+                indice, numero = item
+                tentativa = fila.tentativas[indice]
+                self.marcar_destinatario(indice, ENVIANDO)
+                self.mostrar_status(
+                    f"Enviando para {numero} ({placar.processados + 1}/{placar.total})..."
+                )
+
+                texto = self.mensagens[indice] if self.mensagens else mensagem
+                resultado = self.mandar_mensagem(sessao.navegador, numero, texto)
+                mudanca_ritmo = self.concluir_envio(
+                    sessao, fila, placar, item, tentativa, texto, resultado
+                )
+
+                # Pausa entre envios (cada sessão tem a sua)
+                if fila.tem_pendentes() and self.sessao_ativa(sessao):
+                    if not self.ta_pausado:
+                        self.pausar_entre_envios(sessao, mudanca_ritmo)
+
+            if not self.ta_rodando:
+                self.escrever_log(
+                    "Automação interrompida pelo usuário", "warning", nao_repetir=True
+                )
+
+            self.logar_recursos(sessao.recursos, "Chrome no fim da sessão")
+
+        except Exception as erro:
+            self.escrever_log(f"Erro na sessão: {str(erro)}", "error")
+            sessao.parada = True
+
+    def abrir_sessao(self, sessao):
+        """Abre o Chrome da sessão, entra no WhatsApp e faz login (True se logou)"""
+        sessao.navegador = self.configurar_chrome(sessao.perfil)
+
+        if not sessao.navegador:
+            self.escrever_log("Erro ao configurar navegador", "error")
+            return False
+
+        sessao.recursos = MedidorRecursos(sessao.navegador)
+        sessao.recursos.medir()  # primeira medida só zera o contador de CPU
+
+        self.mostrar_status("Navegando para WhatsApp Web...")
+        inicio = time.perf_counter()
+        sessao.navegador.get(self.config.url_whatsapp)
+        self.medir_fase("login_abrir_pagina", time.perf_counter() - inicio)
+
+        self.mostrar_status("Aguardando login no WhatsApp...")
+        if not self.fazer_login_whatsapp(sessao.navegador):
+            self.escrever_log("Falha no login dessa sessão", "error")
+            return False
+        sessao.logada = True
+        self.logar_recursos(sessao.recursos, "Chrome após login")
+        return True
+
+    def concluir_envio(self, sessao, fila, placar, item, tentativa, texto, resultado):
+        """
+        Anota o resultado nas métricas e no ritmo e decide: volta pra fila
+        (falha passageira) ou fica registrado de vez
+        Retorna a mudança de ritmo (pra pausa logo depois)
+        """
+        indice, numero = item
+        self.medidor.registrar_resultado(resultado)
+        mudanca_ritmo = sessao.ritmo.registrar(resultado)
+        if self.agenda and (resultado or resultado.partes_enviadas):
+            self.agenda.registrar_envio(sessao)
+
+        espera = None
+        if not resultado and resultado.pode_repetir:
+            espera = fila.reagendar(item)
+        if espera is not None:
+            placar.registrar_repeticao()
+            self.marcar_destinatario(indice, REPETIR)
+            self.escrever_log(
+                f"[REPETIR] 🔁 {numero} ({resultado.observacao}): tentativa "
+                f"{tentativa + 1}/{fila.max_tentativas} daqui a {espera:.0f}s",
+                "warning",
+            )
+        else:
+            self.registrar_final(
+                sessao, fila, placar, item, tentativa, texto, resultado
+            )
+        return mudanca_ritmo
+
+    def registrar_final(self, sessao, fila, placar, item, tentativa, texto, resultado):
+        """Resultado que não volta mais pra fila: placar, histórico, campanha e log"""
+        indice, numero = item
+        self.indices_concluidos.add(indice)
+        fila.concluir(indice)
+        self.mostrar_progresso(placar.registrar(resultado, tentativa), placar.total)
+
+        self.historico.registrar(
+            numero, resultado.status_historico, texto, resultado.observacao
+        )
+        self.registrar_na_campanha(indice, resultado, sessao)
+
+        if resultado:
+            sessao.enviados += 1
+            if sessao.enviados % INTERVALO_LOG_RECURSOS == 0:
+                self.logar_recursos(
+                    sessao.recursos, f"Chrome após {sessao.enviados} envios"
+                )
+            if tentativa > 1:
+                self.escrever_log(
+                    f"[REPETIR] ✅ Recuperado na {tentativa}ª tentativa: {numero}",
+                    "success",
+                )
+            else:
+                self.escrever_log(f"✅ Sucesso: {numero}", "success")
+        elif resultado.numero_invalido:
+            self.escrever_log(f"⚠️ Sem WhatsApp: {numero}", "warning")
+        elif tentativa > 1:
+            self.escrever_log(
+                f"[REPETIR] ❌ Falhou nas {tentativa} tentativas: {numero} "
+                f"({resultado.observacao})",
+                "error",
+            )
+        else:
+            self.escrever_log(f"❌ Falha: {numero} ({resultado.observacao})", "error")
+
+    def sessao_ativa(self, sessao):
+        return self.ta_rodando and not sessao.parada
+
+    def checar_agenda(self, sessao, fila, item):
+        """
+        Confere o limite do número da sessão e a janela do destinatário antes
+        de mandar. Retorna None se pode; senão o contato já voltou pra fila e o
+        retorno é quanto a sessão dorme antes de pegar outro (0 = nada)
+        """
+        if not self.agenda:
+            return None
+        agora = self.agenda.relogio.agora()
+
+        espera = self.agenda.espera_sessao(sessao, agora)
+        if espera > 0:
+            fila.devolver(item)
+            libera = formatar_momento(agora + espera)
+            self.escrever_log(
+                f"[AGENDA] ⏳ {sessao.remetente} chegou no limite de envios, "
+                f"volta {libera}",
+                "warning",
+                nao_repetir=True,
+            )
+            self.mostrar_status(f"Limite de envios: volta {libera}")
+            return espera
+
+        numero = item[1]
+        espera = self.agenda.espera_destinatario(numero, agora)
+        if espera > 0:
+            fila.adiar(item, espera)
+            self.escrever_log(
+                f"[AGENDA] 🌙 DDD {numero[2:4]} fora do horário, esses contatos "
+                f"ficam pra {formatar_momento(agora + espera)}",
+                "info",
+                nao_repetir=True,
+            )
+            return 0.0
+        return None
+
+    def limitar_espera(self, segundos):
+        """Espera cortada pra acordar se começar uma campanha mais urgente"""
+        return self.agenda.limitar_espera(segundos) if self.agenda else segundos
+
+    def hora_de_ceder(self):
+        """Começou uma campanha mais urgente: as sessões largam essa (fica salva)"""
+        campanha = self.agenda.mais_urgente() if self.agenda else None
+        if campanha is None:
+            return False
+        self.escrever_log(
+            f"[AGENDA] ⏭️ {campanha.nome} (prioridade {campanha.prioridade}) passa "
+            "na frente, essa continua depois",
+            "warning",
+            nao_repetir=True,
+        )
+        return True
+
+    def carregar_envios_recentes(self):
+        """
+        Puxa do banco os envios das últimas 24h de cada perfil salvo, pro
+        limite por hora/dia valer mesmo depois de fechar o programa (perfil
+        temporário não dá pra saber se é o mesmo número)
+        """
+        if not self.abrir_banco():
+            return
+        desde = self.agenda.relogio.agora() - UM_DIA
+        for sessao in self.sessoes:
+            if sessao.perfil is None or sessao.remetente in self.agenda.envios:
+                continue
+            try:
+                envios = self.banco.envios_desde(sessao.remetente, desde)
+            except sqlite3.Error as erro:
+                self.escrever_log(f"[CAMPANHA-ERRO] {erro}", "warning")
+                return
+            self.agenda.envios[sessao.remetente] = EnviosRecentes(envios)
+            if envios:
+                self.escrever_log(
+                    f"[AGENDA] {sessao.remetente}: {len(envios)} envios nas "
+                    "últimas 24h já contam no limite",
+                    "info",
+                )
+
+    def esperar_fim_da_pausa(self, sessao):
+        """Pausado: dorme até continuar ou parar"""
+        self.controle.esperar_continuar(self.medir_fase)
+
+    def dormir_na_sessao(self, sessao, segundos):
+        """Espera até X segundos, saindo na hora se parar ou pausar"""
+        self.controle.esperar(
+            segundos,
+            acordar=lambda: sessao.parada,
+            medir=self.medir_fase,
+        )
+
+    def calcular_pausa(self, sessao, mudanca_ritmo=None):
+        """Pede a pausa pro controle de ritmo da sessão e anota nas métricas"""
+        ritmo = sessao.ritmo
+        pausa = ritmo.proxima_pausa()
+
+        if ritmo.automatico:
+            if mudanca_ritmo:
+                self.escrever_log(
+                    f"[RITMO] {'⬇️' if mudanca_ritmo.startswith('recuo') else '⬆️'} "
+                    f"{mudanca_ritmo}, agora {ritmo.taxa:.0f} msg/h",
+                    "warning" if mudanca_ritmo.startswith("recuo") else "info",
+                )
+            self.medidor.registrar_ritmo(sessao.nome, pausa, ritmo.taxa, mudanca_ritmo)
+            self.escrever_log(
+                f"⏰ Pausa: {pausa:.0f}s (ritmo {ritmo.taxa:.0f} msg/h)", "info"
+            )
+        else:
+            self.medidor.registrar_ritmo(sessao.nome, pausa)
+            if ritmo.modo == RITMO_ALEATORIO:
+                self.escrever_log(f"⏰ Pausa aleatória: {pausa:.0f}s", "info")
+            else:
+                self.escrever_log(f"⏰ Pausa: {pausa:.0f}s", "info")
+        return pausa
+
+    def pausar_entre_envios(self, sessao, mudanca_ritmo=None):
+        pausa = self.calcular_pausa(sessao, mudanca_ritmo)
+
+        self.mostrar_status(f"Pausa: {pausa:.0f}s...")
+        self.dormir_na_sessao(sessao, pausa)
+
+    def fechar_navegadores(self):
+        """Fecha o Chrome do teste e os de todas as sessões"""
+        navegadores = [self.navegador] + [sessao.navegador for sessao in self.sessoes]
+
+        for navegador in navegadores:
+            if navegador:
+                try:
+                    navegador.quit()
+                    self.escrever_log("Navegador fechado", "info")
+                except:
+                    pass
+
+        self.navegador = None
+        for sessao in self.sessoes:
+            sessao.navegador = None
+
+        # Perfil temporário não serve pra nada depois que o Chrome fechou
+        for pasta in self.pastas_temporarias:
+            shutil.rmtree(pasta, ignore_errors=True)
+        self.pastas_temporarias = []